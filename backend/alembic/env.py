@@ -10,7 +10,7 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 # Import models and config
 from app.models.database import Base
-from app.models.ocr_models import Document
+from app.models.ocr_models import Document, DocumentPage, Template
 from app.core.config import settings
 
 # Alembic Config object
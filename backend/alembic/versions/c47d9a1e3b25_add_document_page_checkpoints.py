@@ -0,0 +1,41 @@
+"""Add document page checkpoints
+
+Revision ID: c47d9a1e3b25
+Revises: 8b1c4e2f7a90
+Create Date: 2026-10-19 14:03:17.550921
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c47d9a1e3b25'
+down_revision: Union[str, None] = '8b1c4e2f7a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('documents', sa.Column('ocr_profile', sa.String(), nullable=True))
+    op.create_table('document_pages',
+    sa.Column('document_id', sa.String(), nullable=False),
+    sa.Column('page_num', sa.Integer(), nullable=False),
+    sa.Column('success', sa.Boolean(), nullable=False),
+    sa.Column('text', sa.Text(), nullable=True),
+    sa.Column('lines', sa.JSON(), nullable=True),
+    sa.Column('confidence', sa.Float(), nullable=True),
+    sa.Column('line_count', sa.Integer(), nullable=True),
+    sa.Column('engine_used', sa.String(), nullable=True),
+    sa.Column('rotation', sa.Integer(), nullable=True),
+    sa.Column('error_message', sa.Text(), nullable=True),
+    sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('document_id', 'page_num')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('document_pages')
+    op.drop_column('documents', 'ocr_profile')
@@ -0,0 +1,39 @@
+"""Add content-addressed blobs
+
+Revision ID: e3b6f08d2c71
+Revises: c47d9a1e3b25
+Create Date: 2026-10-19 16:41:52.208317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b6f08d2c71'
+down_revision: Union[str, None] = 'c47d9a1e3b25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('blobs',
+    sa.Column('key', sa.String(), nullable=False),
+    sa.Column('content_hash', sa.String(), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('key')
+    )
+    op.add_column('documents', sa.Column('content_hash', sa.String(), nullable=True))
+    op.add_column('documents', sa.Column('blob_key', sa.String(), nullable=True))
+    op.create_index(op.f('ix_documents_blob_key'), 'documents', ['blob_key'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_documents_blob_key'), table_name='documents')
+    op.drop_column('documents', 'blob_key')
+    op.drop_column('documents', 'content_hash')
+    op.drop_table('blobs')
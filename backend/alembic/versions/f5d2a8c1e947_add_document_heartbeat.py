@@ -0,0 +1,28 @@
+"""Add document heartbeat
+
+Revision ID: f5d2a8c1e947
+Revises: e3b6f08d2c71
+Create Date: 2026-10-19 19:12:40.381562
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5d2a8c1e947'
+down_revision: Union[str, None] = 'e3b6f08d2c71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('documents', sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True))
+    # Documents processing during the upgrade count from their upload time
+    op.execute("UPDATE documents SET updated_at = created_at")
+
+
+def downgrade() -> None:
+    op.drop_column('documents', 'updated_at')
@@ -1,16 +1,23 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, BackgroundTasks
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
-from typing import List, Dict
+from sqlalchemy import delete, insert, select
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from typing import List, Dict, Optional
+import asyncio
 import os
 import uuid
 import zipfile
 import io
 from datetime import datetime
-from app.models.database import get_db
-from app.models.ocr_models import Document
+from app.models.database import get_async_db
+from app.models.ocr_models import Document, DocumentPage
 from app.services.ocr_service import ocr_service
+from app.services.ocr_profiles import OCR_PROFILES
+from app.services.storage_service import StoredBlob, storage_service
 from app.core.config import settings
+from app.core import metrics
 import logging
 
 logger = logging.getLogger(__name__)
@@ -18,17 +25,91 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/batch", tags=["Batch Operations"])
 
 
+def _batch_profile(ocr_profile: Optional[str]) -> str:
+    """Resolve the speed profile for a batch request (default: BATCH_OCR_PROFILE)"""
+    ocr_profile = ocr_profile or settings.BATCH_OCR_PROFILE
+    if ocr_profile not in OCR_PROFILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown OCR profile. Available: {', '.join(OCR_PROFILES)}"
+        )
+    return ocr_profile
+
+
+def _document_row(
+    file_id: str,
+    original_filename: str,
+    blob: StoredBlob,
+    file_extension: str,
+    ocr_result: Dict
+) -> Dict:
+    """Build a complete documents row for a successfully processed batch file"""
+    file_path = storage_service.path(blob.key)
+    return {
+        "id": file_id,
+        "original_filename": original_filename,
+        "stored_filename": os.path.basename(file_path),
+        "file_path": file_path,
+        "file_type": file_extension[1:],
+        "file_size": blob.size,
+        "content_hash": blob.content_hash,
+        "blob_key": blob.key,
+        "extracted_text": ocr_result["text"],
+        "confidence": ocr_result["confidence"],
+        "line_count": ocr_result["line_count"],
+        "ocr_lines": ocr_result.get("lines", []),
+        "status": "completed",
+        "ocr_profile": ocr_result.get("profile"),
+        "processed_at": datetime.now()
+    }
+
+
+async def _persist_documents(db: AsyncSession, rows: List[Dict], blobs: List[StoredBlob]):
+    """
+    Insert all batch results with one bulk INSERT in a single transaction
+
+    The references to the rows' blobs are counted in the same transaction.
+
+    Transient database errors (dropped connections, locked SQLite database)
+    are retried with exponential backoff.
+    """
+    if not rows:
+        return
+
+    attempts = settings.DB_WRITE_RETRIES + 1
+    for attempt in range(1, attempts + 1):
+        try:
+            with metrics.DB_COMMIT_SECONDS.labels(operation="batch_insert").time():
+                await db.execute(insert(Document), rows)
+                await storage_service.add_references(db, blobs)
+                await db.commit()
+            return
+        except (OperationalError, DBAPIError) as e:
+            await db.rollback()
+            transient = isinstance(e, OperationalError) or e.connection_invalidated
+            if not transient or attempt == attempts:
+                raise
+
+            delay = settings.DB_WRITE_RETRY_BACKOFF * (2 ** (attempt - 1))
+            logger.warning(
+                f"Batch insert attempt {attempt}/{attempts} failed ({str(e)}), retrying in {delay:.2f}s"
+            )
+            await asyncio.sleep(delay)
+
+
 @router.post("/upload-multiple")
 async def batch_upload_files(
     files: List[UploadFile] = File(...),
     background_tasks: BackgroundTasks = None,
-    db: Session = Depends(get_db)
+    ocr_profile: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
 ) -> Dict:
     """
     Upload and process multiple files at once
     
     Args:
         files: List of files to upload
+        ocr_profile: Speed profile (default: BATCH_OCR_PROFILE)
         
     Returns:
         Summary of batch upload with individual file results
@@ -39,7 +120,10 @@ async def batch_upload_files(
             detail="Maximum 10 files allowed per batch upload"
         )
     
+    ocr_profile = _batch_profile(ocr_profile)
     results = []
+    rows = []
+    blobs = []
     successful = 0
     failed = 0
     
@@ -58,37 +142,31 @@ async def batch_upload_files(
                 failed += 1
                 continue
             
-            # Save uploaded file
+            # Save uploaded file (once per distinct content)
             file_id = str(uuid.uuid4())
-            file_path = os.path.join(settings.UPLOAD_DIR, f"{file_id}{file_extension}")
-            
-            with open(file_path, "wb") as buffer:
-                content = await file.read()
-                buffer.write(content)
-            
-            # Get file size
-            file_size = len(content)
+            content = await file.read()
+            if not storage_service.has_room(len(content)):
+                results.append({
+                    "filename": file.filename,
+                    "success": False,
+                    "error": "Storage quota exceeded"
+                })
+                failed += 1
+                continue
+
+            blob = await run_in_threadpool(storage_service.blob, content, file_extension[1:])
+            await run_in_threadpool(storage_service.store, blob)
             
-            # Process OCR
+            # Process OCR (in a worker thread so the event loop keeps serving requests)
             logger.info(f"Processing batch file: {file.filename}")
-            ocr_result = ocr_service.extract_text(file_path)
+            ocr_result = await run_in_threadpool(
+                ocr_service.extract_text, storage_service.path(blob.key), profile=ocr_profile
+            )
             
             if ocr_result["success"]:
-                # Save to database
-                document = Document(
-                    id=file_id,
-                    original_filename=file.filename,
-                    stored_filename=f"{file_id}{file_extension}",
-                    file_path=file_path,
-                    file_type=file_extension[1:],
-                    file_size=file_size,
-                    extracted_text=ocr_result["text"],
-                    confidence=ocr_result["confidence"],
-                    line_count=ocr_result["line_count"],
-                    status="completed"
-                )
-                db.add(document)
-                db.commit()
+                # Queue for the single bulk insert after the loop
+                rows.append(_document_row(file_id, file.filename, blob, file_extension, ocr_result))
+                blobs.append(blob)
                 
                 results.append({
                     "filename": file.filename,
@@ -116,6 +194,12 @@ async def batch_upload_files(
             })
             failed += 1
     
+    try:
+        await _persist_documents(db, rows, blobs)
+    except Exception as e:
+        logger.error(f"Failed to save batch results: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to save batch results: {str(e)}")
+    
     return {
         "success": True,
         "message": f"Batch upload complete: {successful} successful, {failed} failed",
@@ -129,13 +213,15 @@ async def batch_upload_files(
 @router.post("/upload-zip")
 async def batch_upload_zip(
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    ocr_profile: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
 ) -> Dict:
     """
     Upload a ZIP file and process all supported files inside
     
     Args:
         file: ZIP file containing documents
+        ocr_profile: Speed profile (default: BATCH_OCR_PROFILE)
         
     Returns:
         Summary of extracted and processed files
@@ -143,12 +229,16 @@ async def batch_upload_zip(
     if not file.filename.endswith('.zip'):
         raise HTTPException(status_code=400, detail="File must be a ZIP archive")
     
+    ocr_profile = _batch_profile(ocr_profile)
+    
     try:
         # Read ZIP file
         content = await file.read()
         zip_buffer = io.BytesIO(content)
         
         results = []
+        rows = []
+        blobs = []
         successful = 0
         failed = 0
         
@@ -181,35 +271,31 @@ async def batch_upload_zip(
                 
                 try:
                     # Extract file
-                    file_data = zip_ref.read(filename)
+                    file_data = await run_in_threadpool(zip_ref.read, filename)
+                    if not storage_service.has_room(len(file_data)):
+                        results.append({
+                            "filename": filename,
+                            "success": False,
+                            "error": "Storage quota exceeded"
+                        })
+                        failed += 1
+                        continue
                     
-                    # Save to disk
+                    # Save to storage (once per distinct content)
                     file_id = str(uuid.uuid4())
-                    file_path = os.path.join(settings.UPLOAD_DIR, f"{file_id}{file_extension}")
+                    blob = await run_in_threadpool(storage_service.blob, file_data, file_extension[1:])
+                    await run_in_threadpool(storage_service.store, blob)
                     
-                    with open(file_path, "wb") as f:
-                        f.write(file_data)
-                    
-                    # Process OCR
+                    # Process OCR (in a worker thread so the event loop keeps serving requests)
                     logger.info(f"Processing ZIP file: {filename}")
-                    ocr_result = ocr_service.extract_text(file_path)
+                    ocr_result = await run_in_threadpool(
+                        ocr_service.extract_text, storage_service.path(blob.key), profile=ocr_profile
+                    )
                     
                     if ocr_result["success"]:
-                        # Save to database
-                        document = Document(
-                            id=file_id,
-                            original_filename=filename,
-                            stored_filename=f"{file_id}{file_extension}",
-                            file_path=file_path,
-                            file_type=file_extension[1:],
-                            file_size=len(file_data),
-                            extracted_text=ocr_result["text"],
-                            confidence=ocr_result["confidence"],
-                            line_count=ocr_result["line_count"],
-                            status="completed"
-                        )
-                        db.add(document)
-                        db.commit()
+                        # Queue for the single bulk insert after the loop
+                        rows.append(_document_row(file_id, filename, blob, file_extension, ocr_result))
+                        blobs.append(blob)
                         
                         results.append({
                             "filename": filename,
@@ -236,6 +322,8 @@ async def batch_upload_zip(
                     })
                     failed += 1
         
+        await _persist_documents(db, rows, blobs)
+        
         return {
             "success": True,
             "message": f"ZIP processing complete: {successful} successful, {failed} failed",
@@ -252,49 +340,94 @@ async def batch_upload_zip(
         raise HTTPException(status_code=500, detail=f"ZIP processing failed: {str(e)}")
 
 
+def _remove_files(file_paths: List[str]):
+    """Unlink files of deleted documents (runs as a background task)"""
+    removed = 0
+    for file_path in file_paths:
+        try:
+            if file_path and os.path.exists(file_path):
+                os.remove(file_path)
+                removed += 1
+        except OSError as e:
+            logger.warning(f"Could not remove {file_path}: {str(e)}")
+
+    logger.info(f"Bulk delete cleanup: removed {removed} of {len(file_paths)} files")
+
+
 @router.delete("/documents/bulk")
 async def bulk_delete_documents(
     document_ids: List[str],
-    db: Session = Depends(get_db)
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db)
 ) -> Dict:
     """
     Delete multiple documents at once
-    
+
+    Rows are removed with set-based DELETE ... WHERE id IN (...) statements in a
+    single transaction that also releases their blob references; blobs no
+    document references any more (and files stored before blobs) are deleted
+    afterwards in a background task.
+
     Args:
         document_ids: List of document IDs to delete
-        
+
     Returns:
-        Summary of deletion operation
+        Summary of deletion operation with deleted and missing IDs
     """
-    if len(document_ids) > 50:
-        raise HTTPException(status_code=400, detail="Maximum 50 documents can be deleted at once")
-    
-    deleted = 0
-    failed = 0
-    
-    for doc_id in document_ids:
-        try:
-            document = db.query(Document).filter(Document.id == doc_id).first()
-            
-            if document:
-                # Delete file from disk
-                if os.path.exists(document.file_path):
-                    os.remove(document.file_path)
-                
-                # Delete from database
-                db.delete(document)
-                db.commit()
-                deleted += 1
+    max_documents = settings.BULK_DELETE_MAX_DOCUMENTS
+    if len(document_ids) > max_documents:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Maximum {max_documents} documents can be deleted at once"
+        )
+
+    requested_ids = list(dict.fromkeys(document_ids))
+    deleted_rows = []
+    use_returning = db.bind.dialect.delete_returning
+    chunk_size = settings.BULK_DELETE_CHUNK_SIZE
+
+    try:
+        # Chunk the IN list to stay under driver bind-parameter limits
+        for offset in range(0, len(requested_ids), chunk_size):
+            chunk = requested_ids[offset:offset + chunk_size]
+
+            if use_returning:
+                deleted_rows.extend((await db.execute(
+                    delete(Document)
+                    .where(Document.id.in_(chunk))
+                    .returning(Document.id, Document.file_path, Document.blob_key)
+                )).all())
             else:
-                failed += 1
-                
-        except Exception as e:
-            logger.error(f"Error deleting document {doc_id}: {str(e)}")
-            failed += 1
-    
+                rows = (await db.execute(
+                    select(Document.id, Document.file_path, Document.blob_key).where(Document.id.in_(chunk))
+                )).all()
+                await db.execute(delete(Document).where(Document.id.in_(chunk)))
+                deleted_rows.extend(rows)
+
+            await db.execute(delete(DocumentPage).where(DocumentPage.document_id.in_(chunk)))
+
+        blob_keys = [row.blob_key for row in deleted_rows if row.blob_key]
+        await storage_service.release_references(db, blob_keys)
+
+        with metrics.DB_COMMIT_SECONDS.labels(operation="bulk_delete").time():
+            await db.commit()
+
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Bulk delete failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Bulk delete failed: {str(e)}")
+
+    deleted_ids = {row.id for row in deleted_rows}
+    missing_ids = [doc_id for doc_id in requested_ids if doc_id not in deleted_ids]
+
+    background_tasks.add_task(storage_service.collect, blob_keys)
+    background_tasks.add_task(_remove_files, [row.file_path for row in deleted_rows if not row.blob_key])
+
     return {
         "success": True,
-        "message": f"Bulk delete complete: {deleted} deleted, {failed} failed",
-        "deleted": deleted,
-        "failed": failed
+        "message": f"Bulk delete complete: {len(deleted_ids)} deleted, {len(missing_ids)} failed",
+        "deleted": len(deleted_ids),
+        "failed": len(missing_ids),
+        "deleted_ids": [doc_id for doc_id in requested_ids if doc_id in deleted_ids],
+        "missing_ids": missing_ids
     }
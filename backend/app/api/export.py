@@ -1,26 +1,56 @@
 from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
-from typing import Dict
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, List, Optional
+from urllib.parse import quote
 import os
+import shutil
 import tempfile
+import uuid
 from datetime import datetime
-from app.models.database import get_db
+from app.core.config import settings
+from app.models.database import get_async_db, SessionLocal
 from app.models.ocr_models import Document
-from app.services.export_service import export_service
+from app.services.export_service import export_service, EXPORT_FORMATS
+from app.services.dataset_export_service import dataset_export_service, DATASET_FORMATS
 
 router = APIRouter(prefix="/api/export", tags=["Export"])
 
 
+def _attachment_headers(filename: str) -> Dict[str, str]:
+    """Build a Content-Disposition header for a streamed download"""
+    quoted = quote(filename)
+    if quoted != filename:
+        return {"Content-Disposition": f"attachment; filename*=utf-8''{quoted}"}
+    return {"Content-Disposition": f'attachment; filename="{filename}"'}
+
+
+def _export_path(extension: str) -> str:
+    """Unique path for an export file in EXPORT_DIR (the download name is set separately)"""
+    os.makedirs(settings.export_dir, exist_ok=True)
+    return os.path.join(settings.export_dir, f"{uuid.uuid4().hex}.{extension}")
+
+
+def _remove_export(path: str):
+    """Delete an export file once it has been sent"""
+    if os.path.exists(path):
+        os.remove(path)
+
+
 @router.get("/document/{document_id}/txt")
 async def export_document_txt(
     document_id: str,
-    db: Session = Depends(get_db)
-) -> FileResponse:
-    """Export document OCR results as plain text file"""
+    db: AsyncSession = Depends(get_async_db)
+) -> StreamingResponse:
+    """Export document OCR results as plain text, streamed straight from the database row"""
 
     # Get document from database
-    document = db.query(Document).filter(Document.id == document_id).first()
+    document = await db.get(Document, document_id)
 
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
@@ -28,63 +58,53 @@ async def export_document_txt(
     if not document.extracted_text:
         raise HTTPException(status_code=400, detail="Document has no extracted text")
 
-    try:
-        # Create temporary file
-        output_filename = f"{document.original_filename.rsplit('.', 1)[0]}_ocr.txt"
-        output_path = os.path.join(tempfile.gettempdir(), output_filename)
-
-        # Export to TXT
-        export_service.export_to_txt(document.to_dict(), output_path)
-
-        return FileResponse(
-            output_path,
-            media_type="text/plain",
-            filename=output_filename
-        )
+    output_filename = f"{document.original_filename.rsplit('.', 1)[0]}_ocr.txt"
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
+    return StreamingResponse(
+        export_service.stream_txt(document.to_dict()),
+        media_type="text/plain; charset=utf-8",
+        headers=_attachment_headers(output_filename)
+    )
 
 
 @router.get("/document/{document_id}/json")
 async def export_document_json(
     document_id: str,
-    db: Session = Depends(get_db)
-) -> FileResponse:
-    """Export document OCR results as JSON file with metadata"""
+    compact: bool = False,
+    db: AsyncSession = Depends(get_async_db)
+) -> StreamingResponse:
+    """
+    Export document OCR results as JSON with metadata
+
+    Line data is streamed one array element at a time. Pass compact=true
+    to drop indentation and whitespace.
+    """
 
-    document = db.query(Document).filter(Document.id == document_id).first()
+    document = await db.get(Document, document_id)
 
     if not document:
-        raise HTTPException(statuscode=404, detail="Document not found")
+        raise HTTPException(status_code=404, detail="Document not found")
 
     if not document.extracted_text:
         raise HTTPException(status_code=400, detail="Document has no extracted text")
 
-    try:
-        output_filename = f"{document.original_filename.rsplit('.', 1)[0]}_ocr.json"
-        output_path = os.path.join(tempfile.gettempdir(), output_filename)
+    output_filename = f"{document.original_filename.rsplit('.', 1)[0]}_ocr.json"
 
-        export_service.export_to_json(document.to_dict(), output_path)
-
-        return FileResponse(
-            output_path,
-            media_type="application/json",
-            filename=output_filename
-        )
-
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
+    return StreamingResponse(
+        export_service.stream_json(document.to_dict(), compact=compact),
+        media_type="application/json",
+        headers=_attachment_headers(output_filename)
+    )
 
 
 @router.get("/document/{document_id}/docx")
 async def export_document_docx(
     document_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> FileResponse:
     """Export document OCR results as Microsoft Word document"""
 
-    document = db.query(Document).filter(Document.id == document_id).first()
+    document = await db.get(Document, document_id)
 
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
@@ -92,30 +112,32 @@ async def export_document_docx(
     if not document.extracted_text:
         raise HTTPException(status_code=400, detail="Document has no extracted text")
 
+    output_path = _export_path("docx")
     try:
         output_filename = f"{document.original_filename.rsplit('.', 1)[0]}_ocr.docx"
-        output_path = os.path.join(tempfile.gettempdir(), output_filename)
 
         export_service.export_to_docx(document.to_dict(), output_path)
 
         return FileResponse(
             output_path,
             media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            filename=output_filename
+            filename=output_filename,
+            background=BackgroundTask(_remove_export, output_path)
         )
 
     except Exception as e:
+        _remove_export(output_path)
         raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
 
 
 @router.get("/document/{document_id}/pdf")
 async def export_document_pdf(
     document_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> FileResponse:
     """Export document OCR results as PDF document"""
 
-    document = db.query(Document).filter(Document.id == document_id).first()
+    document = await db.get(Document, document_id)
 
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
@@ -123,17 +145,181 @@ async def export_document_pdf(
     if not document.extracted_text:
         raise HTTPException(status_code=400, detail="Document has no extracted text")
 
+    output_path = _export_path("pdf")
     try:
         output_filename = f"{document.original_filename.rsplit('.', 1)[0]}_ocr.pdf"
-        output_path = os.path.join(tempfile.gettempdir(), output_filename)
 
         export_service.export_to_pdf(document.to_dict(), output_path)
 
         return FileResponse(
             output_path,
             media_type="application/pdf",
-            filename=output_filename
+            filename=output_filename,
+            background=BackgroundTask(_remove_export, output_path)
         )
 
     except Exception as e:
+        _remove_export(output_path)
         raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
+
+
+class BulkExportRequest(BaseModel):
+    """Selection of documents for a bulk export"""
+    format: str = "txt"
+    document_ids: Optional[List[str]] = None
+    status: Optional[str] = "completed"
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+
+
+def _load_document_dict(document_id: str) -> Optional[Dict]:
+    """Load one document in its own session (called from export worker threads)"""
+    db = SessionLocal()
+    try:
+        document = db.query(Document).filter(Document.id == document_id).first()
+        return document.to_dict() if document else None
+    finally:
+        db.close()
+
+
+@router.post("/bulk")
+async def export_documents_bulk(
+    request: BulkExportRequest,
+    db: AsyncSession = Depends(get_async_db)
+) -> StreamingResponse:
+    """
+    Export many documents as a single streamed ZIP archive
+
+    Documents are selected either by explicit IDs or by a status/date filter.
+    Each document is rendered in a worker thread and written to the archive as
+    soon as it is ready; manifest.json at the end of the archive lists the
+    outcome for every requested document.
+    """
+    if request.format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported export format. Supported: {', '.join(EXPORT_FORMATS)}"
+        )
+
+    if request.document_ids is not None:
+        # Preserve request order and drop duplicates
+        document_ids = list(dict.fromkeys(request.document_ids))
+    else:
+        query = select(Document.id)
+        if request.status:
+            query = query.where(Document.status == request.status)
+        if request.created_after:
+            query = query.where(Document.created_at >= request.created_after)
+        if request.created_before:
+            query = query.where(Document.created_at < request.created_before)
+        document_ids = list(await db.scalars(query.order_by(Document.created_at).limit(
+            settings.BULK_EXPORT_MAX_DOCUMENTS + 1
+        )))
+
+    if not document_ids:
+        raise HTTPException(status_code=404, detail="No documents matched the export request")
+
+    if len(document_ids) > settings.BULK_EXPORT_MAX_DOCUMENTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Maximum {settings.BULK_EXPORT_MAX_DOCUMENTS} documents can be exported at once"
+        )
+
+    output_filename = f"ocr_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{request.format}.zip"
+    headers = _attachment_headers(output_filename)
+    headers["X-Export-Total"] = str(len(document_ids))
+
+    return StreamingResponse(
+        export_service.stream_zip(
+            document_ids,
+            request.format,
+            _load_document_dict,
+            max_workers=settings.BULK_EXPORT_WORKERS
+        ),
+        media_type="application/zip",
+        headers=headers
+    )
+
+
+def _write_dataset(
+    output_path: str,
+    dataset_format: str,
+    partition_by_date: bool,
+    status: Optional[str]
+) -> Dict:
+    """Stream every matching document's OCR lines into a columnar dataset"""
+    db = SessionLocal()
+    try:
+        query = db.query(Document).options(load_only(
+            Document.id,
+            Document.original_filename,
+            Document.created_at,
+            Document.processed_at,
+            Document.ocr_lines
+        ))
+        if status:
+            query = query.filter(Document.status == status)
+
+        documents = query.order_by(Document.created_at).yield_per(settings.DATASET_EXPORT_DOCUMENT_BATCH)
+        return dataset_export_service.write_dataset(
+            documents,
+            output_path,
+            dataset_format=dataset_format,
+            partition_by_date=partition_by_date,
+            batch_rows=settings.DATASET_EXPORT_BATCH_ROWS
+        )
+    finally:
+        db.close()
+
+
+@router.get("/dataset")
+async def export_dataset(
+    format: str = "parquet",
+    partition_by_date: bool = False,
+    status: Optional[str] = "completed"
+) -> FileResponse:
+    """
+    Export every OCR line across all documents as a columnar dataset
+
+    One row per line with document id, page, text, float32 confidence and
+    float32 bbox corner columns. Documents are streamed from the database in
+    batches so memory stays bounded. With partition_by_date the response is a
+    ZIP of Hive-style created_date=YYYY-MM-DD/ partitions.
+    """
+    if format not in DATASET_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported dataset format. Supported: {', '.join(DATASET_FORMATS)}"
+        )
+
+    os.makedirs(settings.export_dir, exist_ok=True)
+    work_dir = tempfile.mkdtemp(prefix="ocr_dataset_", dir=settings.export_dir)
+    extension = DATASET_FORMATS[format]
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+    try:
+        if partition_by_date:
+            dataset_dir = os.path.join(work_dir, "ocr_lines")
+            await run_in_threadpool(_write_dataset, dataset_dir, format, True, status)
+            os.makedirs(dataset_dir, exist_ok=True)
+            output_path = await run_in_threadpool(
+                shutil.make_archive, os.path.join(work_dir, "ocr_lines"), "zip", dataset_dir
+            )
+            output_filename = f"ocr_lines_{timestamp}_{format}.zip"
+            media_type = "application/zip"
+        else:
+            output_path = os.path.join(work_dir, f"ocr_lines.{extension}")
+            await run_in_threadpool(_write_dataset, output_path, format, False, status)
+            output_filename = f"ocr_lines_{timestamp}.{extension}"
+            media_type = "application/octet-stream"
+
+    except Exception as e:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        raise HTTPException(status_code=500, detail=f"Dataset export failed: {str(e)}")
+
+    return FileResponse(
+        output_path,
+        media_type=media_type,
+        filename=output_filename,
+        background=BackgroundTask(shutil.rmtree, work_dir, ignore_errors=True)
+    )
@@ -1,22 +1,39 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
-from sqlalchemy.orm import Session
-from typing import Dict
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Header, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, load_only
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Sequence
+import anyio
+import asyncio
+import logging
 import os
+import secrets
 import uuid
-from datetime import datetime
 from app.core.config import settings
-from app.services.ocr_service import ocr_service
-from app.models.database import get_db
-from app.models.ocr_models import Document
-
+from app.core import metrics, profiling
+from app.core.encoding import ORJSONResponse, dumps, loads, select_fields
+from app.services.document_cache import CachedResponse, document_cache, document_etag, list_etag
+from app.services.jobs import OCRJob
+from app.services.processing_service import processing_service, utc_now
+from app.services.storage_service import storage_service
+from app.services.ocr_profiles import OCR_PROFILES
+from app.models.database import AsyncSessionLocal, SessionLocal, get_async_db, get_db
+from app.models.ocr_models import DOCUMENT_FIELDS, Document
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/ocr", tags=["OCR"])
 
+# How often a running extraction checks whether its client is still connected (seconds)
+DISCONNECT_POLL_SECONDS = 0.5
+
 
 @router.post("/upload")
 async def upload_document(
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Dict:
     """
     Upload a document for OCR processing
@@ -36,11 +53,7 @@ async def upload_document(
             detail=f"File type not allowed. Supported: {', '.join(settings.ALLOWED_EXTENSIONS)}"
         )
 
-    # Generate unique filename
     unique_id = str(uuid.uuid4())
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    safe_filename = f"{timestamp}_{unique_id}.{file_ext}"
-    file_path = os.path.join(settings.UPLOAD_DIR, safe_filename)
 
     # Save file
     try:
@@ -53,154 +66,528 @@ async def upload_document(
                 detail=f"File too large. Max size: {settings.MAX_UPLOAD_SIZE / 1048576}MB"
             )
 
-        with open(file_path, "wb") as f:
-            f.write(contents)
+        if not storage_service.has_room(len(contents)):
+            raise HTTPException(status_code=507, detail="Storage quota exceeded")
+
+        # Identical content is stored once; a duplicate only adds a reference
+        blob = await run_in_threadpool(storage_service.blob, contents, file_ext)
+        with profiling.stage("upload_write"):
+            await run_in_threadpool(storage_service.store, blob)
+        file_path = storage_service.path(blob.key)
+        stored_filename = os.path.basename(file_path)
 
         # Save to database
         document = Document(
             id=unique_id,
             original_filename=file.filename,
-            stored_filename=safe_filename,
+            stored_filename=stored_filename,
             file_path=file_path,
             file_size=len(contents),
             file_type=file_ext,
+            content_hash=blob.content_hash,
+            blob_key=blob.key,
             status="uploaded"
         )
         db.add(document)
-        db.commit()
-        db.refresh(document)
+        await storage_service.add_references(db, [blob])
+        with metrics.DB_COMMIT_SECONDS.labels(operation="upload").time(), profiling.stage("db_commit"):
+            await db.commit()
 
         return {
             "success": True,
             "message": "File uploaded successfully",
             "file_id": unique_id,
-            "filename": safe_filename,
+            "filename": stored_filename,
             "original_filename": file.filename,
             "file_path": file_path,
             "file_size": len(contents)
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
 
+async def _upload_in_own_session(file: UploadFile) -> Dict:
+    """Upload a file for a handler that processes it with a (threaded) sync session"""
+    async with AsyncSessionLocal() as db:
+        return await upload_document(file, db)
+
+
+def _parse_fields(fields: Optional[str], available: Sequence[str]) -> Optional[List[str]]:
+    """Parse a comma-separated fields= parameter (None selects every field)"""
+    if fields is None:
+        return None
+
+    selected = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in selected if name not in available]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(available)}"
+        )
+    return selected
+
+
+def _is_admin(admin_token: Optional[str]) -> bool:
+    """Check the X-Admin-Token header against PROFILING_ADMIN_TOKEN (disabled when unset)"""
+    if not settings.PROFILING_ADMIN_TOKEN or not admin_token:
+        return False
+    return secrets.compare_digest(admin_token, settings.PROFILING_ADMIN_TOKEN)
+
+
 @router.post("/extract")
 async def extract_text_from_upload(
+    request: Request,
     file: UploadFile = File(...),
+    ocr_profile: Optional[str] = None,
+    profile: Optional[str] = None,
+    x_ocr_profile: Optional[str] = Header(None),
+    x_admin_token: Optional[str] = Header(None),
+    fields: Optional[str] = None,
     db: Session = Depends(get_db)
-) -> Dict:
+) -> ORJSONResponse:
     """
     Upload and immediately extract text from document
 
     Args:
         file: Document file (image or PDF)
+        ocr_profile: Speed profile ("fast", "balanced", "accurate");
+            defaults to DEFAULT_OCR_PROFILE
+        profile: "1" to include a stage timing breakdown in the response,
+            "sample" to also capture sampling-profiler reports (admin only).
+            The X-OCR-Profile header is accepted as an alternative.
+        fields: Comma-separated response fields to return, e.g.
+            "file_id,status,confidence" to leave out lines and extracted_text
         db: Database session
 
     Returns:
         Dict with extracted text and metadata
     """
-    # First upload the file
-    upload_result = await upload_document(file, db)
+    if ocr_profile and ocr_profile not in OCR_PROFILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown OCR profile. Available: {', '.join(OCR_PROFILES)}"
+        )
+    selected = _parse_fields(fields, RESULT_FIELDS)
 
-    if not upload_result["success"]:
-        raise HTTPException(status_code=500, detail="File upload failed")
+    mode = (profile or x_ocr_profile or "").lower()
+    if mode in ("", "0", "false"):
+        return ORJSONResponse(select_fields(await _extract_document(request, file, db, ocr_profile), selected))
+
+    sampling = mode == "sample"
+    if sampling and not _is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Sampling profiler requires an admin token")
+
+    with profiling.profile_request(sampling=sampling) as session:
+        result = select_fields(await _extract_document(request, file, db, ocr_profile), selected)
+
+    result["profile"] = session.summary()
+    reports = session.save_reports()
+    if reports:
+        result["profile"]["reports"] = [f"{router.prefix}/profiles/{session.id}/{name}" for name in reports]
+
+    return ORJSONResponse(result)
+
+
+@router.get("/profiles/{profile_id}/{report_name}")
+async def download_profile_report(
+    profile_id: str,
+    report_name: str,
+    x_admin_token: Optional[str] = Header(None)
+) -> FileResponse:
+    """Download a saved sampling-profiler report (admin only)"""
+    if not _is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+    path = profiling.report_path(profile_id, report_name)
+    if not path:
+        raise HTTPException(status_code=404, detail="Profile report not found")
+
+    return FileResponse(path, media_type="text/html")
+
+
+# Keys of the /extract (and /resume) response
+RESULT_FIELDS = (
+    "success", "file_id", "original_filename", "extracted_text", "confidence", "line_count", "lines",
+    "status", "error", "processed_at", "ocr_profile", "rotated_pages", "timed_out_pages"
+)
+
+
+def _result_response(document: Document, ocr_result: Dict) -> Dict:
+    return {
+        "success": ocr_result["success"],
+        "file_id": document.id,
+        "original_filename": document.original_filename,
+        "extracted_text": document.extracted_text,
+        "confidence": document.confidence,
+        "line_count": document.line_count,
+        "lines": document.ocr_lines,
+        "status": document.status,
+        "error": document.error_message,
+        "processed_at": document.processed_at.isoformat() if document.processed_at else None,
+        "ocr_profile": ocr_result.get("profile"),
+        "rotated_pages": ocr_result.get("rotated_pages", 0),
+        "timed_out_pages": ocr_result.get("timed_out_pages", [])
+    }
 
-    # Get the document from database
-    document_id = upload_result["file_id"]
+
+def _process_document(
+    db: Session,
+    document_id: str,
+    job: OCRJob,
+    ocr_profile: Optional[str] = None,
+    resume: bool = False
+) -> Dict:
+    """
+    OCR a stored document and store the results, returning the /extract body
+
+    Runs in a worker thread, so the request's (synchronous) session is only
+    used there, never on the event loop.
+    """
     document = db.query(Document).filter(Document.id == document_id).first()
 
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
 
-    # Extract text using OCR
-    file_path = document.file_path
+    if resume and document.status == "completed" and not processing_service.failed_page_count(db, document_id):
+        raise HTTPException(status_code=409, detail="Document already completed")
 
     try:
-        # Update status to processing
-        document.status = "processing"
+        # OCR with per-page checkpoints; stores the result on the document
+        ocr_result = processing_service.process(db, document, ocr_profile, job)
+    except Exception as e:
+        metrics.FAILURES_TOTAL.labels(stage="extract").inc()
+        db.rollback()
+        document.status = "failed"
+        document.error_message = str(e)
         db.commit()
+        raise HTTPException(status_code=500, detail=f"OCR processing failed: {str(e)}")
 
-        ocr_result = ocr_service.extract_text(file_path)
+    db.refresh(document)
+    return _result_response(document, ocr_result)
 
-        # Update document with OCR results
-        document.extracted_text = ocr_result.get("text", "")
-        document.confidence = ocr_result.get("confidence", 0.0)
-        document.line_count = ocr_result.get("line_count", 0)
-        document.ocr_lines = ocr_result.get("lines", [])
-        document.status = "completed" if ocr_result["success"] else "failed"
-        document.error_message = ocr_result.get("error")
-        document.processed_at = datetime.now()
 
-        db.commit()
-        db.refresh(document)
+async def _process_until_disconnect(
+    request: Request,
+    db: Session,
+    document_id: str,
+    ocr_profile: Optional[str] = None,
+    resume: bool = False
+) -> Dict:
+    """
+    Run _process_document in a worker thread, cancelling the OCR if the
+    client disconnects before it finishes
+    """
+    job = OCRJob(settings.OCR_DOCUMENT_TIMEOUT_SECONDS)
+    task = asyncio.ensure_future(
+        run_in_threadpool(_process_document, db, document_id, job, ocr_profile, resume)
+    )
+
+    while not task.done():
+        await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+        if not task.done() and not job.cancelled and await request.is_disconnected():
+            logger.info(f"🛑 Client disconnected; cancelling OCR of {document_id}")
+            metrics.CANCELLATIONS_TOTAL.labels(reason="disconnect").inc()
+            job.cancel()
+
+    return task.result()
+
+
+async def _extract_document(
+    request: Request,
+    file: UploadFile,
+    db: Session,
+    ocr_profile: Optional[str] = None
+) -> Dict:
+    """Upload a file, run OCR on it and store the results"""
+    # First upload the file
+    upload_result = await _upload_in_own_session(file)
+
+    if not upload_result["success"]:
+        raise HTTPException(status_code=500, detail="File upload failed")
+
+    return await _process_until_disconnect(request, db, upload_result["file_id"], ocr_profile)
 
-        return {
-            "success": ocr_result["success"],
-            "file_id": document.id,
-            "original_filename": document.original_filename,
-            "extracted_text": document.extracted_text,
-            "confidence": document.confidence,
-            "line_count": document.line_count,
-            "lines": document.ocr_lines,
-            "status": document.status,
-            "error": document.error_message,
-            "processed_at": document.processed_at.isoformat() if document.processed_at else None
-        }
+
+PAGE_EVENT_FIELDS = (
+    "page_num", "success", "text", "lines", "confidence", "line_count", "engine_used", "rotation", "error", "timed_out"
+)
+
+
+def _sse(event: str, data: Dict) -> str:
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {dumps(data).decode()}\n\n"
+
+
+def _stream_extraction(document_id: str, ocr_profile: Optional[str], job: OCRJob) -> Iterator[str]:
+    """
+    Run OCR on an uploaded document, emitting SSE messages as pages finish
+
+    Pages are checkpointed and the document's progress (line count,
+    confidence, heartbeat) is updated after every page. Runs in a worker
+    thread with its own database session.
+    """
+    db = SessionLocal()
+    try:
+        document = db.query(Document).filter(Document.id == document_id).first()
+        yield _sse("started", {"file_id": document.id, "original_filename": document.original_filename})
+
+        for event, data in processing_service.iter_process(db, document, ocr_profile, job):
+            if event == "page":
+                yield _sse("page", {key: data[key] for key in PAGE_EVENT_FIELDS if key in data})
+            else:
+                yield _sse("done", _result_response(document, data))
 
     except Exception as e:
-        document.status = "failed"
-        document.error_message = str(e)
-        db.commit()
-        raise HTTPException(status_code=500, detail=f"OCR processing failed: {str(e)}")
+        metrics.FAILURES_TOTAL.labels(stage="extract").inc()
+        db.rollback()
+        document = db.query(Document).filter(Document.id == document_id).first()
+        if document:
+            document.status = "failed"
+            document.error_message = str(e)
+            db.commit()
+        yield _sse("error", {"detail": f"OCR processing failed: {str(e)}"})
+
+    finally:
+        db.close()
+
+
+def _drain(messages: Iterator[str]):
+    """Run a cancelled stream to its end so the run is recorded and its resources released"""
+    for _ in messages:
+        pass
+
+
+async def _stream_until_disconnect(document_id: str, ocr_profile: Optional[str]) -> AsyncIterator[str]:
+    """Stream _stream_extraction from a worker thread, cancelling the OCR if the client goes away"""
+    job = OCRJob(settings.OCR_DOCUMENT_TIMEOUT_SECONDS)
+    messages = _stream_extraction(document_id, ocr_profile, job)
+    finished = False
+    try:
+        async for message in iterate_in_threadpool(messages):
+            yield message
+        finished = True
+    finally:
+        # Starlette cancels the response when the client disconnects
+        if not finished:
+            logger.info(f"🛑 Client disconnected; cancelling OCR of {document_id}")
+            metrics.CANCELLATIONS_TOTAL.labels(reason="disconnect").inc()
+            job.cancel()
+            # The suspended generator still holds the pool, memory reservations and
+            # session; resuming it lets the OCR stop and mark the document cancelled
+            with anyio.CancelScope(shield=True):
+                await run_in_threadpool(_drain, messages)
+
+
+@router.post("/extract/stream")
+async def extract_text_streaming(
+    file: UploadFile = File(...),
+    ocr_profile: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+) -> StreamingResponse:
+    """
+    Upload a document and stream OCR results page by page (Server-Sent Events)
+
+    Emits a "started" event with the file ID, one "page" event per page as
+    soon as it is recognised (in page order), then a "done" event with the
+    same body /extract returns. Failures end the stream with an "error" event.
+    Closing the connection cancels the remaining work.
+
+    Args:
+        file: Document file (image or PDF)
+        ocr_profile: Speed profile ("fast", "balanced", "accurate")
+        db: Database session
+    """
+    if ocr_profile and ocr_profile not in OCR_PROFILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown OCR profile. Available: {', '.join(OCR_PROFILES)}"
+        )
+
+    upload_result = await upload_document(file, db)
+    document = await db.get(Document, upload_result["file_id"])
+    document.status = "processing"
+    document.ocr_profile = ocr_profile or settings.DEFAULT_OCR_PROFILE
+    document.updated_at = utc_now()
+    await db.commit()
+
+    return StreamingResponse(
+        _stream_until_disconnect(document.id, ocr_profile),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/documents/{document_id}/resume")
+async def resume_document(
+    document_id: str,
+    request: Request,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db)
+) -> ORJSONResponse:
+    """
+    Resume an interrupted or failed document
+
+    Only pages without a successful checkpoint are processed again, using
+    the speed profile of the original run.
+
+    Args:
+        document_id: Document UUID
+        fields: Comma-separated response fields to return (as for /extract)
+        db: Database session
+
+    Returns:
+        Same body as /extract
+    """
+    selected = _parse_fields(fields, RESULT_FIELDS)
+    result = await _process_until_disconnect(request, db, document_id, resume=True)
+    return ORJSONResponse(select_fields(result, selected))
+
+
+@router.post("/documents/{document_id}/cancel")
+async def cancel_document(
+    document_id: str,
+    db: AsyncSession = Depends(get_async_db)
+) -> Dict:
+    """
+    Cancel OCR of a document that is being processed
+
+    The pool workers on the document are stopped; pages finished so far are
+    kept and the document ends up "cancelled", so it can be resumed later.
+
+    Args:
+        document_id: Document UUID
+        db: Database session
+
+    Returns:
+        Dict with cancellation status
+    """
+    document = await db.get(Document, document_id)
+
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    if not processing_service.cancel(document_id):
+        raise HTTPException(status_code=409, detail="Document is not being processed")
+
+    metrics.CANCELLATIONS_TOTAL.labels(reason="api").inc()
+    return {
+        "success": True,
+        "file_id": document_id,
+        "status": "cancelling",
+        "message": "Cancellation requested"
+    }
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Weak If-None-Match comparison"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in tags
+
+
+def _conditional_response(request: Request, cached: CachedResponse, endpoint: str) -> Response:
+    """Send a cached body, or 304 Not Modified if the client already has it"""
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request, cached.etag):
+        metrics.NOT_MODIFIED_TOTAL.labels(endpoint=endpoint).inc()
+        return Response(status_code=304, headers=headers)
+    return Response(cached.body, media_type="application/json", headers=headers)
 
 
 @router.get("/documents")
 async def list_documents(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
-) -> Dict:
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+) -> Response:
     """
     List all processed documents
 
+    Pages are served from the read cache and carry an ETag; a request with a
+    matching If-None-Match gets 304 Not Modified.
+
     Args:
         skip: Number of records to skip
         limit: Maximum number of records to return
+        fields: Comma-separated document fields to return, e.g.
+            "id,original_filename,status"; other columns aren't loaded
         db: Database session
 
     Returns:
         List of documents with pagination
     """
-    documents = db.query(Document).offset(skip).limit(limit).all()
-    total = db.query(Document).count()
+    selected = _parse_fields(fields, DOCUMENT_FIELDS)
+    cache_key = document_cache.list_key(skip, limit, selected)
+    cached = document_cache.get("list", cache_key)
 
-    return {
-        "total": total,
-        "skip": skip,
-        "limit": limit,
-        "documents": [doc.to_dict() for doc in documents]
-    }
+    if cached is None:
+        query = select(Document).offset(skip).limit(limit)
+        if selected is not None:
+            # The ETag needs id, status, line count and processed_at
+            columns = set(selected) | {"id", "status", "line_count", "processed_at"}
+            query = query.options(load_only(*(getattr(Document, name) for name in columns)))
+
+        documents = (await db.scalars(query)).all()
+        total = await db.scalar(select(func.count()).select_from(Document))
+
+        cached = CachedResponse(list_etag(documents, total), dumps({
+            "total": total,
+            "skip": skip,
+            "limit": limit,
+            "documents": [doc.to_dict(selected) for doc in documents]
+        }))
+        document_cache.set(cache_key, cached, settings.CACHE_LIST_TTL_SECONDS)
+
+    return _conditional_response(request, cached, "list_documents")
 
 
 @router.get("/documents/{document_id}")
 async def get_document(
     document_id: str,
-    db: Session = Depends(get_db)
-) -> Dict:
+    request: Request,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+) -> Response:
     """
     Get a specific document by ID
 
+    Served from the read cache with an ETag derived from processed_at; a
+    request with a matching If-None-Match gets 304 Not Modified.
+
     Args:
         document_id: Document UUID
+        fields: Comma-separated document fields to return, e.g.
+            "id,status,confidence" to leave out ocr_lines and extracted_text
         db: Database session
 
     Returns:
         Document details with OCR results
     """
-    document = db.query(Document).filter(Document.id == document_id).first()
+    selected = _parse_fields(fields, DOCUMENT_FIELDS)
+    cache_key = document_cache.document_key(document_id)
+    cached = document_cache.get("document", cache_key)
 
-    if not document:
-        raise HTTPException(status_code=404, detail="Document not found")
+    if cached is None:
+        document = await db.get(Document, document_id)
+
+        if not document:
+            raise HTTPException(status_code=404, detail="Document not found")
+
+        cached = CachedResponse(document_etag(document), dumps(document.to_dict()))
+        document_cache.set(cache_key, cached, settings.CACHE_DOCUMENT_TTL_SECONDS)
+
+    if selected is not None and not _etag_matches(request, cached.etag):
+        # One cache entry per document: project the full body
+        cached = CachedResponse(cached.etag, dumps(select_fields(loads(cached.body), selected)))
 
-    return document.to_dict()
+    return _conditional_response(request, cached, "get_document")
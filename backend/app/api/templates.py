@@ -0,0 +1,195 @@
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
+from pydantic import BaseModel, Field, field_validator
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, List, Optional
+from app.core import metrics, profiling
+from app.services.ocr_service import ocr_service
+from app.services.ocr_profiles import OCR_PROFILES
+from app.services.storage_service import storage_service
+from app.models.database import get_async_db
+from app.models.ocr_models import Document, Template
+from app.api.ocr import upload_document
+from datetime import datetime
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/templates", tags=["Templates"])
+
+
+class TemplateRegion(BaseModel):
+    """A named field on the form, in template page pixels"""
+    name: str = Field(min_length=1)
+    x: float = Field(ge=0)
+    y: float = Field(ge=0)
+    width: float = Field(gt=0)
+    height: float = Field(gt=0)
+    page: int = Field(default=1, ge=1)
+    multiline: bool = False  # Run detection inside the region instead of a single-line read
+
+
+class TemplateCreate(BaseModel):
+    """A fixed-layout form: page size plus the regions to read"""
+    name: str = Field(min_length=1)
+    description: Optional[str] = None
+    width: int = Field(gt=0)
+    height: int = Field(gt=0)
+    regions: List[TemplateRegion] = Field(min_length=1)
+
+    @field_validator("regions")
+    @classmethod
+    def unique_region_names(cls, regions: List[TemplateRegion]) -> List[TemplateRegion]:
+        names = [region.name for region in regions]
+        if len(names) != len(set(names)):
+            raise ValueError("Region names must be unique")
+        return regions
+
+
+async def _get_template(db: AsyncSession, template_ref: str) -> Template:
+    """Look a template up by ID or name"""
+    template = await db.scalar(select(Template).where(
+        (Template.id == template_ref) | (Template.name == template_ref)
+    ).limit(1))
+
+    if not template:
+        raise HTTPException(status_code=404, detail="Template not found")
+    return template
+
+
+@router.post("")
+async def create_template(
+    request: TemplateCreate,
+    db: AsyncSession = Depends(get_async_db)
+) -> Dict:
+    """
+    Register a form template
+
+    Args:
+        request: Template name, page size and named regions
+
+    Returns:
+        The stored template
+    """
+    template = Template(
+        name=request.name,
+        description=request.description,
+        width=request.width,
+        height=request.height,
+        regions=[region.model_dump() for region in request.regions]
+    )
+    db.add(template)
+
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail=f"Template '{request.name}' already exists")
+
+    await db.refresh(template)
+    return template.to_dict()
+
+
+@router.get("")
+async def list_templates(db: AsyncSession = Depends(get_async_db)) -> Dict:
+    """List registered templates"""
+    templates = (await db.scalars(select(Template).order_by(Template.name))).all()
+    return {
+        "total": len(templates),
+        "templates": [template.to_dict() for template in templates]
+    }
+
+
+@router.get("/{template_ref}")
+async def get_template(template_ref: str, db: AsyncSession = Depends(get_async_db)) -> Dict:
+    """Get a template by ID or name"""
+    return (await _get_template(db, template_ref)).to_dict()
+
+
+@router.delete("/{template_ref}")
+async def delete_template(template_ref: str, db: AsyncSession = Depends(get_async_db)) -> Dict:
+    """Delete a template by ID or name"""
+    template = await _get_template(db, template_ref)
+    await db.delete(template)
+    await db.commit()
+
+    return {
+        "success": True,
+        "message": f"Template '{template.name}' deleted"
+    }
+
+
+@router.post("/{template_ref}/extract")
+async def extract_with_template(
+    template_ref: str,
+    file: UploadFile = File(...),
+    ocr_profile: Optional[str] = None,
+    auto_orient: bool = False,
+    db: AsyncSession = Depends(get_async_db)
+) -> Dict:
+    """
+    Upload a form and read the template's regions with recognition only
+
+    Args:
+        template_ref: Template ID or name
+        file: Document file (image or PDF)
+        ocr_profile: Speed profile ("fast", "balanced", "accurate")
+        auto_orient: Turn pages scanned rotated upright before cropping
+            (confidently detected rotations only)
+
+    Returns:
+        Field name -> text/confidence map, stored like a regular extraction
+    """
+    if ocr_profile and ocr_profile not in OCR_PROFILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown OCR profile. Available: {', '.join(OCR_PROFILES)}"
+        )
+
+    template = await _get_template(db, template_ref)
+    upload_result = await upload_document(file, db)
+    document = await db.get(Document, upload_result["file_id"])
+
+    try:
+        document.status = "processing"
+        await db.commit()
+
+        file_path = await run_in_threadpool(storage_service.ensure_local, document)
+        ocr_result = await run_in_threadpool(
+            ocr_service.extract_regions, file_path, template.to_dict(),
+            profile=ocr_profile, auto_orient=auto_orient
+        )
+
+        document.extracted_text = ocr_result.get("text", "")
+        document.confidence = ocr_result.get("confidence", 0.0)
+        document.line_count = ocr_result.get("line_count", 0)
+        document.ocr_lines = ocr_result.get("lines", [])
+        document.status = "completed" if ocr_result["success"] else "failed"
+        document.error_message = ocr_result.get("error")
+        document.processed_at = datetime.now()
+
+        with metrics.DB_COMMIT_SECONDS.labels(operation="ocr_result").time(), profiling.stage("db_commit"):
+            await db.commit()
+
+        return {
+            "success": ocr_result["success"],
+            "file_id": document.id,
+            "original_filename": document.original_filename,
+            "template": template.name,
+            "fields": ocr_result.get("fields", {}),
+            "confidence": document.confidence,
+            "status": document.status,
+            "error": document.error_message,
+            "processed_at": document.processed_at.isoformat(),
+            "ocr_profile": ocr_result.get("profile")
+        }
+
+    except Exception as e:
+        metrics.FAILURES_TOTAL.labels(stage="template").inc()
+        logger.error(f"Template extraction failed: {str(e)}")
+        document.status = "failed"
+        document.error_message = str(e)
+        await db.commit()
+        raise HTTPException(status_code=500, detail=f"Template extraction failed: {str(e)}")
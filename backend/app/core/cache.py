@@ -0,0 +1,173 @@
+"""
+Key/value cache backends for API read caching
+
+Both backends store bytes with a per-entry TTL and keep integer counters
+(used as generation numbers, so a whole group of keys can be invalidated by
+bumping one counter instead of finding and deleting every key). A counter
+bumped with a TTL reads as 0 once it has gone that long without a bump:
+
+* LRUCache keeps entries in this process, bounded by entry count and total
+  size. Every API process has its own copy.
+* RedisCache shares entries between API processes through Redis. It takes
+  any client with the redis-py interface, so a local fake can stand in for
+  a server. Redis errors are logged and treated as misses; a cache outage
+  never fails a request.
+"""
+
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import threading
+import time
+import logging
+from app.core.config import settings
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+
+class LRUCache:
+    """In-process least-recently-used cache with TTLs"""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._counters: Dict[str, int] = {}
+        # Counters with a TTL, in the order they were last bumped: (value, expiry)
+        self._expiring_counters: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: float):
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self.size += len(value)
+            while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+            metrics.CACHE_BYTES.set(self.size)
+
+    def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                if key in self._entries:
+                    self._remove(key)
+            metrics.CACHE_BYTES.set(self.size)
+
+    def counter(self, key: str) -> int:
+        with self._lock:
+            if key in self._expiring_counters:
+                value, expires = self._expiring_counters[key]
+                return value if expires > time.monotonic() else 0
+            return self._counters.get(key, 0)
+
+    def incr(self, key: str, ttl: Optional[float] = None) -> int:
+        # Counters are kept apart from the entries so eviction can't reset them
+        with self._lock:
+            if not ttl:
+                self._counters[key] = self._counters.get(key, 0) + 1
+                return self._counters[key]
+
+            now = time.monotonic()
+            value, expires = self._expiring_counters.pop(key, (0, now))
+            value = value + 1 if expires > now else 1
+            self._expiring_counters[key] = (value, now + ttl)
+
+            # Counters share one TTL in practice, so the least recently bumped expire first
+            while self._expiring_counters:
+                oldest = next(iter(self._expiring_counters))
+                if self._expiring_counters[oldest][1] > now:
+                    break
+                del self._expiring_counters[oldest]
+            return value
+
+    def _remove(self, key: str):
+        value, _ = self._entries.pop(key)
+        self.size -= len(value)
+
+
+class RedisCache:
+    """Cache shared between processes through Redis"""
+
+    def __init__(self, client, prefix: str = "ocr:cache:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            return self.client.get(self.prefix + key)
+        except Exception as e:
+            logger.warning(f"Cache read failed: {str(e)}")
+            return None
+
+    def set(self, key: str, value: bytes, ttl: float):
+        try:
+            self.client.set(self.prefix + key, value, px=max(1, int(ttl * 1000)))
+        except Exception as e:
+            logger.warning(f"Cache write failed: {str(e)}")
+
+    def delete(self, *keys: str):
+        try:
+            self.client.delete(*(self.prefix + key for key in keys))
+        except Exception as e:
+            logger.warning(f"Cache delete failed: {str(e)}")
+
+    def counter(self, key: str) -> int:
+        try:
+            return int(self.client.get(self.prefix + key) or 0)
+        except Exception as e:
+            logger.warning(f"Cache read failed: {str(e)}")
+            return 0
+
+    def incr(self, key: str, ttl: Optional[float] = None) -> int:
+        try:
+            if not ttl:
+                return self.client.incr(self.prefix + key)
+            pipeline = self.client.pipeline()
+            pipeline.incr(self.prefix + key)
+            pipeline.pexpire(self.prefix + key, max(1, int(ttl * 1000)))
+            return pipeline.execute()[0]
+        except Exception as e:
+            # Entries filled under the old generation stay visible until their TTL
+            logger.error(f"Cache invalidation failed: {str(e)}")
+            return 0
+
+
+def create_cache():
+    """Build the backend selected by CACHE_BACKEND (None when caching is off)"""
+    backend = settings.CACHE_BACKEND.lower()
+
+    if backend == "none":
+        return None
+
+    if backend == "redis":
+        try:
+            import redis
+        except ImportError:
+            logger.warning("CACHE_BACKEND=redis but the redis package is not installed; using the in-process cache")
+        else:
+            client = redis.Redis.from_url(
+                settings.REDIS_URL,
+                socket_timeout=settings.CACHE_REDIS_TIMEOUT,
+                socket_connect_timeout=settings.CACHE_REDIS_TIMEOUT
+            )
+            return RedisCache(client)
+
+    return LRUCache(settings.CACHE_MAX_ENTRIES, settings.CACHE_MAX_MB * MB)
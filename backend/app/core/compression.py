@@ -0,0 +1,195 @@
+"""
+Response compression negotiated by Accept-Encoding
+
+Brotli is preferred when the client accepts it and the brotli package is
+installed, gzip otherwise. Only text-like responses of at least
+COMPRESSION_MINIMUM_BYTES are compressed; Server-Sent Events are never
+compressed (they would be held back in the compressor instead of reaching
+the client as pages finish), nor are ZIP, PDF, DOCX or Parquet downloads,
+which are compressed already.
+
+Large single-body responses are compressed in a worker thread so a
+multi-megabyte OCR result doesn't stall the event loop. Streamed responses
+are compressed chunk by chunk.
+"""
+
+from typing import Optional
+import zlib
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.core import metrics
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Media types worth compressing
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "text/plain",
+    "text/html",
+    "text/css",
+    "text/csv",
+    "text/xml"
+)
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """The content coding to use for an Accept-Encoding header, or None"""
+    accepted = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        quality = 1.0
+        name, _, value = params.partition("=")
+        if name.strip().lower() == "q":
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        if coding.strip():
+            accepted[coding.strip().lower()] = quality
+
+    # Server preference breaks ties between equal qualities
+    available = ("br", "gzip") if brotli is not None else ("gzip",)
+    wildcard = accepted.get("*", 0.0)
+    chosen, chosen_quality = None, 0.0
+    for coding in available:
+        quality = accepted.get(coding, wildcard)
+        if quality > chosen_quality:
+            chosen, chosen_quality = coding, quality
+    return chosen
+
+
+class _Compressor:
+    """Incremental gzip or brotli compressor"""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=settings.BROTLI_QUALITY)
+        else:
+            # wbits 31: zlib stream with a gzip header and trailer
+            self._zlib = zlib.compressobj(settings.GZIP_COMPRESS_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data)
+        return self._zlib.compress(data)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.finish()
+        return self._zlib.flush()
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    with metrics.RESPONSE_COMPRESS_SECONDS.labels(encoding=encoding).time():
+        compressor = _Compressor(encoding)
+        return compressor.compress(data) + compressor.finish()
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing responses with gzip or brotli"""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self.app, encoding, self.minimum_size)
+        await responder(scope, receive, send)
+
+
+class _CompressionResponder:
+    """Compresses one response"""
+
+    def __init__(self, app: ASGIApp, encoding: str, minimum_size: int):
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.send: Optional[Send] = None
+        self.start_message: Optional[Message] = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message):
+        if message["type"] == "http.response.start":
+            # Held back until the first body chunk shows whether to compress
+            self.start_message = message
+            return
+
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.passthrough:
+            await self.send(message)
+            return
+
+        if self.compressor is not None:
+            chunk = self.compressor.compress(body)
+            if not more_body:
+                chunk += self.compressor.finish()
+            await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+            return
+
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        if not self._compressible(headers) or (not more_body and len(body) < self.minimum_size):
+            self.passthrough = True
+            if not more_body and self._compressible(headers):
+                metrics.RESPONSE_BYTES.labels(encoding="raw").observe(len(body))
+                metrics.RESPONSE_BYTES.labels(encoding="identity").observe(len(body))
+            await self.send(self.start_message)
+            await self.send(message)
+            return
+
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+
+        if not more_body:
+            if len(body) >= settings.COMPRESSION_THREAD_MIN_BYTES:
+                compressed = await run_in_threadpool(compress, body, self.encoding)
+            else:
+                compressed = compress(body, self.encoding)
+            metrics.RESPONSE_BYTES.labels(encoding="raw").observe(len(body))
+            metrics.RESPONSE_BYTES.labels(encoding=self.encoding).observe(len(compressed))
+
+            headers["Content-Length"] = str(len(compressed))
+            await self.send(self.start_message)
+            await self.send({"type": "http.response.body", "body": compressed})
+            return
+
+        # Streamed body: the compressed length isn't known up front
+        del headers["Content-Length"]
+        self.compressor = _Compressor(self.encoding)
+        await self.send(self.start_message)
+        await self.send({"type": "http.response.body", "body": self.compressor.compress(body), "more_body": True})
+
+    @staticmethod
+    def _compressible(headers: MutableHeaders) -> bool:
+        if "content-encoding" in headers:
+            return False
+        media_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        return media_type in COMPRESSIBLE_TYPES
@@ -1,5 +1,6 @@
 import json
-from typing import List, Union
+import os
+from typing import Dict, List, Union
 
 from pydantic import field_validator
 from pydantic_settings import BaseSettings
@@ -8,6 +9,11 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = "sqlite:///./ocr.db"
+    ASYNC_DATABASE_URL: str = ""  # Driver URL for API handlers; derived from DATABASE_URL (asyncpg/aiosqlite) when empty
+    DB_POOL_SIZE: int = 10  # Per engine; ignored for SQLite
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_RECYCLE: int = 1800  # Seconds before a pooled connection is replaced
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # How long SQLite waits on a locked database
 
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
@@ -23,10 +29,90 @@ class Settings(BaseSettings):
     MAX_UPLOAD_SIZE: int = 10485760  # 10MB in bytes
     ALLOWED_EXTENSIONS: List[str] = ["jpg", "jpeg", "png", "pdf", "tiff", "bmp"]
 
+    # Blob Storage (uploads stored once per content hash)
+    STORAGE_BACKEND: str = "local"  # "local" (UPLOAD_DIR) or "s3" (UPLOAD_DIR caches blobs being processed)
+    STORAGE_S3_BUCKET: str = ""
+    STORAGE_S3_PREFIX: str = "uploads/"
+    STORAGE_S3_ENDPOINT_URL: str = ""  # MinIO or another S3-compatible server; AWS when empty
+    STORAGE_TEMP_DIR: str = ""  # Partial writes and OCR page images; <UPLOAD_DIR>/tmp when empty
+    EXPORT_DIR: str = ""  # DOCX/PDF and dataset export files; <STORAGE_TEMP_DIR>/exports when empty
+    STORAGE_QUOTA_MB: int = 0  # Disk used under UPLOAD_DIR; uploads are refused above it (S3: the cache is trimmed); 0 = none
+    STORAGE_RETENTION_DAYS: int = 0  # Documents older than this are deleted with their files; 0 keeps them
+
+    # Storage janitor (background cleanup of orphaned uploads, temp and export files)
+    JANITOR_ENABLED: bool = True
+    JANITOR_INTERVAL_SECONDS: int = 900  # Between cleanup passes
+    JANITOR_BATCH_SIZE: int = 200  # Files (or rows) handled per step of a pass
+    JANITOR_BATCH_PAUSE_SECONDS: float = 0.1  # Sleep between steps so live requests keep the disk
+    JANITOR_ORPHAN_GRACE_SECONDS: int = 7200  # Age before an unreferenced upload is an orphan; must exceed OCR_DOCUMENT_TIMEOUT_SECONDS
+    JANITOR_TEMP_MAX_AGE_SECONDS: int = 3600  # Temp and export files older than this are leftovers
+
     # OCR Engine Settings
     DEFAULT_OCR_ENGINE: str = "paddleocr"
     OCR_LANGUAGE: str = "en"
     OCR_CONFIDENCE_THRESHOLD: float = 0.7
+    PDF_RASTER_DPI: int = 200  # pdf2image's default resolution
+    DEFAULT_OCR_PROFILE: str = "balanced"  # fast, balanced or accurate
+    BATCH_OCR_PROFILE: str = "balanced"  # Profile for /api/batch/* uploads
+    OCR_SERVER_MODELS: bool = True  # accurate profile uses the PP-OCRv4 server models (downloaded on first use)
+    OCR_SERVER_MODEL_DIR: str = "~/.paddleocr/server"  # Where downloaded server models are kept
+    OCR_SERVER_DET_MODEL_DIR: str = ""  # Server detection model for the accurate profile; downloaded when empty
+    OCR_SERVER_REC_MODEL_DIR: str = ""  # Server recognition model for the accurate profile; downloaded (lang "ch" only) when empty
+    OCR_PROFILE_OVERRIDES: Dict[str, Dict] = {}  # e.g. {"fast": {"cpu_threads": 1}}
+    OCR_BACKEND: str = "paddle"  # "paddle", or "stub" for load testing without models
+    ORIENTATION_DETECTION: str = "off"  # off, page (check every page) or document (decide from first pages)
+    ORIENTATION_SAMPLE_PAGES: int = 3  # Pages checked in document mode
+    OCR_TILE_THRESHOLD: int = 4000  # Images with a longer side (px) are OCRed in tiles; 0 disables
+    OCR_TILE_SIZE: int = 0  # Tile side in px; 0 = the profile's det_limit_side_len
+    OCR_TILE_OVERLAP: int = 160  # Px shared by neighbouring tiles; must exceed the tallest text line
+
+    # Worker pool CPU budget (0 = derived from the usable cores and cgroup CPU quota)
+    OCR_POOL_WORKERS: int = 0  # Worker processes shared by all pools in the process
+    OCR_THREADS_PER_WORKER: int = 0  # Paddle/OpenMP/OpenCV threads in each worker
+    OCR_PIN_WORKERS: bool = False  # Pin each worker to its own slice of cores
+    OCR_WORKER_MAX_TASKS: int = 100  # Pages/tiles a worker handles before it is replaced; 0 = never
+    OCR_WORKER_MAX_RSS_MB: int = 2048  # A worker above this RSS gets its pool drained and replaced; 0 disables
+    OCR_MEMORY_BUDGET_MB: int = 0  # Estimated memory of pages in flight; 0 = half the container/physical memory
+
+    # Stub OCR engine (OCR_BACKEND=stub)
+    STUB_OCR_LATENCY_MS: float = 50.0  # Simulated model time per page
+    STUB_OCR_JITTER_MS: float = 10.0
+    STUB_OCR_LINES: int = 20  # Canned lines per page
+    STUB_OCR_PDF_PAGES: int = 3  # Pages reported for any PDF
+
+    # Deadlines
+    OCR_PAGE_TIMEOUT_SECONDS: int = 300  # A pool worker stuck on one page (or tile) this long is replaced; 0 disables
+    OCR_DOCUMENT_TIMEOUT_SECONDS: int = 3600  # Pages unfinished after this are reported as timed out; 0 disables
+
+    # Checkpointing and recovery
+    RECOVERY_ON_STARTUP: bool = True  # Resume documents interrupted by a crash or restart
+    RECOVERY_STALE_SECONDS: int = 600  # Idle time before a processing document counts as interrupted
+
+    # Batch Settings
+    DB_WRITE_RETRIES: int = 3  # Retries for transient errors on batch inserts
+    DB_WRITE_RETRY_BACKOFF: float = 0.2  # Seconds, doubled after each attempt
+    BULK_DELETE_MAX_DOCUMENTS: int = 5000
+    BULK_DELETE_CHUNK_SIZE: int = 500  # IDs per DELETE ... WHERE id IN (...) statement
+
+    # Read cache (document detail and list responses)
+    CACHE_BACKEND: str = "memory"  # "memory" (per-process LRU), "redis" (shared, REDIS_URL) or "none"
+    CACHE_MAX_ENTRIES: int = 2000  # memory backend
+    CACHE_MAX_MB: int = 256  # memory backend; large documents carry all their OCR lines
+    CACHE_DOCUMENT_TTL_SECONDS: int = 300
+    CACHE_LIST_TTL_SECONDS: int = 30
+    CACHE_REDIS_TIMEOUT: float = 0.1  # Seconds; a slow or unreachable Redis counts as a miss
+
+    # Response compression (brotli when the client accepts it and brotli is installed, else gzip)
+    COMPRESSION_MINIMUM_BYTES: int = 1024  # Smaller bodies are sent uncompressed
+    COMPRESSION_THREAD_MIN_BYTES: int = 262144  # Bodies this large are compressed off the event loop
+    GZIP_COMPRESS_LEVEL: int = 6
+    BROTLI_QUALITY: int = 4  # 0-11; higher levels are too slow for dynamic responses
+
+    # Export Settings
+    BULK_EXPORT_MAX_DOCUMENTS: int = 1000
+    BULK_EXPORT_WORKERS: int = 4
+    DATASET_EXPORT_BATCH_ROWS: int = 65536  # OCR lines buffered per columnar batch
+    DATASET_EXPORT_DOCUMENT_BATCH: int = 200  # Document rows fetched per DB round-trip
 
     # Tesseract Settings
     TESSERACT_ENABLED: bool = True
@@ -39,6 +125,11 @@ class Settings(BaseSettings):
     # Security
     SECRET_KEY: str = "dev-secret-key-change-in-production"
 
+    # Profiling
+    PROFILING_ADMIN_TOKEN: str = ""  # Enables ?profile=sample when set
+    PROFILE_DIR: str = "./profiles"
+    PROFILE_SAMPLING_INTERVAL: float = 0.001  # Seconds between profiler samples
+
     @field_validator("ALLOWED_EXTENSIONS", mode="before")
     @classmethod
     def parse_allowed_extensions(cls, value: Union[str, List[str]]) -> List[str]:
@@ -55,6 +146,15 @@ class Settings(BaseSettings):
 
         raise ValueError("Invalid ALLOWED_EXTENSIONS format")
 
+    @property
+    def storage_temp_dir(self) -> str:
+        # Inside UPLOAD_DIR by default so finished writes can be renamed into place
+        return self.STORAGE_TEMP_DIR or os.path.join(self.UPLOAD_DIR, "tmp")
+
+    @property
+    def export_dir(self) -> str:
+        return self.EXPORT_DIR or os.path.join(self.storage_temp_dir, "exports")
+
     class Config:
         env_file = ".env"
         case_sensitive = False
@@ -0,0 +1,206 @@
+"""
+CPU budgeting for OCR worker processes
+
+Every pool worker runs its own PaddleOCR engine, and Paddle (MKL/OpenMP),
+OpenBLAS and OpenCV each size their thread pools to all visible cores by
+default. With several workers that oversubscribes the machine many times
+over. The budget divides the usable cores between workers once at startup:
+
+* Usable cores are the smaller of the CPU affinity mask and the cgroup CPU
+  quota (cgroup v2 cpu.max or v1 cfs_quota_us), so containers limited to a
+  few CPUs aren't sized by the host's core count.
+* Each worker gets an equal share of threads. That share is passed to
+  PaddleOCR as cpu_threads, set for OpenCV in every worker, and exported as
+  OMP/MKL/OpenBLAS_NUM_THREADS so spawned workers load those libraries with
+  it (variables the operator already set are left alone).
+* Optionally each worker is pinned to its own slice of cores.
+* The workers are a process-wide allowance: every pool claims its workers
+  from one set of slots before spawning them, so concurrent documents and
+  tiled images share the budget instead of each starting a full pool.
+"""
+
+from typing import List, Optional
+import math
+import os
+import threading
+import logging
+import cv2
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Thread-count variables read by OpenMP, MKL and OpenBLAS when they load
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+# Most workers a pool gets when OCR_POOL_WORKERS is not set
+DEFAULT_MAX_WORKERS = 4
+
+CGROUP_V2_CPU_MAX = "/sys/fs/cgroup/cpu.max"
+CGROUP_V1_QUOTA = "/sys/fs/cgroup/cpu/cpu.cfs_quota_us"
+CGROUP_V1_PERIOD = "/sys/fs/cgroup/cpu/cpu.cfs_period_us"
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def cgroup_cpu_quota() -> Optional[float]:
+    """CPUs allowed by the container's cgroup quota, or None when unlimited"""
+    cpu_max = _read(CGROUP_V2_CPU_MAX)
+    if cpu_max:
+        quota, _, period = cpu_max.partition(" ")
+        if quota != "max" and period:
+            return int(quota) / int(period)
+        return None
+
+    quota, period = _read(CGROUP_V1_QUOTA), _read(CGROUP_V1_PERIOD)
+    if quota and period and int(quota) > 0:
+        return int(quota) / int(period)
+    return None
+
+
+def allowed_cpus() -> List[int]:
+    """CPU ids this process may run on"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+class CPUBudget:
+    """How many workers the OCR pools use and how many threads each may run"""
+
+    def __init__(
+        self,
+        cpus: List[int],
+        quota: Optional[float],
+        workers: int,
+        threads_per_worker: int,
+        pin_workers: bool = False
+    ):
+        self.cpus = cpus
+        self.quota = quota
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker
+        self.pin_workers = pin_workers
+
+    @property
+    def usable_cpus(self) -> int:
+        if self.quota is None:
+            return len(self.cpus)
+        return max(1, min(len(self.cpus), math.floor(self.quota)))
+
+    def worker_cpus(self, slot: int) -> List[int]:
+        """The cores worker `slot` is pinned to"""
+        start = slot * self.threads_per_worker % len(self.cpus)
+        return [self.cpus[(start + offset) % len(self.cpus)] for offset in range(self.threads_per_worker)]
+
+    def describe(self) -> str:
+        quota = f", cgroup quota {self.quota:g} CPUs" if self.quota is not None else ""
+        pinned = ", pinned" if self.pin_workers else ""
+        return (
+            f"{self.workers} workers × {self.threads_per_worker} threads "
+            f"({self.usable_cpus} of {len(self.cpus)} CPUs usable{quota}{pinned})"
+        )
+
+
+class WorkerSlots:
+    """
+    Process-wide count of pool workers running, capped at the budget
+
+    A pool claims what is free up to the workers it wants, so when documents
+    overlap the later ones start with fewer workers (at least one, once a
+    slot is free) rather than oversubscribing the cores.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_use = 0
+        self._condition = threading.Condition()
+
+    def try_acquire(self, wanted: int) -> int:
+        """Claim up to wanted free slots; returns how many were claimed (0 if none are free)"""
+        with self._condition:
+            granted = max(0, min(wanted, self.limit - self.in_use))
+            self.in_use += granted
+            return granted
+
+    def release(self, count: int):
+        if not count:
+            return
+        with self._condition:
+            self.in_use = max(0, self.in_use - count)
+            self._condition.notify_all()
+
+    def wait(self, timeout: float):
+        """Block until some slots are released (or timeout)"""
+        with self._condition:
+            self._condition.wait(timeout)
+
+
+def plan_cpu_budget() -> CPUBudget:
+    """
+    Divide the usable cores between OCR workers
+
+    OCR_POOL_WORKERS and OCR_THREADS_PER_WORKER override the automatic
+    choice, which leaves one core for the API process (up to
+    DEFAULT_MAX_WORKERS workers) and splits the cores evenly between workers.
+    """
+    cpus = allowed_cpus()
+    quota = cgroup_cpu_quota()
+    budget = CPUBudget(cpus, quota, 1, 1, settings.OCR_PIN_WORKERS)
+    usable = budget.usable_cpus
+
+    budget.workers = settings.OCR_POOL_WORKERS or max(1, min(DEFAULT_MAX_WORKERS, usable - 1))
+    budget.threads_per_worker = settings.OCR_THREADS_PER_WORKER or max(1, usable // budget.workers)
+    return budget
+
+
+def apply_thread_environment(threads: int):
+    """Export per-worker thread counts for processes spawned from here on"""
+    for name in THREAD_ENV_VARS:
+        os.environ.setdefault(name, str(threads))
+
+
+def limit_opencv_threads(threads: int):
+    """Limit this process's OpenCV thread pool"""
+    cv2.setNumThreads(threads)
+
+
+def pin_to_slot(budget: CPUBudget, slots) -> Optional[int]:
+    """
+    Claim a free pinning slot for this worker and restrict it to the slot's cores
+
+    slots is a shared array of worker PIDs, one entry per slot; entries of
+    workers that have exited are reused by their replacements. Returns the
+    slot, or None when every slot is taken (a replacement starting before
+    the worker it replaces has exited) and the worker is left unpinned.
+    """
+    pid = os.getpid()
+    with slots.get_lock():
+        for slot, owner in enumerate(slots):
+            if owner and _alive(owner):
+                continue
+            slots[slot] = pid
+            break
+        else:
+            return None
+
+    try:
+        os.sched_setaffinity(0, budget.worker_cpus(slot))
+    except (AttributeError, OSError) as e:
+        logger.warning(f"Could not pin OCR worker {pid}: {e}")
+    return slot
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
@@ -0,0 +1,40 @@
+"""
+Fast JSON encoding for API responses
+
+OCR results carry every recognised line with its bounding box, so big PDFs
+produce multi-megabyte bodies. They are encoded with orjson, and handlers
+on the hot paths return ORJSONResponse themselves, which also skips
+FastAPI's recursive jsonable_encoder pass over the result.
+"""
+
+from typing import Any, Dict, Iterable, Optional
+import orjson
+from starlette.responses import JSONResponse
+from app.core import metrics
+
+# numpy scalars can reach results straight from the OCR engines
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def dumps(content: Any) -> bytes:
+    """Encode content as compact UTF-8 JSON (unknown types fall back to str)"""
+    with metrics.RESPONSE_ENCODE_SECONDS.time():
+        return orjson.dumps(content, default=str, option=ORJSON_OPTIONS)
+
+
+def loads(body: bytes) -> Any:
+    return orjson.loads(body)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse encoded with orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def select_fields(data: Dict, fields: Optional[Iterable[str]]) -> Dict:
+    """The given keys of a response dict (all of them when fields is None)"""
+    if fields is None:
+        return data
+    return {key: data[key] for key in fields if key in data}
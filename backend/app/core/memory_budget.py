@@ -0,0 +1,139 @@
+"""
+Memory accounting for OCR worker processes
+
+PaddleOCR workers grow in RSS as they see differently sized inputs, so the
+page pool watches them:
+
+* Every task reports its worker's RSS afterwards. Workers are recycled after
+  OCR_WORKER_MAX_TASKS tasks (multiprocessing's maxtasksperchild), and a
+  pool whose worker crosses OCR_WORKER_MAX_RSS_MB is drained and replaced
+  by a fresh one before more pages are dispatched.
+* A process-wide budget caps the estimated working memory of the pages and
+  tiles in flight across all pools, so several large scans arriving at once
+  are dispatched a few at a time instead of all together.
+"""
+
+from typing import Optional
+import ctypes
+import gc
+import os
+import threading
+import logging
+from app.core.config import settings
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+# Share of the memory limit the in-flight budget may use when OCR_MEMORY_BUDGET_MB is 0
+AUTO_BUDGET_SHARE = 0.5
+
+# Working memory of an OCR task relative to its decoded image: resized and
+# float32-normalised copies for detection, crops for recognition
+TASK_MEMORY_FACTOR = 6
+
+CGROUP_V2_MEMORY_MAX = "/sys/fs/cgroup/memory.max"
+CGROUP_V1_MEMORY_LIMIT = "/sys/fs/cgroup/memory/memory.limit_in_bytes"
+
+
+def current_rss() -> int:
+    """Resident set size of this process in bytes (0 if unavailable)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+
+    try:
+        import resource
+        # Peak rather than current RSS, but the best available without /proc
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except (ImportError, OSError):
+        return 0
+
+
+def release_freed_memory():
+    """Collect garbage and hand freed heap pages back to the OS (glibc only)"""
+    gc.collect()
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+def memory_limit() -> Optional[int]:
+    """The container's cgroup memory limit, or physical memory, in bytes"""
+    for path in (CGROUP_V2_MEMORY_MAX, CGROUP_V1_MEMORY_LIMIT):
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+        except OSError:
+            continue
+        # cgroup v1 reports "no limit" as a huge number
+        if value.isdigit() and int(value) < 1 << 60:
+            return int(value)
+
+    try:
+        return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def image_bytes(image) -> int:
+    """Decoded size of a PIL image or numpy array"""
+    if hasattr(image, "nbytes"):
+        return int(image.nbytes)
+    width, height = image.size
+    return width * height * len(image.getbands())
+
+
+def task_memory(image) -> int:
+    """Estimated peak working memory of OCRing one page or tile"""
+    return image_bytes(image) * TASK_MEMORY_FACTOR
+
+
+class MemoryBudget:
+    """
+    Process-wide cap on the estimated memory of OCR tasks in flight
+
+    A task larger than the whole budget is still let through once nothing
+    else is in flight, so oversized pages are slowed down but never stuck.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.reserved = 0
+        self._condition = threading.Condition()
+
+    def try_reserve(self, cost: int) -> bool:
+        with self._condition:
+            if self.limit and self.reserved and self.reserved + cost > self.limit:
+                return False
+            self.reserved += cost
+            metrics.MEMORY_RESERVED_BYTES.set(self.reserved)
+            return True
+
+    def release(self, cost: int):
+        if not cost:
+            return
+        with self._condition:
+            self.reserved = max(0, self.reserved - cost)
+            metrics.MEMORY_RESERVED_BYTES.set(self.reserved)
+            self._condition.notify_all()
+
+    def wait(self, timeout: float):
+        """Block until some memory is released (or timeout)"""
+        with self._condition:
+            self._condition.wait(timeout)
+
+
+def _budget_limit() -> int:
+    if settings.OCR_MEMORY_BUDGET_MB:
+        return settings.OCR_MEMORY_BUDGET_MB * MB
+    limit = memory_limit()
+    return int(limit * AUTO_BUDGET_SHARE) if limit else 0
+
+
+# Global in-flight memory budget shared by every pool in this process
+memory_budget = MemoryBudget(_budget_limit())
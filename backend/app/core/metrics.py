@@ -0,0 +1,200 @@
+"""
+Prometheus metrics for the OCR pipeline
+
+All metrics live in the default registry and are exposed at /metrics.
+Pool workers run in separate processes, so they return their per-page
+timings in the page result and the parent process records them here.
+"""
+
+from typing import Dict
+from prometheus_client import Counter, Gauge, Histogram
+
+# Buckets tuned for OCR work: sub-millisecond DB writes up to multi-minute PDFs
+FAST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+SLOW_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+SIZE_BUCKETS = tuple(kb * 1024 for kb in (1, 4, 16, 64, 256, 1024, 4096, 16384, 65536))
+MEMORY_BUCKETS = tuple(mb * 1024 * 1024 for mb in (128, 256, 512, 768, 1024, 1536, 2048, 3072, 4096, 6144, 8192))
+
+
+# Stage timings
+UPLOAD_WRITE_SECONDS = Histogram(
+    "ocr_upload_write_seconds",
+    "Time spent writing uploaded files to disk",
+    buckets=FAST_BUCKETS
+)
+PDF_RASTERIZE_SECONDS = Histogram(
+    "ocr_pdf_rasterize_seconds",
+    "Time spent converting a PDF into page images",
+    buckets=SLOW_BUCKETS
+)
+PAGE_STAGE_SECONDS = Histogram(
+    "ocr_page_stage_seconds",
+    "Per-page PaddleOCR time by stage (det, cls, rec, total)",
+    ["stage"],
+    buckets=SLOW_BUCKETS
+)
+TESSERACT_SECONDS = Histogram(
+    "ocr_tesseract_seconds",
+    "Time spent in Tesseract extraction",
+    buckets=SLOW_BUCKETS
+)
+DB_COMMIT_SECONDS = Histogram(
+    "ocr_db_commit_seconds",
+    "Time spent committing database transactions",
+    ["operation"],
+    buckets=FAST_BUCKETS
+)
+EXPORT_SECONDS = Histogram(
+    "ocr_export_seconds",
+    "Time spent generating an export",
+    ["format"],
+    buckets=SLOW_BUCKETS
+)
+JANITOR_PASS_SECONDS = Histogram(
+    "ocr_janitor_pass_seconds",
+    "Duration of storage janitor passes, pauses included",
+    buckets=SLOW_BUCKETS
+)
+WORKER_RSS_BYTES = Histogram(
+    "ocr_worker_rss_bytes",
+    "Resident memory of a pool worker after each task",
+    ["stage"],
+    buckets=MEMORY_BUCKETS
+)
+
+# Counters
+PAGES_TOTAL = Counter(
+    "ocr_pages_total",
+    "Pages processed by OCR",
+    ["engine"]
+)
+FALLBACKS_TOTAL = Counter(
+    "ocr_fallbacks_total",
+    "Times the Tesseract fallback was attempted after low PaddleOCR confidence"
+)
+PAGES_ROTATED_TOTAL = Counter(
+    "ocr_pages_rotated_total",
+    "Pages by orientation check outcome (0, 90, 180, 270 or inconclusive)",
+    ["rotation"]
+)
+CACHE_HITS_TOTAL = Counter(
+    "ocr_cache_hits_total",
+    "Cache hits",
+    ["cache"]
+)
+CACHE_MISSES_TOTAL = Counter(
+    "ocr_cache_misses_total",
+    "Cache misses",
+    ["cache"]
+)
+FAILURES_TOTAL = Counter(
+    "ocr_failures_total",
+    "Failures by stage",
+    ["stage"]
+)
+TIMEOUTS_TOTAL = Counter(
+    "ocr_timeouts_total",
+    "Pool tasks abandoned at a deadline, by pool (page_pool, tile_pool) and deadline (page, document)",
+    ["stage", "deadline"]
+)
+WORKERS_REPLACED_TOTAL = Counter(
+    "ocr_workers_replaced_total",
+    "Hung pool worker processes killed and replaced",
+    ["stage"]
+)
+WORKER_RECYCLES_TOTAL = Counter(
+    "ocr_worker_recycles_total",
+    "Pool workers replaced to bound memory, by reason (tasks, memory)",
+    ["stage", "reason"]
+)
+WORKERS_THROTTLED_TOTAL = Counter(
+    "ocr_workers_throttled_total",
+    "Pools that waited for worker slots because other pools held the CPU budget",
+    ["stage"]
+)
+MEMORY_THROTTLED_TOTAL = Counter(
+    "ocr_memory_throttled_total",
+    "Pages/tiles whose dispatch waited for the in-flight memory budget",
+    ["stage"]
+)
+CANCELLATIONS_TOTAL = Counter(
+    "ocr_cancellations_total",
+    "OCR runs cancelled, by reason (api, disconnect)",
+    ["reason"]
+)
+RESPONSE_ENCODE_SECONDS = Histogram(
+    "ocr_response_encode_seconds",
+    "Time spent encoding JSON response bodies",
+    buckets=FAST_BUCKETS
+)
+RESPONSE_COMPRESS_SECONDS = Histogram(
+    "ocr_response_compress_seconds",
+    "Time spent compressing response bodies, by encoding (gzip, br)",
+    ["encoding"],
+    buckets=FAST_BUCKETS
+)
+RESPONSE_BYTES = Histogram(
+    "ocr_response_bytes",
+    "Compressible response bodies: size before compression (raw) and as sent (identity, gzip, br)",
+    ["encoding"],
+    buckets=SIZE_BUCKETS
+)
+CACHE_REQUESTS_TOTAL = Counter(
+    "ocr_cache_requests_total",
+    "Read cache lookups by cache (document, list) and result (hit, miss)",
+    ["cache", "result"]
+)
+CACHE_INVALIDATIONS_TOTAL = Counter(
+    "ocr_cache_invalidations_total",
+    "Read cache invalidations after document writes, by scope (document, list, all)",
+    ["scope"]
+)
+STORAGE_WRITES_TOTAL = Counter(
+    "ocr_storage_writes_total",
+    "Uploads by storage result (written, deduplicated; restored after a concurrent delete)",
+    ["result"]
+)
+STORAGE_RECLAIMED_FILES_TOTAL = Counter(
+    "ocr_storage_reclaimed_files_total",
+    "Files deleted by storage cleanup, by reason (unreferenced, orphan, legacy_orphan, temp, export, retention, cache)",
+    ["reason"]
+)
+STORAGE_RECLAIMED_BYTES_TOTAL = Counter(
+    "ocr_storage_reclaimed_bytes_total",
+    "Bytes freed by storage cleanup, by reason",
+    ["reason"]
+)
+NOT_MODIFIED_TOTAL = Counter(
+    "ocr_not_modified_total",
+    "Conditional GETs answered with 304 Not Modified",
+    ["endpoint"]
+)
+
+# Gauges
+POOL_WORKERS = Gauge(
+    "ocr_pool_workers",
+    "Page pool worker processes currently running"
+)
+MEMORY_RESERVED_BYTES = Gauge(
+    "ocr_memory_reserved_bytes",
+    "Estimated working memory of the pages and tiles currently in flight"
+)
+CACHE_BYTES = Gauge(
+    "ocr_cache_bytes",
+    "Size of the responses held in the in-process read cache"
+)
+STORAGE_USAGE_BYTES = Gauge(
+    "ocr_storage_usage_bytes",
+    "Disk usage measured by the storage janitor, by area (blobs, legacy, temp, cache)",
+    ["area"]
+)
+QUEUE_DEPTH = Gauge(
+    "ocr_page_queue_depth",
+    "Pages dispatched to the page pool and not yet finished"
+)
+
+
+def observe_page_timings(timings: Dict[str, float]):
+    """Record the stage timings returned by a page worker"""
+    for stage, seconds in timings.items():
+        PAGE_STAGE_SECONDS.labels(stage=stage).observe(seconds)
@@ -0,0 +1,153 @@
+"""
+Opt-in per-request profiling
+
+A request that asks for profiling gets a ProfileSession bound to the current
+context. Code on the OCR path wraps its stages in stage(name); when no
+session is active that costs a single ContextVar lookup, so normal requests
+pay effectively nothing.
+
+With sampling enabled (admin only) a pyinstrument sampling profiler runs for
+the request and inside each page pool worker, and the HTML reports are saved
+under PROFILE_DIR for download.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+import os
+import re
+import time
+import uuid
+import logging
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_current_session: ContextVar[Optional["ProfileSession"]] = ContextVar("ocr_profile_session", default=None)
+
+REPORT_NAME_PATTERN = re.compile(r"^[a-z0-9_]+\.html$")
+PROFILE_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+class ProfileSession:
+    """Stage timings and sampling-profiler reports collected for one request"""
+
+    def __init__(self, sampling: bool = False):
+        self.id = uuid.uuid4().hex
+        self.sampling = sampling
+        self.timings: Dict[str, float] = {}
+        self.reports: Dict[str, str] = {}
+        self.started = time.perf_counter()
+
+    def add(self, name: str, seconds: float):
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    def save_reports(self) -> list:
+        """Write collected HTML reports to PROFILE_DIR/<id>/ and return their names"""
+        if not self.reports:
+            return []
+
+        directory = os.path.join(settings.PROFILE_DIR, self.id)
+        os.makedirs(directory, exist_ok=True)
+        for name, html in self.reports.items():
+            with open(os.path.join(directory, name), "w", encoding="utf-8") as f:
+                f.write(html)
+
+        logger.info(f"Saved {len(self.reports)} profile reports to {directory}")
+        return sorted(self.reports)
+
+    def summary(self) -> Dict:
+        return {
+            "id": self.id,
+            "total_seconds": round(time.perf_counter() - self.started, 6),
+            "stages": {name: round(seconds, 6) for name, seconds in self.timings.items()},
+        }
+
+
+def current_session() -> Optional[ProfileSession]:
+    return _current_session.get()
+
+
+def sampling_enabled() -> bool:
+    session = _current_session.get()
+    return session is not None and session.sampling
+
+
+@contextmanager
+def stage(name: str):
+    """Time a block into the active profile session, if there is one"""
+    session = _current_session.get()
+    if session is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        session.add(name, time.perf_counter() - started)
+
+
+def record(name: str, seconds: float):
+    """Add an externally measured duration (e.g. from a pool worker)"""
+    session = _current_session.get()
+    if session is not None:
+        session.add(name, seconds)
+
+
+def add_report(name: str, html: Optional[str]):
+    session = _current_session.get()
+    if session is not None and html:
+        session.reports[name] = html
+
+
+@contextmanager
+def profile_request(sampling: bool = False):
+    """Bind a new ProfileSession to the current context for the duration of the block"""
+    session = ProfileSession(sampling=sampling)
+    token = _current_session.set(session)
+    profiler = None
+
+    if sampling:
+        from pyinstrument import Profiler
+        profiler = Profiler(interval=settings.PROFILE_SAMPLING_INTERVAL)
+        profiler.start()
+
+    try:
+        yield session
+    finally:
+        if profiler is not None:
+            profiler.stop()
+            session.reports["request.html"] = profiler.output_html()
+        _current_session.reset(token)
+
+
+@contextmanager
+def sample_worker(enabled: bool):
+    """
+    Run a sampling profiler inside a pool worker
+
+    Yields a dict whose "html" key holds the report once the block exits.
+    """
+    report = {}
+    if not enabled:
+        yield report
+        return
+
+    from pyinstrument import Profiler
+    profiler = Profiler(interval=settings.PROFILE_SAMPLING_INTERVAL)
+    profiler.start()
+    try:
+        yield report
+    finally:
+        profiler.stop()
+        report["html"] = profiler.output_html()
+
+
+def report_path(profile_id: str, report_name: str) -> Optional[str]:
+    """Resolve a saved report, rejecting anything that is not a plain report name"""
+    if not PROFILE_ID_PATTERN.match(profile_id) or not REPORT_NAME_PATTERN.match(report_name):
+        return None
+
+    path = os.path.join(settings.PROFILE_DIR, profile_id, report_name)
+    return path if os.path.isfile(path) else None
@@ -0,0 +1,181 @@
+"""
+Blob storage backends for uploaded documents
+
+Uploads are stored once per distinct content under a key derived from their
+SHA-256 hash, sharded two levels deep (ab/cd/abcd...ef.pdf) so no directory
+grows past a few thousand entries however many documents are stored.
+
+Both backends expose the same small interface - exists, touch, write,
+delete, ensure_local and keys - and a local path for every key, since the
+OCR engines read files from disk:
+
+* LocalStorage keeps blobs under UPLOAD_DIR; the local path is the blob.
+* S3Storage keeps blobs in an S3-compatible bucket (AWS, MinIO, or a local
+  stand-in such as moto) and uses UPLOAD_DIR, with the same layout, as a
+  cache of the blobs being processed. It takes any client with the boto3
+  S3 interface.
+
+Writes go to a temporary file in STORAGE_TEMP_DIR and are renamed into
+place, so a crash never leaves a truncated blob under its final key.
+"""
+
+from typing import Iterator, Tuple
+import os
+import time
+import uuid
+import logging
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def blob_key(content_hash: str, extension: str) -> str:
+    """Sharded storage key of a blob: ab/cd/<hash>.<ext>"""
+    return f"{content_hash[:2]}/{content_hash[2:4]}/{content_hash}.{extension}"
+
+
+def _write_atomic(path: str, data: bytes, temp_dir: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = os.path.join(temp_dir, f"{uuid.uuid4().hex}.part")
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class LocalStorage:
+    """Blobs in sharded directories on the local filesystem"""
+
+    def __init__(self, root: str, temp_dir: str):
+        self.root = root
+        self.temp_dir = temp_dir
+        os.makedirs(self.root, exist_ok=True)
+        os.makedirs(self.temp_dir, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, *key.split("/"))
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self.path(key))
+
+    def touch(self, key: str) -> bool:
+        """Mark a blob as just used (restarting the janitor's grace period); False if it's missing"""
+        try:
+            os.utime(self.path(key))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def write(self, key: str, data: bytes):
+        _write_atomic(self.path(key), data, self.temp_dir)
+
+    def delete(self, key: str):
+        _remove(self.path(key))
+
+    def ensure_local(self, key: str) -> str:
+        return self.path(key)
+
+    def keys(self) -> Iterator[Tuple[str, int, float]]:
+        """(key, size, modification time) of every stored blob"""
+        for first in sorted(os.listdir(self.root)):
+            first_dir = os.path.join(self.root, first)
+            if len(first) != 2 or not os.path.isdir(first_dir):
+                continue
+            for second in sorted(os.listdir(first_dir)):
+                second_dir = os.path.join(first_dir, second)
+                if not os.path.isdir(second_dir):
+                    continue
+                with os.scandir(second_dir) as entries:
+                    for entry in entries:
+                        if entry.is_file():
+                            stat = entry.stat()
+                            yield f"{first}/{second}/{entry.name}", stat.st_size, stat.st_mtime
+
+
+def _error_code(error: Exception) -> str:
+    return str(getattr(error, "response", {}).get("Error", {}).get("Code", ""))
+
+
+class S3Storage:
+    """Blobs in an S3-compatible bucket, cached on local disk for OCR"""
+
+    def __init__(self, client, bucket: str, prefix: str, cache: LocalStorage):
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+        self.cache = cache
+
+    def path(self, key: str) -> str:
+        return self.cache.path(key)
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.prefix + key)
+            return True
+        except Exception as e:
+            if _error_code(e) in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def touch(self, key: str) -> bool:
+        # Object timestamps can't be refreshed in place; only the cached copy is
+        if self.cache.touch(key):
+            return True
+        return self.exists(key)
+
+    def write(self, key: str, data: bytes):
+        self.client.put_object(Bucket=self.bucket, Key=self.prefix + key, Body=data)
+        # Uploads are usually OCRed right away; keep a copy so that needs no download
+        self.cache.write(key, data)
+
+    def delete(self, key: str):
+        self.client.delete_object(Bucket=self.bucket, Key=self.prefix + key)
+        self.cache.delete(key)
+
+    def ensure_local(self, key: str) -> str:
+        path = self.path(key)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = os.path.join(self.cache.temp_dir, f"{uuid.uuid4().hex}.part")
+            try:
+                self.client.download_file(self.bucket, self.prefix + key, temp_path)
+                os.replace(temp_path, path)
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+        return path
+
+    def keys(self) -> Iterator[Tuple[str, int, float]]:
+        """(key, size, modification time) of every stored blob"""
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for item in page.get("Contents", []):
+                modified = item.get("LastModified")
+                yield item["Key"][len(self.prefix):], item["Size"], modified.timestamp() if modified else time.time()
+
+
+def create_storage():
+    """Build the backend selected by STORAGE_BACKEND"""
+    local = LocalStorage(settings.UPLOAD_DIR, settings.storage_temp_dir)
+
+    if settings.STORAGE_BACKEND.lower() == "s3":
+        try:
+            import boto3
+        except ImportError:
+            raise RuntimeError("STORAGE_BACKEND=s3 requires the boto3 package")
+
+        client = boto3.client("s3", endpoint_url=settings.STORAGE_S3_ENDPOINT_URL or None)
+        return S3Storage(client, settings.STORAGE_S3_BUCKET, settings.STORAGE_S3_PREFIX, local)
+
+    return local
@@ -9,15 +9,20 @@ Created: 2024
 License: MIT
 """
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from app.core.config import settings
+from app.core.compression import CompressionMiddleware
+from app.core.encoding import ORJSONResponse
 from app.api.ocr import router as ocr_router
 from app.api.export import router as export_router
 from app.api.batch import router as batch_router
+from app.api.templates import router as templates_router
 import os
 import logging
 import sys
+import threading
 
 # Configure logging with timestamp, level, and message format
 # Outputs to stdout for container-friendly logging
@@ -38,7 +43,8 @@ app = FastAPI(
     debug=settings.DEBUG,
     description="Enterprise-grade OCR platform with dual-engine support",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS (Cross-Origin Resource Sharing) middleware
@@ -57,6 +63,9 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all headers
 )
 
+# Compress JSON and text responses with brotli or gzip, as the client accepts
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_BYTES)
+
 # Ensure upload directory exists for storing processed files
 # Creates directory with all parent directories if they don't exist
 os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
@@ -67,6 +76,7 @@ logger.info(f"Upload directory created/verified: {settings.UPLOAD_DIR}")
 app.include_router(ocr_router)      # /api/ocr/* - Single document OCR
 app.include_router(export_router)   # /api/export/* - Export operations
 app.include_router(batch_router)    # /api/batch/* - Batch processing
+app.include_router(templates_router)  # /api/templates/* - Form templates
 logger.info("All API routers registered successfully")
 
 
@@ -77,9 +87,37 @@ async def startup_event():
     logger.info(f"Environment: {settings.ENVIRONMENT}")
     logger.info(f"Debug mode: {settings.DEBUG}")
     logger.info(f"OCR Engine: {settings.DEFAULT_OCR_ENGINE}")
+
+    if settings.OCR_BACKEND != "stub":
+        # Downloads the accurate profile's server models without holding up startup
+        from app.services.ocr_profiles import start_server_model_fetch
+        start_server_model_fetch()
+
+    if settings.RECOVERY_ON_STARTUP:
+        # Resume interrupted documents without holding up startup
+        from app.services.processing_service import processing_service
+        threading.Thread(
+            target=processing_service.recover_interrupted, name="ocr-recovery", daemon=True
+        ).start()
+
+    if settings.JANITOR_ENABLED:
+        # Reclaims orphaned uploads and stale temp/export files in the background
+        from app.services.janitor_service import storage_janitor
+        storage_janitor.start()
+
     logger.info("Application startup complete")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the storage janitor and close pooled database connections"""
+    from app.services.janitor_service import storage_janitor
+    storage_janitor.stop()
+
+    from app.models.database import async_engine
+    await async_engine.dispose()
+
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -97,3 +135,9 @@ async def health_check():
         "status": "healthy",
         "environment": settings.ENVIRONMENT
     }
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    """Prometheus metrics endpoint"""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
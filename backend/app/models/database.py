@@ -1,20 +1,88 @@
-from sqlalchemy import create_engine
+from typing import Dict
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
 
 
-# Create database engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20
-)
+# asyncio drivers for the dialects DATABASE_URL may name
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite"
+}
 
 
-# Create session factory
+def async_database_url(database_url: str) -> URL:
+    """The asyncio-driver form of a database URL (ASYNC_DATABASE_URL overrides)"""
+    if settings.ASYNC_DATABASE_URL:
+        return make_url(settings.ASYNC_DATABASE_URL)
+
+    url = make_url(database_url)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if not driver:
+        raise ValueError(f"No async driver for database URL '{url.drivername}'; set ASYNC_DATABASE_URL")
+    return url.set(drivername=f"{url.get_backend_name()}+{driver}")
+
+
+def _engine_options(url: URL) -> Dict:
+    """Connection pool settings suited to the database"""
+    if url.get_backend_name() != "sqlite":
+        return {
+            "pool_pre_ping": True,
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_recycle": settings.DB_POOL_RECYCLE
+        }
+
+    if url.database in (None, "", ":memory:") or url.query.get("mode") == "memory":
+        # In-memory databases live in one shared connection; sizing options don't apply
+        return {}
+
+    # Local file: no pre-ping or recycling needed
+    options = {"pool_size": settings.DB_POOL_SIZE, "max_overflow": settings.DB_MAX_OVERFLOW}
+    if url.get_dialect().is_async:
+        # aiosqlite otherwise gets NullPool: a new connection (and thread) per session
+        options["poolclass"] = AsyncAdaptedQueuePool
+    return options
+
+
+def _configure_sqlite(engine: Engine):
+    """
+    Enable WAL on every SQLite connection
+
+    In WAL mode readers don't block the writer (or each other), so list/get
+    requests keep being served while OCR results are committed.
+    """
+    if engine.url.get_backend_name() != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.close()
+
+
+# Create database engine (OCR processing, recovery and export worker threads)
+_database_url = make_url(settings.DATABASE_URL)
+engine = create_engine(_database_url, **_engine_options(_database_url))
+_configure_sqlite(engine)
+
+
+# Create asyncio engine (API handlers)
+_async_database_url = async_database_url(settings.DATABASE_URL)
+async_engine = create_async_engine(_async_database_url, **_engine_options(_async_database_url))
+_configure_sqlite(async_engine.sync_engine)
+
+
+# Create session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 
 # Base class for models
@@ -29,3 +97,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Dependency for asyncio database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,8 +1,17 @@
 from sqlalchemy import Column, String, Integer, Float, DateTime, Text, JSON, Boolean
 from sqlalchemy.sql import func
+from typing import Iterable, Optional
+from datetime import datetime
 from app.models.database import Base
 import uuid
 
+# Keys of Document.to_dict(), in order
+DOCUMENT_FIELDS = (
+    "id", "original_filename", "stored_filename", "file_path", "file_size", "file_type",
+    "extracted_text", "confidence", "line_count", "ocr_lines", "status", "error_message",
+    "ocr_profile", "content_hash", "created_at", "processed_at"
+)
+
 
 class Document(Base):
     """Document upload record"""
@@ -14,6 +23,8 @@ class Document(Base):
     file_path = Column(String, nullable=False)
     file_size = Column(Integer, nullable=False)
     file_type = Column(String, nullable=False)
+    content_hash = Column(String, nullable=True)  # SHA-256 of the upload; NULL for files stored before blobs
+    blob_key = Column(String, nullable=True, index=True)  # Blob holding the file (file_path is its local path)
 
     # OCR Results
     extracted_text = Column(Text, nullable=True)
@@ -22,28 +33,96 @@ class Document(Base):
     ocr_lines = Column(JSON, nullable=True)  # Store bounding boxes and line details
 
     # Processing Status
-    status = Column(String, default="pending")  # pending, processing, completed, failed
+    status = Column(String, default="pending")  # pending, processing, recovering, completed, failed, cancelled
     error_message = Column(Text, nullable=True)
+    ocr_profile = Column(String, nullable=True)  # Speed profile used, so interrupted runs resume with it
+    updated_at = Column(DateTime(timezone=True), nullable=True)  # UTC heartbeat while processing; silent runs are interrupted
 
     # Metadata
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     processed_at = Column(DateTime(timezone=True), nullable=True)
 
+    def to_dict(self, fields: Optional[Iterable[str]] = None):
+        """
+        Convert model to dictionary
+
+        Only the given fields are read when fields is set, so columns left
+        out of a load_only() query are never loaded.
+        """
+        data = {}
+        for name in fields if fields is not None else DOCUMENT_FIELDS:
+            value = getattr(self, name)
+            data[name] = value.isoformat() if isinstance(value, datetime) else value
+        return data
+
+
+class Blob(Base):
+    """Stored upload content, shared by every document with the same bytes"""
+    __tablename__ = "blobs"
+
+    key = Column(String, primary_key=True)  # ab/cd/<sha256>.<ext>
+    content_hash = Column(String, nullable=False)
+    size = Column(Integer, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)  # Documents pointing at the blob
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class DocumentPage(Base):
+    """Checkpointed OCR result of one page of a multi-page document"""
+    __tablename__ = "document_pages"
+
+    document_id = Column(String, primary_key=True)
+    page_num = Column(Integer, primary_key=True)
+
+    success = Column(Boolean, nullable=False)
+    text = Column(Text, nullable=True)
+    lines = Column(JSON, nullable=True)
+    confidence = Column(Float, nullable=True)
+    line_count = Column(Integer, nullable=True)
+    engine_used = Column(String, nullable=True)
+    rotation = Column(Integer, nullable=True)
+    error_message = Column(Text, nullable=True)
+
+    processed_at = Column(DateTime(timezone=True), nullable=True)
+
+    def to_page_result(self):
+        """Rebuild the page result dict the OCR service produced"""
+        return {
+            "page_num": self.page_num,
+            "success": self.success,
+            "text": self.text or "",
+            "lines": self.lines or [],
+            "confidence": self.confidence or 0.0,
+            "line_count": self.line_count or 0,
+            "engine_used": self.engine_used,
+            "rotation": self.rotation
+        }
+
+
+class Template(Base):
+    """Fixed-layout form template: named rectangular regions to recognise"""
+    __tablename__ = "templates"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    name = Column(String, nullable=False, unique=True)
+    description = Column(Text, nullable=True)
+
+    # Page size the region coordinates refer to; uploads are scaled to it
+    width = Column(Integer, nullable=False)
+    height = Column(Integer, nullable=False)
+    regions = Column(JSON, nullable=False)  # [{name, x, y, width, height, page, multiline}]
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
     def to_dict(self):
         """Convert model to dictionary"""
         return {
             "id": self.id,
-            "original_filename": self.original_filename,
-            "stored_filename": self.stored_filename,
-            "file_path": self.file_path,
-            "file_size": self.file_size,
-            "file_type": self.file_type,
-            "extracted_text": self.extracted_text,
-            "confidence": self.confidence,
-            "line_count": self.line_count,
-            "ocr_lines": self.ocr_lines,
-            "status": self.status,
-            "error_message": self.error_message,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "processed_at": self.processed_at.isoformat() if self.processed_at else None
+            "name": self.name,
+            "description": self.description,
+            "width": self.width,
+            "height": self.height,
+            "regions": self.regions,
+            "created_at": self.created_at.isoformat() if self.created_at else None
         }
@@ -0,0 +1,184 @@
+from typing import Dict, Iterable, List, Optional
+from datetime import date
+import os
+import logging
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+# One row per OCR line; bbox corners are stored as flat float32 columns
+LINE_SCHEMA = pa.schema([
+    ("document_id", pa.string()),
+    ("original_filename", pa.string()),
+    ("created_date", pa.date32()),
+    ("processed_at", pa.timestamp("us", tz="UTC")),
+    ("page", pa.int32()),
+    ("line_index", pa.int32()),
+    ("text", pa.string()),
+    ("confidence", pa.float32()),
+    ("x0", pa.float32()), ("y0", pa.float32()),
+    ("x1", pa.float32()), ("y1", pa.float32()),
+    ("x2", pa.float32()), ("y2", pa.float32()),
+    ("x3", pa.float32()), ("y3", pa.float32()),
+])
+
+DATASET_FORMATS = {
+    "parquet": "parquet",
+    "arrow": "arrow",
+}
+
+
+class _LineBuffer:
+    """Column buffers for a bounded number of OCR lines"""
+
+    def __init__(self):
+        self.columns: Dict[str, List] = {field.name: [] for field in LINE_SCHEMA}
+
+    def __len__(self) -> int:
+        return len(self.columns["document_id"])
+
+    def add_document(self, document) -> int:
+        """Append every OCR line of a document row, returning the number of lines added"""
+        created_date = document.created_at.date() if document.created_at else None
+        lines = document.ocr_lines or []
+        columns = self.columns
+
+        for idx, line in enumerate(lines):
+            columns["document_id"].append(document.id)
+            columns["original_filename"].append(document.original_filename)
+            columns["created_date"].append(created_date)
+            columns["processed_at"].append(document.processed_at)
+            columns["page"].append(int(line.get("page", 1)))
+            columns["line_index"].append(idx)
+            columns["text"].append(line.get("text", ""))
+            columns["confidence"].append(line.get("confidence"))
+
+            bbox = line.get("bbox") or []
+            for corner in range(4):
+                point = bbox[corner] if corner < len(bbox) else (None, None)
+                columns[f"x{corner}"].append(point[0])
+                columns[f"y{corner}"].append(point[1])
+
+        return len(lines)
+
+    def to_batch(self) -> pa.RecordBatch:
+        return pa.RecordBatch.from_pydict(self.columns, schema=LINE_SCHEMA)
+
+
+class _Writer:
+    """Thin wrapper giving Parquet and Arrow IPC writers the same interface"""
+
+    def __init__(self, path: str, dataset_format: str):
+        self.path = path
+        if dataset_format == "parquet":
+            self._writer = pq.ParquetWriter(path, LINE_SCHEMA, compression="zstd")
+            self._write = self._writer.write_batch
+        else:
+            self._sink = pa.OSFile(path, "wb")
+            self._writer = ipc.new_file(self._sink, LINE_SCHEMA)
+            self._write = self._writer.write_batch
+
+    def write(self, batch: pa.RecordBatch):
+        self._write(batch)
+
+    def close(self):
+        self._writer.close()
+        if hasattr(self, "_sink"):
+            self._sink.close()
+
+
+class DatasetExportService:
+    """Service for exporting every OCR line across the corpus as a columnar dataset"""
+
+    @staticmethod
+    def write_dataset(
+        documents: Iterable,
+        output_path: str,
+        dataset_format: str = "parquet",
+        partition_by_date: bool = False,
+        batch_rows: int = 65536
+    ) -> Dict:
+        """
+        Stream document rows into a Parquet or Arrow IPC dataset
+
+        Lines are buffered column-wise and flushed every batch_rows rows, so
+        memory stays bounded no matter how large the corpus is.
+
+        Args:
+            documents: Iterable of Document rows (ideally from a yield_per query
+                ordered by created_at when partitioning)
+            output_path: File path, or directory when partition_by_date is set
+            dataset_format: "parquet" or "arrow"
+            partition_by_date: Write Hive-style created_date=YYYY-MM-DD/ partitions
+            batch_rows: Maximum number of lines buffered before a flush
+
+        Returns:
+            Dict with document, line and file counts
+        """
+        if dataset_format not in DATASET_FORMATS:
+            raise ValueError(f"Unsupported dataset format: {dataset_format}")
+
+        extension = DATASET_FORMATS[dataset_format]
+        writers: Dict[Optional[date], _Writer] = {}
+        buffer = _LineBuffer()
+        current_partition: Optional[date] = None
+        stats = {"documents": 0, "lines": 0, "batches": 0, "files": []}
+
+        def writer_for(partition: Optional[date]) -> _Writer:
+            if partition in writers:
+                return writers[partition]
+
+            if partition_by_date:
+                label = partition.isoformat() if partition else "unknown"
+                directory = os.path.join(output_path, f"created_date={label}")
+                os.makedirs(directory, exist_ok=True)
+                path = os.path.join(directory, f"part-0.{extension}")
+            else:
+                path = output_path
+
+            writers[partition] = _Writer(path, dataset_format)
+            stats["files"].append(path)
+            return writers[partition]
+
+        def flush():
+            if not len(buffer):
+                return
+            writer_for(current_partition if partition_by_date else None).write(buffer.to_batch())
+            stats["batches"] += 1
+
+        try:
+            if not partition_by_date:
+                # Always produce a (possibly empty) file
+                writer_for(None)
+
+            for document in documents:
+                partition = document.created_at.date() if document.created_at else None
+
+                if partition_by_date and partition != current_partition:
+                    flush()
+                    buffer = _LineBuffer()
+                    current_partition = partition
+
+                stats["lines"] += buffer.add_document(document)
+                stats["documents"] += 1
+
+                if len(buffer) >= batch_rows:
+                    flush()
+                    buffer = _LineBuffer()
+
+            flush()
+        finally:
+            for writer in writers.values():
+                writer.close()
+
+        logger.info(
+            f"Dataset export complete: {stats['documents']} documents, "
+            f"{stats['lines']} lines, {len(stats['files'])} files"
+        )
+        return stats
+
+
+# Global dataset export service instance
+dataset_export_service = DatasetExportService()
@@ -0,0 +1,182 @@
+"""
+Read-through cache for document detail and list responses
+
+The frontend polls GET /api/ocr/documents/{id} and the history list, so
+their serialized JSON bodies are cached (with an ETag for conditional GETs)
+instead of being re-read and re-encoded on every poll.
+
+Invalidation is driven by SQLAlchemy session events, so every committed
+write to a document - OCR pages and results, status changes, uploads, batch
+inserts, bulk deletes - from any session, sync or async, clears what it
+affects:
+
+* A document written through the ORM bumps its own generation (and drops
+  its detail entry).
+* Bulk UPDATE/DELETE statements on documents (whose rows aren't known)
+  bump the detail generation, orphaning every detail entry.
+* Any document write bumps the list generation, orphaning every list page.
+
+Keys embed the generations current before the database read, so a response
+read just before a write and stored just after it lands under a key no one
+looks up any more. Per-document generations expire a while after their
+last bump (once every entry keyed under them has expired), so they don't
+accumulate for every document ever written.
+"""
+
+from collections import namedtuple
+from itertools import chain
+from typing import Iterable, List, Optional
+import hashlib
+import logging
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.core.cache import create_cache
+from app.core.config import settings
+from app.core import metrics
+from app.models.ocr_models import Document
+
+logger = logging.getLogger(__name__)
+
+# A cached response body and its ETag
+CachedResponse = namedtuple("CachedResponse", ["etag", "body"])
+
+DOCUMENT_GENERATION = "documents:generation"
+LIST_GENERATION = "documents:lists:generation"
+
+# Per-document generation counter, bumped when the document is written
+DOCUMENT_GENERATION_KEY = "document:generation:{}"
+
+# session.info keys collecting a transaction's document writes until it commits
+WRITTEN_DOCUMENTS = "document_cache.written"
+BULK_WRITE = "document_cache.bulk_write"
+
+
+def _version(document: Document) -> str:
+    processed_at = document.processed_at.isoformat() if document.processed_at else ""
+    # Status and line count change while pages arrive, before processed_at is set
+    return f"{document.id}|{processed_at}|{document.status}|{document.line_count}"
+
+
+def document_etag(document: Document) -> str:
+    """ETag of a document's detail response, derived from processed_at"""
+    return f'W/"{hashlib.sha1(_version(document).encode()).hexdigest()}"'
+
+
+def list_etag(documents: Iterable[Document], total: int) -> str:
+    """ETag of a page of the document list"""
+    digest = hashlib.sha1(str(total).encode())
+    for document in documents:
+        digest.update(b"\n" + _version(document).encode())
+    return f'W/"{digest.hexdigest()}"'
+
+
+class DocumentCache:
+    """Cached document detail and list responses in the configured backend"""
+
+    def __init__(self, backend=None):
+        self.backend = backend
+
+    def document_key(self, document_id: str) -> Optional[str]:
+        if self.backend is None:
+            return None
+        generation = self.backend.counter(DOCUMENT_GENERATION)
+        document_generation = self.backend.counter(DOCUMENT_GENERATION_KEY.format(document_id))
+        return f"document:{generation}:{document_generation}:{document_id}"
+
+    def list_key(self, skip: int, limit: int, fields: Optional[List[str]] = None) -> Optional[str]:
+        if self.backend is None:
+            return None
+        selection = ",".join(fields) if fields is not None else "*"
+        return f"documents:{self.backend.counter(LIST_GENERATION)}:{skip}:{limit}:{selection}"
+
+    def get(self, cache: str, key: Optional[str]) -> Optional[CachedResponse]:
+        """Look a response up; cache ("document" or "list") labels the hit-rate metrics"""
+        if key is None:
+            return None
+
+        value = self.backend.get(key)
+        metrics.CACHE_REQUESTS_TOTAL.labels(cache=cache, result="hit" if value is not None else "miss").inc()
+        if value is None:
+            return None
+
+        etag, _, body = value.partition(b"\n")
+        return CachedResponse(etag.decode(), body)
+
+    def set(self, key: Optional[str], response: CachedResponse, ttl: float):
+        if key is None:
+            return
+        self.backend.set(key, response.etag.encode() + b"\n" + response.body, ttl)
+
+    def invalidate(self, document_ids: Iterable[str]):
+        """Drop the detail entries of written documents and every list page"""
+        if self.backend is None:
+            return
+
+        document_ids = list(document_ids)
+        keys = [self.document_key(document_id) for document_id in document_ids]
+        if keys:
+            # Bumped as well as deleted, so a response read before the write can't be stored after it.
+            # The generation outlives the entries under it, so once it expires back to 0 none are left
+            generation_ttl = 2 * settings.CACHE_DOCUMENT_TTL_SECONDS
+            for document_id in document_ids:
+                self.backend.incr(DOCUMENT_GENERATION_KEY.format(document_id), generation_ttl)
+            self.backend.delete(*keys)
+            metrics.CACHE_INVALIDATIONS_TOTAL.labels(scope="document").inc(len(keys))
+        self.backend.incr(LIST_GENERATION)
+        metrics.CACHE_INVALIDATIONS_TOTAL.labels(scope="list").inc()
+
+    def invalidate_all(self):
+        """Drop every detail entry and list page"""
+        if self.backend is None:
+            return
+
+        self.backend.incr(DOCUMENT_GENERATION)
+        self.backend.incr(LIST_GENERATION)
+        metrics.CACHE_INVALIDATIONS_TOTAL.labels(scope="all").inc()
+
+
+# Global document cache instance
+document_cache = DocumentCache(create_cache())
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_document_writes(session, flush_context):
+    document_ids = [
+        instance.id for instance in chain(session.new, session.dirty, session.deleted)
+        if isinstance(instance, Document)
+    ]
+    if document_ids:
+        session.info.setdefault(WRITTEN_DOCUMENTS, set()).update(document_ids)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_writes(orm_execute_state):
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None or mapper.class_ is not Document:
+        return
+
+    if orm_execute_state.is_insert:
+        # New rows have no detail entries yet; only the lists change
+        orm_execute_state.session.info.setdefault(WRITTEN_DOCUMENTS, set())
+    else:
+        orm_execute_state.session.info[BULK_WRITE] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_writes(session):
+    written = session.info.pop(WRITTEN_DOCUMENTS, None)
+    bulk_write = session.info.pop(BULK_WRITE, False)
+
+    if bulk_write:
+        document_cache.invalidate_all()
+    elif written is not None:
+        document_cache.invalidate(written)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_writes(session):
+    session.info.pop(WRITTEN_DOCUMENTS, None)
+    session.info.pop(BULK_WRITE, None)
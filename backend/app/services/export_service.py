@@ -1,5 +1,9 @@
-from typing import Dict
+from typing import Callable, Dict, Iterator, List, Optional
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import json
+import tempfile
+import time
+import zipfile
 from docx import Document as DocxDocument
 from docx.shared import Pt, Inches
 from reportlab.lib.pagesizes import letter
@@ -10,27 +14,104 @@ from reportlab.lib.enums import TA_JUSTIFY
 from datetime import datetime
 import os
 import logging
+from app.core import metrics
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Target size of each chunk yielded by the streaming exporters
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Supported export formats: format -> (media type, already compressed)
+EXPORT_FORMATS = {
+    "txt": ("text/plain", False),
+    "json": ("application/json", False),
+    "docx": ("application/vnd.openxmlformats-officedocument.wordprocessingml.document", True),
+    "pdf": ("application/pdf", True),
+}
+
 
 class ExportService:
     """Service for exporting OCR results to various formats"""
 
+    @staticmethod
+    def stream_txt(document: Dict) -> Iterator[bytes]:
+        """Stream OCR results as plain text, chunk by chunk"""
+        def parts():
+            yield f"OCR Results - {document['original_filename']}\n"
+            yield f"{'='*60}\n\n"
+            yield f"Processed: {document['processed_at']}\n"
+            yield f"Confidence: {document['confidence']:.2%}\n"
+            yield f"Total Lines: {document['line_count']}\n"
+            yield f"\n{'='*60}\n"
+            yield f"EXTRACTED TEXT\n"
+            yield f"{'='*60}\n\n"
+
+            text = document['extracted_text'] or ""
+            for offset in range(0, len(text), STREAM_CHUNK_SIZE):
+                yield text[offset:offset + STREAM_CHUNK_SIZE]
+
+        return _chunked(parts(), "txt")
+
+    @staticmethod
+    def stream_json(document: Dict, compact: bool = False) -> Iterator[bytes]:
+        """
+        Stream OCR results as JSON, emitting line data one array element at a time
+
+        The indented output is identical to json.dump(..., indent=2); compact
+        mode drops all optional whitespace.
+        """
+        indent = None if compact else 2
+        separators = (',', ':') if compact else (',', ': ')
+        newline = "" if compact else "\n"
+        pad = "" if compact else "  "
+        colon = separators[1]
+
+        def dumps(value, level: int) -> str:
+            encoded = json.dumps(value, indent=indent, separators=separators, ensure_ascii=False)
+            # JSON strings never contain raw newlines, so this only re-indents structure
+            return encoded.replace("\n", "\n" + pad * level)
+
+        document_info = {
+            "id": document['id'],
+            "original_filename": document['original_filename'],
+            "file_size": document['file_size'],
+            "file_type": document['file_type'],
+            "processed_at": document['processed_at'],
+            "created_at": document['created_at']
+        }
+        ocr_results = {
+            "extracted_text": document['extracted_text'],
+            "confidence": document['confidence'],
+            "line_count": document['line_count'],
+            "status": document['status']
+        }
+        lines = document.get('ocr_lines') or []
+
+        def parts():
+            yield "{" + newline
+            yield f'{pad}"document_info"{colon}{dumps(document_info, 1)},{newline}'
+            yield f'{pad}"ocr_results"{colon}{dumps(ocr_results, 1)},{newline}'
+
+            if not lines:
+                yield f'{pad}"detailed_lines"{colon}[]{newline}}}'
+                return
+
+            yield f'{pad}"detailed_lines"{colon}[{newline}'
+            for idx, line in enumerate(lines):
+                prefix = f",{newline}" if idx else ""
+                yield prefix + pad * 2 + dumps(line, 2)
+            yield f"{newline}{pad}]{newline}}}"
+
+        return _chunked(parts(), "json")
+
     @staticmethod
     def export_to_txt(document: Dict, output_path: str) -> str:
         """Export OCR results to plain text file"""
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(f"OCR Results - {document['original_filename']}\n")
-                f.write(f"{'='*60}\n\n")
-                f.write(f"Processed: {document['processed_at']}\n")
-                f.write(f"Confidence: {document['confidence']:.2%}\n")
-                f.write(f"Total Lines: {document['line_count']}\n")
-                f.write(f"\n{'='*60}\n")
-                f.write(f"EXTRACTED TEXT\n")
-                f.write(f"{'='*60}\n\n")
-                f.write(document['extracted_text'])
+            with open(output_path, 'wb') as f:
+                for chunk in ExportService.stream_txt(document):
+                    f.write(chunk)
 
             logger.info(f"Exported to TXT: {output_path}")
             return output_path
@@ -40,29 +121,12 @@ class ExportService:
             raise
 
     @staticmethod
-    def export_to_json(document: Dict, output_path: str) -> str:
+    def export_to_json(document: Dict, output_path: str, compact: bool = False) -> str:
         """Export OCR results to JSON file with full metadata"""
         try:
-            export_data = {
-                "document_info": {
-                    "id": document['id'],
-                    "original_filename": document['original_filename'],
-                    "file_size": document['file_size'],
-                    "file_type": document['file_type'],
-                    "processed_at": document['processed_at'],
-                    "created_at": document['created_at']
-                },
-                "ocr_results": {
-                    "extracted_text": document['extracted_text'],
-                    "confidence": document['confidence'],
-                    "line_count": document['line_count'],
-                    "status": document['status']
-                },
-                "detailed_lines": document.get('ocr_lines', [])
-            }
-
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(export_data, f, indent=2, ensure_ascii=False)
+            with open(output_path, 'wb') as f:
+                for chunk in ExportService.stream_json(document, compact=compact):
+                    f.write(chunk)
 
             logger.info(f"Exported to JSON: {output_path}")
             return output_path
@@ -74,6 +138,11 @@ class ExportService:
     @staticmethod
     def export_to_docx(document: Dict, output_path: str) -> str:
         """Export OCR results to Microsoft Word document"""
+        with metrics.EXPORT_SECONDS.labels(format="docx").time():
+            return ExportService._export_to_docx(document, output_path)
+
+    @staticmethod
+    def _export_to_docx(document: Dict, output_path: str) -> str:
         try:
             doc = DocxDocument()
 
@@ -125,6 +194,11 @@ class ExportService:
     @staticmethod
     def export_to_pdf(document: Dict, output_path: str) -> str:
         """Export OCR results to PDF document"""
+        with metrics.EXPORT_SECONDS.labels(format="pdf").time():
+            return ExportService._export_to_pdf(document, output_path)
+
+    @staticmethod
+    def _export_to_pdf(document: Dict, output_path: str) -> str:
         try:
             doc = SimpleDocTemplate(output_path, pagesize=letter,
                                     rightMargin=72, leftMargin=72,
@@ -180,6 +254,197 @@ class ExportService:
             logger.error(f"PDF export failed: {str(e)}")
             raise
 
+    @staticmethod
+    def render(document: Dict, export_format: str) -> bytes:
+        """Render a single document to bytes in the given export format"""
+        if export_format == "txt":
+            return b"".join(ExportService.stream_txt(document))
+
+        if export_format == "json":
+            return b"".join(ExportService.stream_json(document))
+
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {export_format}")
+
+        # DOCX/PDF writers need a real file path
+        os.makedirs(settings.export_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(suffix=f".{export_format}", dir=settings.export_dir)
+        os.close(fd)
+        try:
+            if export_format == "docx":
+                ExportService.export_to_docx(document, temp_path)
+            else:
+                ExportService.export_to_pdf(document, temp_path)
+
+            with open(temp_path, 'rb') as f:
+                return f.read()
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    @staticmethod
+    def stream_zip(
+        document_ids: List[str],
+        export_format: str,
+        load_document: Callable[[str], Optional[Dict]],
+        max_workers: int = 4
+    ) -> Iterator[bytes]:
+        """
+        Render many documents in parallel and stream them as a ZIP archive
+
+        Entries are written as soon as each document finishes rendering, and
+        only a bounded window of rendered documents is held in memory at once.
+        A manifest.json with per-document status is appended as the last entry.
+
+        Args:
+            document_ids: IDs of the documents to export
+            export_format: One of EXPORT_FORMATS
+            load_document: Returns the document dict for an ID, or None if missing
+            max_workers: Number of parallel render workers
+        """
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {export_format}")
+
+        _, precompressed = EXPORT_FORMATS[export_format]
+        compression = zipfile.ZIP_STORED if precompressed else zipfile.ZIP_DEFLATED
+
+        def render_one(document_id: str) -> Dict:
+            document = load_document(document_id)
+            if document is None:
+                raise LookupError("Document not found")
+            if not document.get('extracted_text'):
+                raise ValueError("Document has no extracted text")
+
+            base_name = document['original_filename'].rsplit('.', 1)[0]
+            return {
+                "name": f"{base_name}_{document_id[:8]}_ocr.{export_format}",
+                "data": ExportService.render(document, export_format)
+            }
+
+        sink = _ZipSink()
+        manifest = {
+            "format": export_format,
+            "total": len(document_ids),
+            "succeeded": 0,
+            "failed": 0,
+            "documents": []
+        }
+        started = time.perf_counter()
+
+        with zipfile.ZipFile(sink, 'w', compression=compression) as archive:
+            with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+                pending = {}
+                remaining = iter(document_ids)
+                window = max(1, max_workers) * 2
+
+                def refill():
+                    while len(pending) < window:
+                        document_id = next(remaining, None)
+                        if document_id is None:
+                            return
+                        pending[executor.submit(render_one, document_id)] = document_id
+
+                refill()
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+                    for future in done:
+                        document_id = pending.pop(future)
+                        try:
+                            entry = future.result()
+                            archive.writestr(entry["name"], entry["data"])
+                            manifest["documents"].append({
+                                "id": document_id,
+                                "status": "exported",
+                                "filename": entry["name"],
+                                "size": len(entry["data"])
+                            })
+                            manifest["succeeded"] += 1
+                        except Exception as e:
+                            logger.warning(f"Bulk export skipped {document_id}: {str(e)}")
+                            manifest["documents"].append({
+                                "id": document_id,
+                                "status": "failed",
+                                "error": str(e)
+                            })
+                            manifest["failed"] += 1
+
+                    refill()
+                    chunk = sink.drain()
+                    if chunk:
+                        yield chunk
+
+            manifest["duration_seconds"] = round(time.perf_counter() - started, 3)
+            archive.writestr("manifest.json", json.dumps(manifest, indent=2, ensure_ascii=False),
+                             compress_type=zipfile.ZIP_DEFLATED)
+
+        logger.info(
+            f"Bulk export complete: {manifest['succeeded']} exported, {manifest['failed']} failed"
+        )
+        chunk = sink.drain()
+        if chunk:
+            yield chunk
+
+
+class _ZipSink:
+    """Write-only, non-seekable buffer that zipfile streams into and we drain from"""
+
+    def __init__(self):
+        self._parts = []
+        self._offset = 0
+
+    def write(self, data: bytes) -> int:
+        self._parts.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        # zipfile only needs the running offset to build the central directory
+        return self._offset
+
+    def seek(self, *args):
+        raise OSError("ZIP stream is not seekable")
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def _chunked(parts: Iterator[str], export_format: str) -> Iterator[bytes]:
+    """
+    Coalesce small text fragments into UTF-8 chunks of roughly STREAM_CHUNK_SIZE bytes
+
+    Only time spent producing chunks is recorded, not time the consumer
+    spends sending them.
+    """
+    buffer = []
+    size = 0
+    elapsed = 0.0
+    started = time.perf_counter()
+
+    for part in parts:
+        encoded = part.encode('utf-8')
+        buffer.append(encoded)
+        size += len(encoded)
+
+        if size >= STREAM_CHUNK_SIZE:
+            chunk = b"".join(buffer)
+            buffer = []
+            size = 0
+            elapsed += time.perf_counter() - started
+            yield chunk
+            started = time.perf_counter()
+
+    chunk = b"".join(buffer)
+    elapsed += time.perf_counter() - started
+    metrics.EXPORT_SECONDS.labels(format=export_format).observe(elapsed)
+    if chunk:
+        yield chunk
+
 
 # Global export service instance
 export_service = ExportService()
@@ -0,0 +1,340 @@
+"""
+Storage janitor: background cleanup of uploads, temp and export files
+
+Each pass, run every JANITOR_INTERVAL_SECONDS on a background thread:
+
+1. Removes temp files (partial writes, OCR page images) and export files
+   older than JANITOR_TEMP_MAX_AGE_SECONDS - what crashed workers and
+   interrupted requests leave behind.
+2. Deletes documents older than STORAGE_RETENTION_DAYS, if set, releasing
+   their blobs.
+3. Collects blobs no document references any more.
+4. Reconciles stored blobs against the blobs table. Files without a row
+   (batch uploads whose OCR failed) are deleted once older than
+   JANITOR_ORPHAN_GRACE_SECONDS.
+5. Reconciles uploads stored before content addressing (flat files in
+   UPLOAD_DIR) against documents.file_path the same way.
+6. Enforces STORAGE_QUOTA_MB: the measured usage is handed to the storage
+   service, which refuses uploads while it's over the quota; with S3 the
+   least recently used copies in the local cache are deleted instead.
+
+The work is incremental: files and rows are handled JANITOR_BATCH_SIZE at a
+time with a JANITOR_BATCH_PAUSE_SECONDS sleep in between, and the thread
+runs at the lowest CPU priority (on Linux its best-effort I/O priority
+follows), so a pass over a large UPLOAD_DIR never stalls live requests.
+Reclaimed bytes are counted in ocr_storage_reclaimed_bytes_total{reason}
+and logged at the end of each pass.
+"""
+
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import logging
+import os
+import threading
+import time
+from sqlalchemy import delete, select
+from app.core import metrics
+from app.core.config import settings
+from app.core.storage import S3Storage
+from app.models.database import SessionLocal
+from app.models.ocr_models import Blob, Document, DocumentPage
+from app.services.storage_service import StorageService, storage_service
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+
+def _lower_priority():
+    # On Linux this renices only the calling thread
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+    except (AttributeError, OSError):
+        pass
+
+
+def _walk_files(root: str) -> Iterator[Tuple[str, os.stat_result]]:
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            try:
+                yield path, os.stat(path)
+            except FileNotFoundError:
+                continue
+
+
+class StorageJanitor:
+    """Reclaims disk space from orphaned, stale and expired files"""
+
+    def __init__(self, storage: StorageService):
+        self.storage = storage
+        self.last_report: Optional[Dict] = None
+        self._reclaimed: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Run passes on a background thread until stop() is called"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="storage-janitor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        _lower_priority()
+        while not self._stop.is_set():
+            try:
+                self.run_pass()
+            except Exception as e:
+                logger.error(f"Storage janitor pass failed: {str(e)}")
+            self._stop.wait(settings.JANITOR_INTERVAL_SECONDS)
+
+    def run_pass(self) -> Dict:
+        """Run one cleanup pass; returns the bytes reclaimed (by reason) and the usage measured"""
+        started = time.monotonic()
+        self._reclaimed = Counter()
+        usage = {}
+
+        with metrics.JANITOR_PASS_SECONDS.time():
+            usage["temp"] = self._sweep_temp()
+            if settings.STORAGE_RETENTION_DAYS:
+                self._expire_documents()
+            self._collect_unreferenced()
+            usage["blobs"] = self._reconcile_blobs()
+            usage["legacy"] = self._reconcile_legacy()
+            if isinstance(self.storage.backend, S3Storage):
+                usage["cache"] = self._trim_cache()
+
+        # A pass cut short by stop() has only seen part of the files
+        if not self._stop.is_set():
+            for area, size in usage.items():
+                metrics.STORAGE_USAGE_BYTES.labels(area=area).set(size)
+            self._enforce_quota(usage)
+
+        report = {
+            "reclaimed_bytes": dict(self._reclaimed),
+            "reclaimed_total_bytes": sum(self._reclaimed.values()),
+            "usage_bytes": usage,
+            "seconds": round(time.monotonic() - started, 3)
+        }
+        self.last_report = report
+        logger.info(
+            f"🧹 Storage janitor: reclaimed {report['reclaimed_total_bytes'] / MB:.1f} MB "
+            f"{report['reclaimed_bytes']} in {report['seconds']}s"
+        )
+        return report
+
+    def _batches(self, items: Iterable) -> Iterator[List]:
+        """Split work into JANITOR_BATCH_SIZE steps, pausing between them (stops early on stop())"""
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) >= settings.JANITOR_BATCH_SIZE:
+                yield batch
+                batch = []
+                if self._stop.wait(settings.JANITOR_BATCH_PAUSE_SECONDS):
+                    return
+        if batch:
+            yield batch
+
+    def _remove_file(self, path: str, size: int, reason: str) -> bool:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            logger.warning(f"Could not remove {path}: {str(e)}")
+            return False
+        self._count(reason, size)
+        return True
+
+    def _count(self, reason: str, size: int):
+        self._reclaimed[reason] += size
+        metrics.STORAGE_RECLAIMED_FILES_TOTAL.labels(reason=reason).inc()
+        metrics.STORAGE_RECLAIMED_BYTES_TOTAL.labels(reason=reason).inc(size)
+
+    def _sweep_temp(self) -> int:
+        """Remove stale temp and export files; returns the bytes left"""
+        temp_dir = settings.storage_temp_dir
+        export_dir = settings.export_dir
+        roots = [(temp_dir, "temp")]
+        if not os.path.abspath(export_dir).startswith(os.path.abspath(temp_dir) + os.sep):
+            roots.append((export_dir, "export"))
+
+        cutoff = time.time() - settings.JANITOR_TEMP_MAX_AGE_SECONDS
+        export_prefix = os.path.abspath(export_dir) + os.sep
+        remaining = 0
+
+        for root, reason in roots:
+            if not os.path.isdir(root):
+                continue
+            emptied = set()
+            for batch in self._batches(_walk_files(root)):
+                for path, stat in batch:
+                    if stat.st_mtime < cutoff:
+                        file_reason = "export" if os.path.abspath(path).startswith(export_prefix) else reason
+                        if self._remove_file(path, stat.st_size, file_reason):
+                            emptied.add(os.path.dirname(path))
+                            continue
+                    remaining += stat.st_size
+
+            # Work directories of dataset exports: stale ones, and ones whose
+            # files were just removed (which refreshed their mtime)
+            for dirpath, _, _ in os.walk(root, topdown=False):
+                if dirpath in (root, temp_dir, export_dir):
+                    continue
+                try:
+                    if not os.listdir(dirpath) and (dirpath in emptied or os.stat(dirpath).st_mtime < cutoff):
+                        os.rmdir(dirpath)
+                except OSError:
+                    pass
+
+        return remaining
+
+    def _expire_documents(self):
+        """Delete documents older than STORAGE_RETENTION_DAYS, with their files"""
+        cutoff = datetime.now(timezone.utc) - timedelta(days=settings.STORAGE_RETENTION_DAYS)
+        db = SessionLocal()
+        try:
+            while not self._stop.is_set():
+                rows = db.execute(
+                    select(Document.id, Document.file_path, Document.blob_key)
+                    .where(
+                        Document.created_at < cutoff,
+                        Document.status.notin_(("processing", "recovering"))
+                    )
+                    .limit(settings.JANITOR_BATCH_SIZE)
+                ).all()
+                if not rows:
+                    break
+
+                ids = [row.id for row in rows]
+                blob_keys = [row.blob_key for row in rows if row.blob_key]
+                db.execute(delete(Document).where(Document.id.in_(ids)))
+                db.execute(delete(DocumentPage).where(DocumentPage.document_id.in_(ids)))
+                for statement in self.storage.release_statements(blob_keys):
+                    db.execute(statement)
+                db.commit()
+                logger.info(f"Retention: deleted {len(ids)} documents older than {settings.STORAGE_RETENTION_DAYS} days")
+
+                self._reclaimed["retention"] += self.storage.collect(blob_keys, reason="retention")
+                for row in rows:
+                    if not row.blob_key and row.file_path and os.path.exists(row.file_path):
+                        self._remove_file(row.file_path, os.path.getsize(row.file_path), "retention")
+
+                self._stop.wait(settings.JANITOR_BATCH_PAUSE_SECONDS)
+        finally:
+            db.close()
+
+    def _collect_unreferenced(self):
+        """Collect blobs left unreferenced (e.g. by a bulk delete whose cleanup never ran)"""
+        db = SessionLocal()
+        try:
+            keys = db.scalars(select(Blob.key).where(Blob.ref_count <= 0)).all()
+        finally:
+            db.close()
+
+        for batch in self._batches(keys):
+            self._reclaimed["unreferenced"] += self.storage.collect(batch)
+
+    def _reconcile_blobs(self) -> int:
+        """Delete stored blobs without a blobs row; returns the bytes left"""
+        cutoff = time.time() - settings.JANITOR_ORPHAN_GRACE_SECONDS
+        remaining = 0
+        db = SessionLocal()
+        try:
+            for batch in self._batches(self.storage.backend.keys()):
+                keys = [key for key, _, _ in batch]
+                known = set(db.scalars(select(Blob.key).where(Blob.key.in_(keys))))
+                db.rollback()
+
+                orphans = []
+                for key, size, modified in batch:
+                    if key not in known and modified < cutoff:
+                        orphans.append({"key": key, "size": size})
+                    else:
+                        remaining += size
+
+                if orphans:
+                    # Adopted as unreferenced rows, then collected like any other blob
+                    self.storage.adopt(db, orphans)
+                    reclaimed = self.storage.collect([orphan["key"] for orphan in orphans], reason="orphan")
+                    self._reclaimed["orphan"] += reclaimed
+                    remaining += sum(orphan["size"] for orphan in orphans) - reclaimed
+        finally:
+            db.close()
+
+        return remaining
+
+    def _reconcile_legacy(self) -> int:
+        """Delete flat UPLOAD_DIR files (stored before blobs) no document points at; returns the bytes left"""
+        cutoff = time.time() - settings.JANITOR_ORPHAN_GRACE_SECONDS
+        extensions = tuple(f".{extension.lower()}" for extension in settings.ALLOWED_EXTENSIONS)
+        remaining = 0
+
+        def uploads():
+            with os.scandir(settings.UPLOAD_DIR) as entries:
+                for entry in entries:
+                    # Only upload files; anything else in the directory isn't ours to delete
+                    if entry.is_file() and entry.name.lower().endswith(extensions):
+                        yield os.path.join(settings.UPLOAD_DIR, entry.name), entry.stat()
+
+        db = SessionLocal()
+        try:
+            for batch in self._batches(uploads()):
+                paths = [path for path, _ in batch]
+                referenced = set(db.scalars(select(Document.file_path).where(Document.file_path.in_(paths))))
+                db.rollback()
+
+                for path, stat in batch:
+                    if path not in referenced and stat.st_mtime < cutoff:
+                        if self._remove_file(path, stat.st_size, "legacy_orphan"):
+                            continue
+                    remaining += stat.st_size
+        finally:
+            db.close()
+
+        return remaining
+
+    def _trim_cache(self) -> int:
+        """Keep the local copies of S3 blobs under STORAGE_QUOTA_MB; returns the bytes left"""
+        cache = self.storage.backend.cache
+        entries = list(cache.keys())
+        remaining = sum(size for _, size, _ in entries)
+        quota = settings.STORAGE_QUOTA_MB * MB
+        if not quota or remaining <= quota:
+            return remaining
+
+        # Least recently written or fetched first; recent copies may be in use by OCR
+        cutoff = time.time() - settings.JANITOR_TEMP_MAX_AGE_SECONDS
+        evictable = sorted((entry for entry in entries if entry[2] < cutoff), key=lambda entry: entry[2])
+        for batch in self._batches(evictable):
+            for key, size, _ in batch:
+                if remaining <= quota:
+                    return remaining
+                if self._remove_file(cache.path(key), size, "cache"):
+                    remaining -= size
+        return remaining
+
+    def _enforce_quota(self, usage: Dict[str, int]):
+        if isinstance(self.storage.backend, S3Storage):
+            return
+
+        used = usage.get("blobs", 0) + usage.get("legacy", 0) + usage.get("temp", 0)
+        self.storage.set_usage(used)
+
+        quota = settings.STORAGE_QUOTA_MB * MB
+        if quota and used > quota:
+            logger.warning(
+                f"Storage quota exceeded: {used / MB:.1f} MB used of {settings.STORAGE_QUOTA_MB} MB; "
+                f"uploads are refused until space is freed"
+            )
+
+
+# Global storage janitor instance
+storage_janitor = StorageJanitor(storage_service)
@@ -0,0 +1,50 @@
+"""
+Deadlines and cancellation for OCR runs
+
+An OCRJob travels with one document through OCRService.iter_extract. The
+page pool polls it while waiting for results: a cancelled job stops the pool
+(terminating its workers), and once the document deadline passes the pages
+that haven't finished are reported as timed out instead of being waited for.
+"""
+
+from typing import Optional
+import threading
+import time
+
+
+class OCRCancelled(BaseException):
+    """
+    Raised inside an OCR run when its job is cancelled
+
+    Derives from BaseException (like asyncio.CancelledError) so the
+    per-page and per-file error handling, which turns exceptions into failed
+    results, lets it through.
+    """
+
+
+class OCRJob:
+    """Cancellation flag and document deadline shared by every stage of one OCR run"""
+
+    def __init__(self, timeout: Optional[float] = None):
+        """
+        Args:
+            timeout: Seconds the whole document may take; None or 0 for no deadline
+        """
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def expired(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def check(self):
+        """Raise OCRCancelled if the job has been cancelled"""
+        if self._cancelled.is_set():
+            raise OCRCancelled()
@@ -0,0 +1,200 @@
+from typing import Dict, Optional, Tuple
+import logging
+import os
+import threading
+import time
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Named speed/accuracy presets mapped to PaddleOCR constructor options.
+# "balanced" reproduces PaddleOCR's defaults, which is what the service
+# always used before profiles existed.
+OCR_PROFILES: Dict[str, Dict] = {
+    "fast": {
+        "ocr_version": "PP-OCRv4",
+        "use_angle_cls": False,
+        "det_limit_side_len": 736,
+        "det_limit_type": "max",
+        "rec_batch_num": 16,
+        "cpu_threads": 2,
+        "enable_mkldnn": True,
+    },
+    "balanced": {
+        "ocr_version": "PP-OCRv4",
+        "use_angle_cls": True,
+        "det_limit_side_len": 960,
+        "det_limit_type": "max",
+        "rec_batch_num": 6,
+    },
+    "accurate": {
+        "ocr_version": "PP-OCRv4",
+        "use_angle_cls": True,
+        "det_limit_side_len": 1536,
+        "det_limit_type": "max",
+        "rec_batch_num": 6,
+        "cpu_threads": 4,
+    },
+}
+
+# PP-OCRv4 server models used by the accurate profile. Detection is language
+# independent; the server recognition model is trained on the Chinese
+# dictionary (which includes Latin script) and is only used for lang="ch".
+SERVER_MODEL_URLS = {
+    "det_model_dir": "https://paddleocr.bj.bcebos.com/PP-OCRv4/chinese/ch_PP-OCRv4_det_server_infer.tar",
+    "rec_model_dir": "https://paddleocr.bj.bcebos.com/PP-OCRv4/chinese/ch_PP-OCRv4_rec_server_infer.tar",
+}
+SERVER_REC_LANGUAGES = {"ch"}
+
+# Seconds before server models that failed to download are tried again
+SERVER_MODEL_RETRY_SECONDS = 300
+
+# Options every profile shares
+BASE_OPTIONS = {
+    "use_gpu": False,
+    "show_log": False,
+}
+
+
+def resolve_profile(name: Optional[str] = None) -> str:
+    """Return a valid profile name, defaulting to DEFAULT_OCR_PROFILE"""
+    name = name or settings.DEFAULT_OCR_PROFILE
+    if name not in OCR_PROFILES:
+        raise ValueError(f"Unknown OCR profile '{name}'. Available: {', '.join(OCR_PROFILES)}")
+    return name
+
+
+def _model_ready(model_dir: str) -> bool:
+    return os.path.exists(os.path.join(model_dir, "inference.pdmodel"))
+
+
+def _fetch_server_model(option: str, download: bool = True) -> Optional[str]:
+    """Directory of a server model in OCR_SERVER_MODEL_DIR, downloading it if missing (and download is set)"""
+    url = SERVER_MODEL_URLS[option]
+    model_dir = os.path.join(
+        os.path.expanduser(settings.OCR_SERVER_MODEL_DIR), os.path.basename(url)[:-len(".tar")]
+    )
+    if download and not _model_ready(model_dir):
+        try:
+            import paddleocr  # noqa: F401 - puts PaddleOCR's ppocr package on sys.path
+            from ppocr.utils.network import maybe_download
+            maybe_download(model_dir, url)
+        except Exception as e:
+            logger.warning(f"Could not download {url}: {str(e)}")
+    return model_dir if _model_ready(model_dir) else None
+
+
+class _ServerModels:
+    """
+    Server model directories, fetched in the background
+
+    Downloads never run inside a request: start_fetch() runs them on a
+    thread (at startup, and again after a failure), and dirs() only returns
+    models that are already on disk. Only a complete result is kept, so a
+    failed download is retried instead of leaving the accurate profile on
+    the mobile models for the life of the process.
+    """
+
+    def __init__(self):
+        self._dirs: Optional[Dict[str, str]] = None
+        self._fetching = False
+        self._last_attempt: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _resolve(self, download: bool) -> Tuple[Dict[str, str], bool]:
+        """Directories of the available server models, and whether every wanted one is there"""
+        configured = {
+            "det_model_dir": settings.OCR_SERVER_DET_MODEL_DIR,
+            "rec_model_dir": settings.OCR_SERVER_REC_MODEL_DIR,
+        }
+        dirs = {}
+        complete = True
+        for option, model_dir in configured.items():
+            if model_dir:
+                dirs[option] = model_dir
+                continue
+            if not settings.OCR_SERVER_MODELS:
+                continue
+            if option == "rec_model_dir" and settings.OCR_LANGUAGE not in SERVER_REC_LANGUAGES:
+                continue
+            model_dir = _fetch_server_model(option, download)
+            if model_dir:
+                dirs[option] = model_dir
+            else:
+                complete = False
+                if download:
+                    logger.warning(
+                        f"⚠️  Server model for {option} unavailable; accurate profile uses the mobile model "
+                        f"until it can be downloaded (retrying in {SERVER_MODEL_RETRY_SECONDS}s)"
+                    )
+        return dirs, complete
+
+    def fetch(self):
+        """Download the missing server models (blocking)"""
+        try:
+            dirs, complete = self._resolve(download=True)
+            if complete:
+                self._dirs = dirs
+        finally:
+            with self._lock:
+                self._fetching = False
+
+    def start_fetch(self):
+        """Download the missing server models on a background thread, unless done or underway"""
+        with self._lock:
+            if self._dirs is not None or self._fetching:
+                return
+            self._fetching = True
+            self._last_attempt = time.monotonic()
+        threading.Thread(target=self.fetch, name="ocr-server-models", daemon=True).start()
+
+    def dirs(self) -> Dict[str, str]:
+        if self._dirs is not None:
+            return self._dirs
+
+        dirs, complete = self._resolve(download=False)
+        if complete:
+            self._dirs = dirs
+        elif self._last_attempt is None or time.monotonic() - self._last_attempt >= SERVER_MODEL_RETRY_SECONDS:
+            self.start_fetch()
+        return dirs
+
+
+# Global server model state for the accurate profile
+_server_models = _ServerModels()
+
+
+def start_server_model_fetch():
+    """Fetch the accurate profile's server models in the background (called at startup)"""
+    _server_models.start_fetch()
+
+
+def server_model_dirs() -> Dict[str, str]:
+    """
+    det_model_dir/rec_model_dir options selecting the server models
+
+    Configured OCR_SERVER_*_MODEL_DIR directories win; otherwise the models
+    are downloaded in the background when OCR_SERVER_MODELS is on. A model
+    that isn't available yet is left out, so PaddleOCR falls back to its
+    default mobile model until the download succeeds.
+    """
+    return _server_models.dirs()
+
+
+def profile_options(name: str, overrides: Optional[Dict] = None) -> Dict:
+    """
+    Build the PaddleOCR constructor options for a profile
+
+    Layers, lowest to highest priority: shared base options, the profile
+    preset, OCR_PROFILE_OVERRIDES from settings, then explicit overrides.
+    The accurate profile uses the server models when they are available
+    (see server_model_dirs).
+    """
+    options = {"lang": settings.OCR_LANGUAGE, **BASE_OPTIONS, **OCR_PROFILES[name]}
+
+    if name == "accurate":
+        options.update(server_model_dirs())
+
+    options.update(settings.OCR_PROFILE_OVERRIDES.get(name, {}))
+    options.update(overrides or {})
+    return options
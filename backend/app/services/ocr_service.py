@@ -1,34 +1,151 @@
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterator, List, Tuple, Optional
 import cv2
 import numpy as np
 from paddleocr import PaddleOCR
-from pdf2image import convert_from_path
+from pdf2image import convert_from_path, pdfinfo_from_path
 import pytesseract
-from PIL import Image
+from PIL import Image, ImageMode
 import os
+import json
 import logging
-from multiprocessing import Pool, cpu_count
+import re
+import signal
+import threading
+import time
+import uuid
+from collections import deque
+from itertools import islice
+from multiprocessing import get_context
 from app.core.config import settings
+from app.core import cpu_budget, metrics, profiling
+from app.core.memory_budget import MB, current_rss, memory_budget, release_freed_memory, task_memory
+from app.services.jobs import OCRCancelled, OCRJob
+from app.services.ocr_profiles import profile_options, resolve_profile
+from app.services.orientation import CONFIDENT_SCORE, detect_orientation, rotate_array, rotate_pil
+from app.services.tiling import merge_tile_lines, tile_grid
 
 # Setup logging
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+# How often a pool waiting on a result checks deadlines and cancellation (seconds)
+POOL_POLL_SECONDS = 0.2
+
+# PDF page size (points) assumed when pdfinfo doesn't report one: US letter
+DEFAULT_PDF_PAGE_POINTS = (612.0, 792.0)
+
+
+class _TimedPaddleOCR(PaddleOCR):
+    """
+    PaddleOCR that keeps the per-stage timings its pipeline already measures
+
+    One engine serves every request thread, so the timings are kept per
+    thread: last_timings is always those of this thread's latest ocr() call.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._timings = threading.local()
+
+    @property
+    def last_timings(self) -> Dict[str, float]:
+        return getattr(self._timings, "last", {})
+
+    def __call__(self, *args, **kwargs):
+        result = super().__call__(*args, **kwargs)
+        # TextSystem returns (boxes, rec_res, time_dict); ocr() discards time_dict
+        if isinstance(result, tuple) and len(result) == 3 and isinstance(result[2], dict):
+            self._timings.last = {
+                ("total" if stage == "all" else stage): float(seconds)
+                for stage, seconds in result[2].items()
+                if isinstance(seconds, (int, float))
+            }
+        return result
+
+
+def _orient_page(image, orientation, use_cls: bool):
+    """
+    Make a page upright before OCR
+
+    Args:
+        image: PIL image or numpy array
+        orientation: None (detection off), "detect" (check this page) or a
+            rotation already decided for the whole document
+        use_cls: Whether the profile runs PaddleOCR's per-line angle classifier
+
+    Returns:
+        (image, rotation, cls): the per-line classifier is only turned off
+        when the page orientation was determined with high confidence
+    """
+    if orientation is None:
+        return image, None, use_cls
+
+    if orientation == "detect":
+        with profiling.stage("orientation"):
+            rotation, score = detect_orientation(image)
+        confident = score >= CONFIDENT_SCORE
+    else:
+        # Document rotations are only decided from confident samples
+        rotation, confident = orientation, True
+
+    if rotation is None:
+        return image, None, use_cls
+
+    use_cls = use_cls and not confident
+    if isinstance(image, np.ndarray):
+        return rotate_array(image, rotation), rotation, use_cls
+    return rotate_pil(image, rotation), rotation, use_cls
+
+
+def _record_rotation(rotation: Optional[int]):
+    metrics.PAGES_ROTATED_TOTAL.labels(
+        rotation="inconclusive" if rotation is None else str(rotation)
+    ).inc()
+
 
 class OCRService:
     """Service for OCR text extraction using PaddleOCR and Tesseract with parallel processing"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        paddle_options: Optional[Dict] = None,
+        confidence_threshold: Optional[float] = None,
+        pdf_dpi: Optional[int] = None
+    ):
+        """
+        Args:
+            paddle_options: PaddleOCR constructor arguments applied on top of
+                every speed profile (e.g. use_angle_cls, det_limit_side_len)
+            confidence_threshold: PaddleOCR confidence below which auto mode
+                falls back to Tesseract (default: OCR_CONFIDENCE_THRESHOLD)
+            pdf_dpi: Resolution PDFs are rasterized at (default: PDF_RASTER_DPI)
+        """
         logger.info("🚀 Initializing OCR engines...")
 
-        # Initialize PaddleOCR
-        self.paddle_ocr = PaddleOCR(
-            use_angle_cls=True,
-            lang=settings.OCR_LANGUAGE,
-            use_gpu=False,
-            show_log=False
+        self.paddle_overrides = paddle_options or {}
+        self.confidence_threshold = (
+            settings.OCR_CONFIDENCE_THRESHOLD if confidence_threshold is None else confidence_threshold
+        )
+        self.pdf_dpi = pdf_dpi or settings.PDF_RASTER_DPI
+
+        # Split the usable cores between pool workers so their thread pools don't oversubscribe them
+        self.cpu_budget = cpu_budget.plan_cpu_budget()
+        self.max_workers = self.cpu_budget.workers
+        cpu_budget.apply_thread_environment(self.cpu_budget.threads_per_worker)
+        cpu_budget.limit_opencv_threads(self.cpu_budget.threads_per_worker)
+        # Workers running across every pool this service starts (concurrent documents share them)
+        self.worker_slots = cpu_budget.WorkerSlots(self.max_workers)
+        self._pin_slots = (
+            get_context('spawn').Array('i', self.max_workers) if self.cpu_budget.pin_workers else None
         )
-        logger.info("✅ PaddleOCR engine initialized")
+        logger.info(f"⚡ Parallel processing enabled: {self.cpu_budget.describe()}")
+
+        # One PaddleOCR engine per speed profile, created on first use
+        self._engines: Dict[str, Tuple[str, _TimedPaddleOCR]] = {}  # profile -> (options key, engine)
+        self._engines_lock = threading.Lock()
+
+        # Load the default profile up front so the first request doesn't pay for it
+        self._get_engine(resolve_profile())
 
         # Configure Tesseract if enabled
         if settings.TESSERACT_ENABLED:
@@ -37,33 +154,146 @@ class OCRService:
         else:
             logger.info("⚠️  Tesseract disabled in settings")
 
-        # Get CPU count for parallel processing
-        self.max_workers = max(1, cpu_count() - 1)  # Leave 1 core free
-        logger.info(f"⚡ Parallel processing enabled: {self.max_workers} workers")
+    def _profile_options(self, profile: str) -> Dict:
+        options = profile_options(profile, self.paddle_overrides)
+        # Paddle defaults to 10 threads per engine; keep each engine within its share of the cores
+        threads = self.cpu_budget.threads_per_worker
+        options["cpu_threads"] = min(options.get("cpu_threads", threads), threads)
+        return options
+
+    def _get_engine(self, profile: str) -> "_TimedPaddleOCR":
+        """
+        Return the cached PaddleOCR engine for a profile, loading it on first use
+
+        The engine is rebuilt when the profile's options change, e.g. once
+        the accurate profile's server models have been downloaded.
+        """
+        options = self._profile_options(profile)
+        key = json.dumps(options, sort_keys=True)
+        cached = self._engines.get(profile)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        with self._engines_lock:
+            cached = self._engines.get(profile)
+            if cached is None or cached[0] != key:
+                self._engines[profile] = (key, _TimedPaddleOCR(**options))
+                logger.info(f"✅ PaddleOCR engine initialized (profile: {profile})")
+            return self._engines[profile][1]
+
+    def _document_orientation(self, images: List[Image.Image]):
+        """
+        Orientation argument for the pages of a PDF or TIFF (see _orient_page)
 
-    def extract_text(self, file_path: str, engine: str = "auto") -> Dict:
+        In document mode the first ORIENTATION_SAMPLE_PAGES pages are checked
+        here; if they all agree with high confidence, that rotation is applied
+        to every page without checking the rest. Otherwise each page is
+        checked on its own.
+        """
+        mode = settings.ORIENTATION_DETECTION
+        if mode == "off":
+            return None
+        if mode != "document":
+            return "detect"
+
+        with profiling.stage("orientation"):
+            sampled = set()
+            for image in images[:max(1, settings.ORIENTATION_SAMPLE_PAGES)]:
+                rotation, score = detect_orientation(image)
+                sampled.add(rotation if score >= CONFIDENT_SCORE else None)
+
+        if len(sampled) == 1 and None not in sampled:
+            rotation = sampled.pop()
+            logger.info(f"🧭 Document orientation: rotate {rotation}° for all pages")
+            return rotation
+        return "detect"
+
+    def extract_text(
+        self,
+        file_path: str,
+        engine: str = "auto",
+        profile: Optional[str] = None,
+        job: Optional[OCRJob] = None
+    ) -> Dict:
         """
         Extract text from image or PDF using OCR
 
         Args:
             file_path: Path to the image or PDF file
             engine: OCR engine to use ("auto", "paddleocr", "tesseract")
+            profile: Speed profile ("fast", "balanced", "accurate");
+                defaults to DEFAULT_OCR_PROFILE
+            job: Deadline and cancellation for this run; defaults to a job
+                with OCR_DOCUMENT_TIMEOUT_SECONDS
 
         Returns:
             Dict containing extracted text, confidence, and coordinates
         """
+        result = {}
+        for event, data in self.iter_extract(file_path, engine, profile, job=job):
+            if event == "done":
+                result = data
+        return result
+
+    def iter_extract(
+        self,
+        file_path: str,
+        engine: str = "auto",
+        profile: Optional[str] = None,
+        completed_pages: Optional[Dict[int, Dict]] = None,
+        job: Optional[OCRJob] = None
+    ) -> Iterator[Tuple[str, Dict]]:
+        """
+        Extract text, yielding each page's result as soon as it is ready
+
+        Yields ("page", page_result) for every page in page order, then
+        ("done", result) with the combined result extract_text returns.
+        Single images yield one page.
+
+        Args:
+            completed_pages: Checkpointed results of a PDF/TIFF's pages (by
+                page number) from an interrupted run; only the other pages
+                are processed. They are yielded first, flagged "checkpointed".
+            job: Deadline and cancellation (see app.services.jobs). Pages that
+                time out are reported as failed pages flagged "timed_out";
+                a cancelled run ends with a "cancelled" result.
+        """
+        job = job or OCRJob(settings.OCR_DOCUMENT_TIMEOUT_SECONDS)
         try:
+            profile = resolve_profile(profile)
+
             # Check if file is PDF
             if file_path.lower().endswith('.pdf'):
-                logger.info(f"📄 Processing PDF: {os.path.basename(file_path)}")
-                return self._extract_from_pdf_parallel(file_path, engine)
+                logger.info(f"📄 Processing PDF: {os.path.basename(file_path)} (profile: {profile})")
+                events = self._iter_pdf_pages(file_path, engine, profile, completed_pages or {}, job)
+            elif file_path.lower().endswith(('.tif', '.tiff')) and _frame_count(file_path) > 1:
+                logger.info(f"🗂️  Processing multi-page TIFF: {os.path.basename(file_path)} (profile: {profile})")
+                events = self._iter_tiff_pages(file_path, engine, profile, completed_pages or {}, job)
             else:
-                logger.info(f"🖼️  Processing image: {os.path.basename(file_path)}")
-                return self._extract_from_image_auto(file_path, engine)
+                logger.info(f"🖼️  Processing image: {os.path.basename(file_path)} (profile: {profile})")
+                result = self._extract_from_image_auto(file_path, engine, profile, job)
+                events = iter([("page", {**result, "page_num": 1}), ("done", result)])
+
+            for event, data in events:
+                if event == "done":
+                    data["profile"] = profile
+                yield event, data
+
+        except OCRCancelled:
+            logger.info(f"🛑 OCR cancelled: {os.path.basename(file_path)}")
+            yield "done", {
+                "success": False,
+                "text": "",
+                "lines": [],
+                "confidence": 0.0,
+                "engine_used": "none",
+                "error": "Processing cancelled",
+                "cancelled": True
+            }
 
         except Exception as e:
             logger.error(f"❌ OCR extraction failed: {str(e)}")
-            return {
+            yield "done", {
                 "success": False,
                 "text": "",
                 "lines": [],
@@ -162,145 +392,546 @@ class OCRService:
                 "error": str(e)
             }
 
-    def _extract_from_pdf_parallel(self, pdf_path: str, engine: str = "auto") -> Dict:
+    def _iter_pool(
+        self,
+        worker,
+        make_args,
+        total: int,
+        worker_count: int,
+        stage: str,
+        job: Optional[OCRJob] = None,
+        on_timeout=None,
+        task_cost=None,
+        prepare=None
+    ) -> Iterator[Dict]:
+        """
+        Run a worker function over every argument tuple in a spawn pool
+
+        Results are yielded in argument order as they complete. Arguments come
+        from make_args(), which may produce them lazily; at most two tasks per
+        worker are in flight, so inputs are never all pickled and queued at
+        once. If the pool fails, the remaining work continues sequentially in
+        this process.
+
+        A worker that spends longer than OCR_PAGE_TIMEOUT_SECONDS on one task
+        is killed (the pool starts a replacement) and on_timeout(args, error)
+        is yielded in place of its result. When the job's document deadline
+        passes, unfinished tasks are reported the same way and no more are
+        started, so fewer than `total` results may be yielded. Cancelling the
+        job raises OCRCancelled, which terminates the pool.
+
+        Workers are replaced after OCR_WORKER_MAX_TASKS tasks. When a worker
+        reports more than OCR_WORKER_MAX_RSS_MB, the tasks in flight are
+        finished and the rest continue on a fresh pool. task_cost(args)
+        estimates a task's memory; dispatch waits while the process-wide
+        memory budget is used up. prepare(args), when given, turns the
+        arguments into what the worker receives once that memory is reserved,
+        so pages can be decoded only when they are about to be dispatched.
+
+        worker_count is what the pool would like; it is started with as many
+        of the process-wide worker slots as are free (waiting for at least
+        one), so overlapping runs stay within the CPU budget together.
+        """
+        metrics.QUEUE_DEPTH.inc(total)
+        page_timeout = settings.OCR_PAGE_TIMEOUT_SECONDS
+        max_rss = settings.OCR_WORKER_MAX_RSS_MB * MB
+        pending = deque()  # (index, args, AsyncResult, memory cost) in submission order
+        done = 0
+        try:
+            try:
+                context = get_context('spawn')
+                task_starts = context.SimpleQueue()
+                running = {}  # worker pid -> (index, start time) of the task it is on
+                timed_out = {}  # index -> error
+                recycle = False
+
+                def watch():
+                    """Note task starts, enforce deadlines and honour cancellation"""
+                    while not task_starts.empty():
+                        index, pid = task_starts.get()
+                        running[pid] = (index, time.monotonic())
+
+                    if job is not None:
+                        job.check()
+                        if job.expired:
+                            for index, _, async_result, _ in pending:
+                                if index not in timed_out and not async_result.ready():
+                                    timed_out[index] = "Document deadline exceeded"
+                                    metrics.TIMEOUTS_TOTAL.labels(stage=stage, deadline="document").inc()
+
+                    if not page_timeout:
+                        return
+                    in_flight = {index: async_result for index, _, async_result, _ in pending}
+                    for pid, (index, started) in list(running.items()):
+                        if index not in in_flight or in_flight[index].ready():
+                            continue
+                        if time.monotonic() - started < page_timeout:
+                            continue
+
+                        logger.warning(f"⏱️  {stage} task {index} exceeded {page_timeout}s; replacing worker {pid}")
+                        try:
+                            os.kill(pid, signal.SIGKILL)
+                        except ProcessLookupError:
+                            pass
+                        del running[pid]
+                        timed_out.setdefault(index, f"Timed out after {page_timeout}s")
+                        metrics.TIMEOUTS_TOTAL.labels(stage=stage, deadline="page").inc()
+                        metrics.WORKERS_REPLACED_TOTAL.labels(stage=stage).inc()
+
+                def next_result():
+                    nonlocal recycle, done
+                    index, args, async_result, cost = pending[0]
+                    while index not in timed_out and not async_result.ready():
+                        async_result.wait(POOL_POLL_SECONDS)
+                        watch()
+                    pending.popleft()
+                    memory_budget.release(cost)
+                    done += 1
+                    metrics.QUEUE_DEPTH.dec()
+
+                    if not async_result.ready():
+                        return on_timeout(args, timed_out.pop(index))
+
+                    result, worker_rss, retiring = async_result.get()
+                    metrics.WORKER_RSS_BYTES.labels(stage=stage).observe(worker_rss)
+                    if retiring:
+                        metrics.WORKER_RECYCLES_TOTAL.labels(stage=stage, reason="tasks").inc()
+                    if max_rss and worker_rss > max_rss and not recycle:
+                        logger.warning(
+                            f"🧠 {stage} worker at {worker_rss // MB}MB (limit {max_rss // MB}MB); "
+                            "recycling the pool after the tasks in flight"
+                        )
+                        recycle = True
+                    return result
+
+                def reserve(cost: int):
+                    """Wait (yielding finished results) until the memory budget has room; False if the deadline hit"""
+                    throttled = False
+                    while not memory_budget.try_reserve(cost):
+                        if not throttled:
+                            metrics.MEMORY_THROTTLED_TOTAL.labels(stage=stage).inc()
+                            throttled = True
+                        if pending:
+                            yield next_result()
+                        else:
+                            memory_budget.wait(POOL_POLL_SECONDS)
+                            watch()
+                        if job is not None and job.expired:
+                            return False
+                    return True
+
+                def claim_workers() -> int:
+                    """Wait until worker slots are free and claim up to worker_count; 0 if the deadline hit"""
+                    workers = self.worker_slots.try_acquire(worker_count)
+                    if not workers:
+                        metrics.WORKERS_THROTTLED_TOTAL.labels(stage=stage).inc()
+                    while not workers:
+                        self.worker_slots.wait(POOL_POLL_SECONDS)
+                        watch()
+                        if job is not None and job.expired:
+                            return 0
+                        workers = self.worker_slots.try_acquire(worker_count)
+                    return workers
+
+                tasks = enumerate(make_args())
+                task = next(tasks, None)
+                workers = 0
+                try:
+                    while task is not None:
+                        recycle = False
+                        running.clear()
+                        workers = claim_workers()
+                        if not workers:
+                            break
+                        metrics.POOL_WORKERS.inc(workers)
+                        with profiling.stage(stage), context.Pool(
+                            processes=workers,
+                            initializer=_init_pool_worker,
+                            initargs=(task_starts, self.cpu_budget, self._pin_slots),
+                            maxtasksperchild=settings.OCR_WORKER_MAX_TASKS or None
+                        ) as pool:
+                            while task is not None and not recycle:
+                                index, args = task
+                                watch()
+                                cost = task_cost(args) if task_cost else 0
+                                if job is not None and job.expired or not (yield from reserve(cost)):
+                                    task = None
+                                    break
+
+                                payload = prepare(args) if prepare else args
+                                async_result = pool.apply_async(_run_tracked, ((index, worker, payload),))
+                                del payload
+                                pending.append((index, args, async_result, cost))
+                                task = next(tasks, None)
+                                while len(pending) >= workers * 2 or (pending and pending[0][2].ready()):
+                                    yield next_result()
+                            while pending:
+                                yield next_result()
+
+                        # Hand the slots back between pools so runs waiting for them get a turn
+                        finished_workers, workers = workers, 0
+                        metrics.POOL_WORKERS.dec(finished_workers)
+                        self.worker_slots.release(finished_workers)
+                        if recycle and task is not None:
+                            metrics.WORKER_RECYCLES_TOTAL.labels(stage=stage, reason="memory").inc(finished_workers)
+                finally:
+                    metrics.POOL_WORKERS.dec(workers)
+                    self.worker_slots.release(workers)
+            except Exception as parallel_error:
+                warning_msg = (
+                    f"Parallel processing failed in {stage} ({parallel_error}). "
+                    "Falling back to sequential execution."
+                )
+                print(f"⚠️  {warning_msg}")
+                logger.warning(warning_msg)
+                metrics.FAILURES_TOTAL.labels(stage=stage).inc()
+
+                while pending:
+                    memory_budget.release(pending.popleft()[3])
+
+                # Pick up after the tasks that already finished
+                for args in islice(make_args(), done, None):
+                    if job is not None:
+                        job.check()
+                        if job.expired:
+                            break
+                    result = worker(prepare(args) if prepare else args)
+                    done += 1
+                    metrics.QUEUE_DEPTH.dec()
+                    yield result
+        finally:
+            # Memory held by tasks abandoned by a consumer that stopped early
+            while pending:
+                memory_budget.release(pending.popleft()[3])
+            # Tasks abandoned, or cut off by the deadline
+            metrics.QUEUE_DEPTH.dec(total - done)
+
+    def _run_in_pool(
+        self,
+        worker,
+        make_args,
+        total: int,
+        worker_count: int,
+        stage: str,
+        job: Optional[OCRJob] = None,
+        on_timeout=None,
+        task_cost=None,
+        prepare=None
+    ) -> List[Dict]:
+        """Collect all results of _iter_pool"""
+        return list(self._iter_pool(
+            worker, make_args, total, worker_count, stage, job, on_timeout, task_cost, prepare
+        ))
+
+    def _iter_document_pages(
+        self,
+        kind: str,
+        source_path: str,
+        page_count: int,
+        make_pages,
+        first_images: List[Image.Image],
+        engine: str,
+        profile: str,
+        completed_pages: Dict[int, Dict],
+        job: OCRJob
+    ) -> Iterator[Tuple[str, Dict]]:
+        """
+        OCR pages on the pool, yielding each page and then the combined result
+
+        make_pages() yields (page_num, _PendingPage) for the pages not in
+        completed_pages; each page is decoded only once the memory budget
+        has room for it. Checkpointed pages are passed through first. Pages
+        the document deadline cut off are yielded as timed out.
+        """
+        pending_count = page_count - len(completed_pages)
+        worker_count = max(1, min(pending_count, self.max_workers))
+
+        page_results = []
+        for page_num in sorted(completed_pages):
+            page_result = {**completed_pages[page_num], "checkpointed": True}
+            page_results.append(page_result)
+            yield "page", page_result
+
+        if completed_pages:
+            print(f"♻️  Resuming: {len(completed_pages)} pages checkpointed, {pending_count} to process")
+        print(f"⚡ Processing pages in parallel with {worker_count} workers...")
+
+        # Prepare arguments for parallel processing
+        sample_workers = profiling.sampling_enabled()
+        options = self._profile_options(profile)
+        orientation = self._document_orientation(first_images)
+
+        # Page images go to the temp dir under a per-run name: documents share
+        # stored files, so names derived from source_path could collide
+        os.makedirs(settings.storage_temp_dir, exist_ok=True)
+        temp_path = os.path.join(settings.storage_temp_dir, f"{uuid.uuid4().hex}_{os.path.basename(source_path)}")
+
+        def page_args():
+            for page_num, page in make_pages():
+                yield (page, page_num, temp_path, engine, sample_workers, options, orientation)
+
+        if pending_count > 0:
+            finished = set(completed_pages)
+            for page_result in self._iter_pool(
+                _process_page_worker, page_args, pending_count, worker_count, "page_pool",
+                job, lambda args, error: _timed_out_page(args[1], error), lambda args: task_memory(args[0]),
+                lambda args: (args[0].load(), *args[1:])
+            ):
+                finished.add(page_result["page_num"])
+                page_results.append(page_result)
+                yield "page", page_result
+
+            # Pages never started because the document deadline passed
+            for page_num in range(1, page_count + 1):
+                if page_num not in finished:
+                    page_result = _timed_out_page(page_num, "Document deadline exceeded")
+                    page_results.append(page_result)
+                    yield "page", page_result
+
+        yield "done", self._combine_pages(page_results, page_count, worker_count, orientation, kind)
+
+    def _iter_pdf_pages(
+        self,
+        pdf_path: str,
+        engine: str = "auto",
+        profile: str = "balanced",
+        completed_pages: Optional[Dict[int, Dict]] = None,
+        job: Optional[OCRJob] = None
+    ) -> Iterator[Tuple[str, Dict]]:
         """Extract text from all pages of PDF using parallel processing"""
+        job = job or OCRJob()
         try:
             print(f"\n{'='*60}")
             print(f"📄 Processing PDF: {os.path.basename(pdf_path)}")
             print(f"{'='*60}")
-            print("🔄 Converting PDF to images...")
-
-            images = convert_from_path(pdf_path)
-
-            if not images:
-                print("❌ PDF conversion failed - no images generated")
-                return {
+            info = pdfinfo_from_path(pdf_path)
+            page_count = int(info["Pages"])
+            if not page_count:
+                print("❌ PDF conversion failed - no pages found")
+                yield "done", {
                     "success": False,
                     "text": "",
                     "lines": [],
                     "confidence": 0.0,
                     "error": "Could not convert PDF to images"
                 }
+                return
+
+            completed_pages = completed_pages or {}
+            pending = [page_num for page_num in range(1, page_count + 1) if page_num not in completed_pages]
+            print(f"✅ PDF has {page_count} pages; rasterizing them one at a time")
+            page_size = self._pdf_page_pixels(info)
+
+            def make_pages():
+                for page_num in pending:
+                    yield page_num, _PendingPage(
+                        page_size, "RGB", lambda page_num=page_num: self._rasterize_pdf_page(pdf_path, page_num)
+                    )
+
+            first_images = []
+            if settings.ORIENTATION_DETECTION == "document" and not completed_pages:
+                first_images = [
+                    page.load() for _, page in islice(make_pages(), settings.ORIENTATION_SAMPLE_PAGES)
+                ]
+
+            yield from self._iter_document_pages(
+                "PDF", pdf_path, page_count, make_pages, first_images, engine, profile, completed_pages, job
+            )
 
-            print(f"✅ PDF converted successfully - {len(images)} pages found")
-            worker_count = max(1, min(len(images), self.max_workers, 4))
-            print(f"⚡ Processing pages in parallel with {worker_count} workers...")
-
-            # Prepare arguments for parallel processing
-            page_args = [
-                (image, page_num, pdf_path, engine)
-                for page_num, image in enumerate(images, start=1)
-            ]
-
-            # Process pages in parallel using Pool with spawn method
-            from multiprocessing import get_context
-            try:
-                with get_context('spawn').Pool(processes=worker_count) as pool:
-                    page_results = pool.map(_process_page_worker, page_args)
-            except Exception as parallel_error:
-                warning_msg = (
-                    f"Parallel PDF processing failed ({parallel_error}). "
-                    "Falling back to sequential execution."
-                )
-                print(f"⚠️  {warning_msg}")
-                logger.warning(warning_msg)
-
-                page_results = []
-                for args in page_args:
-                    page_results.append(_process_page_worker(args))
-
-            # Sort results by page number
-            page_results.sort(key=lambda x: x["page_num"])
-
-            # Combine results
-            all_pages_text = []
-            all_pages_lines = []
-            total_confidence = 0.0
-            total_lines = 0
-            engines_used = []
-
-            for page_result in page_results:
-                page_num = page_result["page_num"]
-
-                if page_result["success"]:
-                    lines_found = page_result["line_count"]
-                    confidence = page_result["confidence"]
-                    engine_used = page_result.get("engine_used", "unknown")
-                    engines_used.append(f"Page {page_num}: {engine_used}")
+        except Exception as e:
+            print(f"❌ PDF processing error: {str(e)}")
+            logger.error(f"PDF processing error: {str(e)}")
+            yield "done", {
+                "success": False,
+                "text": "",
+                "lines": [],
+                "confidence": 0.0,
+                "error": f"PDF processing failed: {str(e)}"
+            }
 
-                    print(f"   ✅ Page {page_num}: {lines_found} lines (confidence: {confidence:.1%}) - {engine_used}")
+    def _pdf_page_pixels(self, info: Dict) -> Tuple[int, int]:
+        """Rasterized size of a PDF's pages, from the first page's size in pdfinfo"""
+        match = re.match(r"\s*([\d.]+) x ([\d.]+)", info.get("Page size", ""))
+        width, height = map(float, match.groups()) if match else DEFAULT_PDF_PAGE_POINTS
+        return round(width * self.pdf_dpi / 72), round(height * self.pdf_dpi / 72)
+
+    def _rasterize_pdf_page(self, pdf_path: str, page_num: int) -> Image.Image:
+        with metrics.PDF_RASTERIZE_SECONDS.time(), profiling.stage("pdf_rasterize"):
+            images = convert_from_path(pdf_path, dpi=self.pdf_dpi, first_page=page_num, last_page=page_num)
+        if not images:
+            raise RuntimeError(f"Could not rasterize page {page_num}")
+        return images[0]
+
+    def _iter_tiff_pages(
+        self,
+        tiff_path: str,
+        engine: str = "auto",
+        profile: str = "balanced",
+        completed_pages: Optional[Dict[int, Dict]] = None,
+        job: Optional[OCRJob] = None
+    ) -> Iterator[Tuple[str, Dict]]:
+        """
+        Extract text from every frame of a multi-page TIFF using parallel processing
 
-                    # Add page header
-                    page_header = f"\n{'='*60}\nPAGE {page_num}\n{'='*60}\n"
-                    all_pages_text.append(page_header + page_result["text"])
+        Frames are decoded one at a time once the memory budget has room for
+        them, so only the frames in flight are held in memory however long
+        the file is.
+        """
+        try:
+            page_count = _frame_count(tiff_path)
 
-                    # Add lines
-                    all_pages_lines.extend(page_result["lines"])
+            print(f"\n{'='*60}")
+            print(f"🗂️  Processing TIFF: {os.path.basename(tiff_path)} - {page_count} frames")
+            print(f"{'='*60}")
 
-                    total_confidence += page_result["confidence"] * page_result["line_count"]
-                    total_lines += page_result["line_count"]
-                else:
-                    print(f"   ⚠️  Page {page_num}: No text detected")
+            completed_pages = completed_pages or {}
+            pending = [page_num for page_num in range(1, page_count + 1) if page_num not in completed_pages]
 
-            # Calculate overall confidence
-            avg_confidence = total_confidence / total_lines if total_lines > 0 else 0.0
+            first_frames = []
+            if settings.ORIENTATION_DETECTION == "document" and not completed_pages:
+                first_frames = [
+                    frame for _, frame in islice(_iter_frames(tiff_path), settings.ORIENTATION_SAMPLE_PAGES)
+                ]
 
-            print(f"\n{'='*60}")
-            print("✅ PDF Processing Complete!")
-            print(f"   📊 Total Pages: {len(images)}")
-            print(f"   📝 Total Lines: {total_lines}")
-            print(f"   🎯 Overall Confidence: {avg_confidence:.1%}")
-            print(f"   ⚡ Parallel Processing: {worker_count if page_results else 1} workers used")
-            print(f"{'='*60}\n")
-
-            logger.info(
-                "PDF processing complete: %s pages, %s total lines, %.2f%% overall confidence",
-                len(images),
-                total_lines,
-                avg_confidence * 100,
+            yield from self._iter_document_pages(
+                "TIFF", tiff_path, page_count, lambda: _iter_pending_frames(tiff_path, pending),
+                first_frames, engine, profile, completed_pages, job or OCRJob()
             )
 
-            return {
-                "success": True,
-                "text": "\n".join(all_pages_text),
-                "lines": all_pages_lines,
-                "confidence": float(avg_confidence),
-                "line_count": total_lines,
-                "page_count": len(images),
-                "engines_used": engines_used,
-                "parallel_workers": worker_count if page_results else 1
-            }
-
         except Exception as e:
-            print(f"❌ PDF processing error: {str(e)}")
-            logger.error(f"PDF processing error: {str(e)}")
-            return {
+            print(f"❌ TIFF processing error: {str(e)}")
+            logger.error(f"TIFF processing error: {str(e)}")
+            yield "done", {
                 "success": False,
                 "text": "",
                 "lines": [],
                 "confidence": 0.0,
-                "error": f"PDF processing failed: {str(e)}"
+                "error": f"TIFF processing failed: {str(e)}"
             }
 
-    def _extract_from_image_auto(self, image_path: str, engine: str = "auto") -> Dict:
+    def _combine_pages(
+        self,
+        page_results: List[Dict],
+        page_count: int,
+        worker_count: int,
+        orientation,
+        kind: str
+    ) -> Dict:
+        """Record per-page metrics and merge page results into one document result"""
+        # Sort results by page number
+        page_results.sort(key=lambda x: x["page_num"])
+
+        # Combine results
+        all_pages_text = []
+        all_pages_lines = []
+        total_confidence = 0.0
+        total_lines = 0
+        engines_used = []
+        rotated_pages = 0
+        timed_out_pages = []
+
+        for page_result in page_results:
+            page_num = page_result["page_num"]
+            if page_result.get("rotation"):
+                rotated_pages += 1
+
+            # Pages restored from a checkpoint were already counted by the run that did them
+            if not page_result.get("checkpointed"):
+                if orientation is not None:
+                    _record_rotation(page_result.get("rotation"))
+                metrics.observe_page_timings(page_result.get("timings", {}))
+                for stage_name, seconds in page_result.get("timings", {}).items():
+                    profiling.record(f"page_{stage_name}", seconds)
+                profiling.add_report(f"page_{page_num}.html", page_result.pop("profile_report", None))
+                metrics.PAGES_TOTAL.labels(engine=page_result.get("engine_used", "none")).inc()
+                if page_result.get("timed_out"):
+                    timed_out_pages.append(page_num)
+                elif page_result.get("error"):
+                    metrics.FAILURES_TOTAL.labels(stage="page").inc()
+
+            if page_result["success"]:
+                lines_found = page_result["line_count"]
+                confidence = page_result["confidence"]
+                engine_used = page_result.get("engine_used", "unknown")
+                engines_used.append(f"Page {page_num}: {engine_used}")
+
+                print(f"   ✅ Page {page_num}: {lines_found} lines (confidence: {confidence:.1%}) - {engine_used}")
+
+                # Add page header
+                page_header = f"\n{'='*60}\nPAGE {page_num}\n{'='*60}\n"
+                all_pages_text.append(page_header + page_result["text"])
+
+                # Add lines
+                all_pages_lines.extend(page_result["lines"])
+
+                total_confidence += page_result["confidence"] * page_result["line_count"]
+                total_lines += page_result["line_count"]
+            elif page_result.get("timed_out"):
+                print(f"   ⏱️  Page {page_num}: {page_result['error']}")
+            else:
+                print(f"   ⚠️  Page {page_num}: No text detected")
+
+        # Calculate overall confidence
+        avg_confidence = total_confidence / total_lines if total_lines > 0 else 0.0
+
+        print(f"\n{'='*60}")
+        print(f"✅ {kind} Processing Complete!")
+        print(f"   📊 Total Pages: {page_count}")
+        print(f"   📝 Total Lines: {total_lines}")
+        print(f"   🎯 Overall Confidence: {avg_confidence:.1%}")
+        print(f"   🧭 Rotated Pages: {rotated_pages}")
+        if timed_out_pages:
+            print(f"   ⏱️  Timed-out Pages: {', '.join(map(str, timed_out_pages))}")
+        print(f"   ⚡ Parallel Processing: {worker_count if page_results else 1} workers used")
+        print(f"{'='*60}\n")
+
+        logger.info(
+            "%s processing complete: %s pages, %s total lines, %.2f%% overall confidence",
+            kind,
+            page_count,
+            total_lines,
+            avg_confidence * 100,
+        )
+
+        return {
+            "success": True,
+            "text": "\n".join(all_pages_text),
+            "lines": all_pages_lines,
+            "confidence": float(avg_confidence),
+            "line_count": total_lines,
+            "page_count": page_count,
+            "engines_used": engines_used,
+            "parallel_workers": worker_count if page_results else 1,
+            "rotated_pages": rotated_pages,
+            "timed_out_pages": timed_out_pages
+        }
+
+    def _extract_from_image_auto(
+        self,
+        image_path: str,
+        engine: str = "auto",
+        profile: str = "balanced",
+        job: Optional[OCRJob] = None
+    ) -> Dict:
         """Extract text with automatic fallback"""
 
         if engine == "tesseract":
             return self._extract_with_tesseract(image_path)
 
         if engine == "paddleocr":
-            return self._extract_from_image(image_path)
+            return self._extract_from_image(image_path, profile, job)
 
         # Auto mode: try PaddleOCR first
-        paddle_result = self._extract_from_image(image_path)
+        paddle_result = self._extract_from_image(image_path, profile, job)
 
         # Check if PaddleOCR succeeded with good confidence
-        if paddle_result["success"] and paddle_result["confidence"] >= settings.OCR_CONFIDENCE_THRESHOLD:
+        if paddle_result["success"] and paddle_result["confidence"] >= self.confidence_threshold:
             paddle_result["engine_used"] = "paddleocr"
             return paddle_result
 
         # Fallback to Tesseract if enabled
         if settings.TESSERACT_ENABLED:
+            metrics.FALLBACKS_TOTAL.inc()
             tesseract_result = self._extract_with_tesseract(image_path)
 
             if tesseract_result["success"]:
@@ -317,7 +948,8 @@ class OCRService:
             img = Image.open(image_path)
 
             # Get detailed data with confidence
-            data = pytesseract.image_to_data(img, output_type=pytesseract.Output.DICT)
+            with metrics.TESSERACT_SECONDS.time(), profiling.stage("tesseract"):
+                data = pytesseract.image_to_data(img, output_type=pytesseract.Output.DICT)
 
             # Process results
             lines = []
@@ -353,6 +985,7 @@ class OCRService:
 
         except Exception as e:
             logger.error(f"Tesseract error: {str(e)}")
+            metrics.FAILURES_TOTAL.labels(stage="tesseract").inc()
             return {
                 "success": False,
                 "text": "",
@@ -361,11 +994,29 @@ class OCRService:
                 "error": str(e)
             }
 
-    def _extract_from_image(self, image_path: str) -> Dict:
+    def _extract_from_image(self, image_path: str, profile: str = "balanced", job: Optional[OCRJob] = None) -> Dict:
         """Extract text from image file using PaddleOCR"""
         try:
+            paddle_ocr = self._get_engine(profile)
+            image, rotation, use_cls = image_path, None, bool(paddle_ocr.use_angle_cls)
+
+            pixels = cv2.imread(image_path)
+            if pixels is not None:
+                image = pixels
+                if settings.ORIENTATION_DETECTION != "off":
+                    image, rotation, use_cls = _orient_page(pixels, "detect", use_cls)
+                    _record_rotation(rotation)
+
+                if settings.OCR_TILE_THRESHOLD and max(image.shape[:2]) > settings.OCR_TILE_THRESHOLD:
+                    return self._extract_tiled(image, profile, use_cls, rotation, job)
+
             # Run OCR
-            result = self.paddle_ocr.ocr(image_path, cls=True)
+            with profiling.stage("paddleocr"):
+                result = paddle_ocr.ocr(image, cls=use_cls)
+            metrics.observe_page_timings(paddle_ocr.last_timings)
+            for stage_name, seconds in paddle_ocr.last_timings.items():
+                profiling.record(f"page_{stage_name}", seconds)
+            metrics.PAGES_TOTAL.labels(engine="paddleocr").inc()
 
             if not result or not result[0]:
                 return {
@@ -373,7 +1024,9 @@ class OCRService:
                     "text": "",
                     "lines": [],
                     "confidence": 0.0,
-                    "error": "No text detected"
+                    "error": "No text detected",
+                    "rotation": rotation,
+                    "rotated_pages": int(bool(rotation))
                 }
 
             # Process results
@@ -403,10 +1056,13 @@ class OCRService:
                 "text": "\n".join(all_text),
                 "lines": lines,
                 "confidence": float(avg_confidence),
-                "line_count": len(lines)
+                "line_count": len(lines),
+                "rotation": rotation,
+                "rotated_pages": int(bool(rotation))
             }
 
         except Exception as e:
+            metrics.FAILURES_TOTAL.labels(stage="paddleocr").inc()
             return {
                 "success": False,
                 "text": "",
@@ -415,24 +1071,386 @@ class OCRService:
                 "error": str(e)
             }
 
+    def _extract_tiled(
+        self,
+        image: np.ndarray,
+        profile: str,
+        use_cls: bool,
+        rotation: Optional[int],
+        job: Optional[OCRJob] = None
+    ) -> Dict:
+        """
+        OCR an oversized image as overlapping tiles across the worker pool
+
+        Tiles match the profile's detection limit so text is detected at full
+        resolution; lines are merged across seams in image coordinates.
+        """
+        options = self._profile_options(profile)
+        height, width = image.shape[:2]
+        tile_size = settings.OCR_TILE_SIZE or int(options.get("det_limit_side_len", 960))
+        tiles = tile_grid(width, height, tile_size, settings.OCR_TILE_OVERLAP)
+        worker_count = max(1, min(len(tiles), self.max_workers))
+        sample_workers = profiling.sampling_enabled()
+
+        logger.info(
+            f"🧩 Tiling {width}x{height} image into {len(tiles)} tiles of {tile_size}px ({worker_count} workers)"
+        )
+
+        def tile_args():
+            for index, (x, y, tile_width, tile_height) in enumerate(tiles):
+                yield (image[y:y + tile_height, x:x + tile_width], index, x, y, options, use_cls, sample_workers)
+
+        tile_results = self._run_in_pool(
+            _process_tile_worker, tile_args, len(tiles), worker_count, "tile_pool", job,
+            lambda args, error: {"tile": args[1], "success": False, "lines": [], "error": error, "timed_out": True},
+            lambda args: task_memory(args[0])
+        )
+
+        errors = []
+        for tile_result in tile_results:
+            metrics.observe_page_timings(tile_result.get("timings", {}))
+            for stage_name, seconds in tile_result.get("timings", {}).items():
+                profiling.record(f"tile_{stage_name}", seconds)
+            profiling.add_report(f"tile_{tile_result['tile']}.html", tile_result.pop("profile_report", None))
+            if tile_result.get("error"):
+                if not tile_result.get("timed_out"):
+                    metrics.FAILURES_TOTAL.labels(stage="tile").inc()
+                errors.append(tile_result["error"])
+        metrics.PAGES_TOTAL.labels(engine="paddleocr").inc()
+
+        with profiling.stage("tile_merge"):
+            lines = merge_tile_lines(
+                [(tiles[tile_result["tile"]], tile_result["lines"]) for tile_result in tile_results],
+                (width, height)
+            )
+
+        if not lines:
+            return {
+                "success": False,
+                "text": "",
+                "lines": [],
+                "confidence": 0.0,
+                "error": errors[0] if errors else "No text detected",
+                "rotation": rotation,
+                "rotated_pages": int(bool(rotation)),
+                "tiles": len(tiles)
+            }
+
+        avg_confidence = sum(line["confidence"] for line in lines) / len(lines)
+
+        return {
+            "success": True,
+            "text": "\n".join(line["text"] for line in lines),
+            "lines": lines,
+            "confidence": float(avg_confidence),
+            "line_count": len(lines),
+            "rotation": rotation,
+            "rotated_pages": int(bool(rotation)),
+            "tiles": len(tiles)
+        }
+
+    def _load_pages(self, file_path: str, page_numbers) -> Dict[int, np.ndarray]:
+        """Load the requested pages of an image or PDF as BGR arrays"""
+        if not file_path.lower().endswith('.pdf'):
+            image = cv2.imread(file_path)
+            return {1: image} if image is not None and 1 in page_numbers else {}
+
+        pages = {}
+        for page_num in sorted(page_numbers):
+            with metrics.PDF_RASTERIZE_SECONDS.time(), profiling.stage("pdf_rasterize"):
+                images = convert_from_path(
+                    file_path, dpi=self.pdf_dpi, first_page=page_num, last_page=page_num
+                )
+            if images:
+                pages[page_num] = cv2.cvtColor(np.asarray(images[0].convert("RGB")), cv2.COLOR_RGB2BGR)
+        return pages
+
+    def extract_regions(
+        self,
+        file_path: str,
+        template: Dict,
+        profile: Optional[str] = None,
+        auto_orient: bool = False
+    ) -> Dict:
+        """
+        Recognise the named regions of a fixed-layout template
+
+        Each region is cropped (scaled from the template's page size to the
+        uploaded page) and passed to the recognizer directly, skipping
+        full-page text detection. Single-line regions are recognised together
+        in batches; regions marked multiline run detection inside the crop.
+
+        Args:
+            file_path: Path to the image or PDF file
+            template: Template dict with width, height and regions
+            profile: Speed profile; defaults to DEFAULT_OCR_PROFILE
+            auto_orient: Turn rotated pages upright first; only rotations
+                detected with high confidence are applied, since a wrong
+                one puts every region on the wrong part of the page
+
+        Returns:
+            Dict with a "fields" map of region name -> text and confidence
+        """
+        try:
+            profile = resolve_profile(profile)
+            paddle_ocr = self._get_engine(profile)
+            regions = template["regions"]
+            pages = self._load_pages(file_path, {region.get("page", 1) for region in regions})
+
+            if auto_orient:
+                for page_num, image in pages.items():
+                    with profiling.stage("orientation"):
+                        rotation, score = detect_orientation(image)
+                    if score < CONFIDENT_SCORE:
+                        rotation = None
+                    if rotation:
+                        pages[page_num] = rotate_array(image, rotation)
+                    _record_rotation(rotation)
+
+            fields = {}
+            crops = []
+            pending = []
+
+            for region in regions:
+                name = region["name"]
+                page_num = region.get("page", 1)
+                image = pages.get(page_num)
+                if image is None:
+                    fields[name] = {"text": "", "confidence": 0.0, "page": page_num, "error": "Page not found"}
+                    continue
+
+                # Region coordinates refer to the template's page size
+                scale_x = image.shape[1] / template["width"]
+                scale_y = image.shape[0] / template["height"]
+                x0 = max(0, int(region["x"] * scale_x))
+                y0 = max(0, int(region["y"] * scale_y))
+                x1 = min(image.shape[1], int((region["x"] + region["width"]) * scale_x))
+                y1 = min(image.shape[0], int((region["y"] + region["height"]) * scale_y))
+                bbox = [[float(x0), float(y0)], [float(x1), float(y0)], [float(x1), float(y1)], [float(x0), float(y1)]]
+
+                if x1 <= x0 or y1 <= y0:
+                    fields[name] = {"text": "", "confidence": 0.0, "page": page_num, "error": "Region outside page"}
+                    continue
+
+                crop = image[y0:y1, x0:x1]
+
+                if region.get("multiline"):
+                    with profiling.stage("region_ocr"):
+                        result = paddle_ocr.ocr(crop, cls=False)
+                    found = result[0] if result and result[0] else []
+                    scores = [float(line[1][1]) for line in found]
+                    fields[name] = {
+                        "text": "\n".join(line[1][0] for line in found),
+                        "confidence": sum(scores) / len(scores) if scores else 0.0,
+                        "page": page_num,
+                        "bbox": bbox
+                    }
+                else:
+                    crops.append(crop)
+                    pending.append((name, page_num, bbox))
+
+            if crops:
+                with profiling.stage("region_rec"):
+                    # A nested list is handed to the recognizer as one batch
+                    recognized = paddle_ocr.ocr([crops], det=False, cls=False)[0]
+
+                for (name, page_num, bbox), (text, confidence) in zip(pending, recognized):
+                    fields[name] = {
+                        "text": text,
+                        "confidence": float(confidence),
+                        "page": page_num,
+                        "bbox": bbox
+                    }
+
+            metrics.PAGES_TOTAL.labels(engine="paddleocr_template").inc(len(pages))
+
+            fields = {region["name"]: fields[region["name"]] for region in regions}
+            lines = [
+                {"text": field["text"], "confidence": field["confidence"], "bbox": field["bbox"],
+                 "page": field["page"], "field": name}
+                for name, field in fields.items() if field.get("text")
+            ]
+            avg_confidence = sum(line["confidence"] for line in lines) / len(lines) if lines else 0.0
+
+            return {
+                "success": True,
+                "fields": fields,
+                "text": "\n".join(f"{name}: {field['text']}" for name, field in fields.items()),
+                "lines": lines,
+                "confidence": float(avg_confidence),
+                "line_count": len(lines),
+                "engine_used": "paddleocr (recognition only)",
+                "profile": profile
+            }
+
+        except Exception as e:
+            logger.error(f"❌ Template extraction failed: {str(e)}")
+            metrics.FAILURES_TOTAL.labels(stage="template").inc()
+            return {
+                "success": False,
+                "fields": {},
+                "text": "",
+                "lines": [],
+                "confidence": 0.0,
+                "engine_used": "none",
+                "error": str(e)
+            }
+
+
+def _frame_count(image_path: str) -> int:
+    """Number of frames (pages) in an image file; 1 for single-image formats"""
+    try:
+        with Image.open(image_path) as image:
+            return getattr(image, "n_frames", 1)
+    except Exception:
+        return 1
+
+
+class _PendingPage:
+    """
+    A page that is decoded only when a pool is about to take it
+
+    Its pixel size and mode are known up front, so memory can be reserved
+    for it (task_memory accepts it like an image) before load() decodes it.
+    """
+
+    def __init__(self, size: Tuple[int, int], mode: str, load):
+        self.size = size
+        self.mode = mode
+        self.load = load
+
+    def getbands(self) -> Tuple[str, ...]:
+        return ImageMode.getmode(self.mode).bands
+
+
+def _load_frame(image_path: str, page_num: int) -> Image.Image:
+    with Image.open(image_path) as image:
+        image.seek(page_num - 1)
+        return image.convert("RGB")
+
+
+def _iter_pending_frames(image_path: str, page_numbers: List[int]) -> Iterator[Tuple[int, _PendingPage]]:
+    """Frames of a multi-page image as (page_num, _PendingPage); only their headers are read"""
+    with Image.open(image_path) as image:
+        for page_num in page_numbers:
+            image.seek(page_num - 1)
+            yield page_num, _PendingPage(
+                image.size, "RGB", lambda page_num=page_num: _load_frame(image_path, page_num)
+            )
+
+
+def _iter_frames(image_path: str, page_numbers: Optional[List[int]] = None):
+    """Decode frames of a multi-page image one at a time as (page_num, RGB image)"""
+    with Image.open(image_path) as image:
+        if page_numbers is None:
+            page_numbers = range(1, getattr(image, "n_frames", 1) + 1)
+        for page_num in page_numbers:
+            image.seek(page_num - 1)
+            yield page_num, image.convert("RGB")
+
+
+# In pool worker processes: queue telling the parent which worker took which task,
+# and how many tasks this worker has run
+_task_starts = None
+_tasks_done = 0
+
+
+def _init_pool_worker(task_starts, budget: cpu_budget.CPUBudget, pin_slots=None):
+    """Pool initializer: keep the task queue and apply the worker's CPU budget"""
+    global _task_starts
+    _task_starts = task_starts
+    cpu_budget.limit_opencv_threads(budget.threads_per_worker)
+    if pin_slots is not None:
+        cpu_budget.pin_to_slot(budget, pin_slots)
+
+
+def _run_tracked(payload: Tuple) -> Tuple[Dict, int, bool]:
+    """
+    Run one pool task, reporting on the worker around it
+
+    Announces (task index, worker pid) to the parent so it can time the
+    task, and returns (result, worker RSS, whether the worker retires after
+    this task) so the parent can watch memory.
+    """
+    global _tasks_done
+    index, worker, args = payload
+    if _task_starts is not None:
+        _task_starts.put((index, os.getpid()))
+
+    result = worker(args)
+    _tasks_done += 1
+
+    rss = current_rss()
+    if settings.OCR_WORKER_MAX_RSS_MB and rss > settings.OCR_WORKER_MAX_RSS_MB * MB:
+        # Returning freed heap to the OS is often enough to get back under the limit
+        release_freed_memory()
+        rss = current_rss()
+
+    retiring = bool(settings.OCR_WORKER_MAX_TASKS) and _tasks_done >= settings.OCR_WORKER_MAX_TASKS
+    return result, rss, retiring
+
+
+def _timed_out_page(page_num: int, error: str) -> Dict:
+    """Result reported for a page abandoned at a deadline"""
+    return {
+        "page_num": page_num,
+        "success": False,
+        "text": "",
+        "lines": [],
+        "confidence": 0.0,
+        "line_count": 0,
+        "engine_used": "none",
+        "error": error,
+        "timed_out": True
+    }
+
+
+# Engines created inside a pool worker process, keyed by their options
+_worker_engines: Dict[str, _TimedPaddleOCR] = {}
+
+
+def _get_worker_engine(paddle_options: Dict) -> _TimedPaddleOCR:
+    """Reuse one PaddleOCR engine per profile for every page a worker processes"""
+    key = json.dumps(paddle_options, sort_keys=True)
+    if key not in _worker_engines:
+        _worker_engines[key] = _TimedPaddleOCR(**paddle_options)
+    return _worker_engines[key]
+
 
 def _process_page_worker(args: Tuple) -> Dict:
     """Worker function for parallel page processing"""
-    image, page_num, temp_path, engine = args
-
+    image, page_num, temp_path, engine, sample, paddle_options, orientation = args
+
+    with profiling.sample_worker(sample) as report:
+        result = _run_page(image, page_num, temp_path, engine, paddle_options, orientation)
+
+    if report.get("html"):
+        result["profile_report"] = report["html"]
+    return result
+
+
+def _run_page(
+    image,
+    page_num: int,
+    temp_path: str,
+    engine: str,
+    paddle_options: Dict,
+    orientation=None
+) -> Dict:
+    """OCR a single page image inside a pool worker"""
+    rotation = None
     try:
-        temp_image_path = temp_path.replace('.pdf', f'_page{page_num}_temp.jpg')
+        image, rotation, use_cls = _orient_page(
+            image, orientation, bool(paddle_options.get("use_angle_cls", True))
+        )
+
+        temp_image_path = f"{os.path.splitext(temp_path)[0]}_page{page_num}_temp.jpg"
         image.save(temp_image_path, 'JPEG')
 
-        from paddleocr import PaddleOCR
-        paddle_ocr = PaddleOCR(
-            use_angle_cls=True,
-            lang='en',
-            use_gpu=False,
-            show_log=False
-        )
+        paddle_ocr = _get_worker_engine(paddle_options)
 
-        result = paddle_ocr.ocr(temp_image_path, cls=True)
+        result = paddle_ocr.ocr(temp_image_path, cls=use_cls)
+        timings = paddle_ocr.last_timings
 
         if os.path.exists(temp_image_path):
             os.remove(temp_image_path)
@@ -445,7 +1463,9 @@ def _process_page_worker(args: Tuple) -> Dict:
                 "lines": [],
                 "confidence": 0.0,
                 "line_count": 0,
-                "engine_used": "none"
+                "engine_used": "none",
+                "timings": timings,
+                "rotation": rotation
             }
 
         lines = []
@@ -477,11 +1497,13 @@ def _process_page_worker(args: Tuple) -> Dict:
             "lines": lines,
             "confidence": float(avg_confidence),
             "line_count": len(lines),
-            "engine_used": "paddleocr"
+            "engine_used": "paddleocr",
+            "timings": timings,
+            "rotation": rotation
         }
 
     except Exception as e:
-        temp_image_path = temp_path.replace('.pdf', f'_page{page_num}_temp.jpg')
+        temp_image_path = f"{os.path.splitext(temp_path)[0]}_page{page_num}_temp.jpg"
         if os.path.exists(temp_image_path):
             os.remove(temp_image_path)
 
@@ -497,5 +1519,51 @@ def _process_page_worker(args: Tuple) -> Dict:
         }
 
 
+def _process_tile_worker(args: Tuple) -> Dict:
+    """Worker function for parallel tile processing"""
+    tile, index, x, y, paddle_options, use_cls, sample = args
+
+    with profiling.sample_worker(sample) as report:
+        result = _run_tile(tile, index, x, y, paddle_options, use_cls)
+
+    if report.get("html"):
+        result["profile_report"] = report["html"]
+    return result
+
+
+def _run_tile(tile: np.ndarray, index: int, x: int, y: int, paddle_options: Dict, use_cls: bool) -> Dict:
+    """OCR one tile, returning lines in full-image coordinates"""
+    try:
+        paddle_ocr = _get_worker_engine(paddle_options)
+        result = paddle_ocr.ocr(tile, cls=use_cls)
+
+        lines = []
+        for box, (text, confidence) in (result[0] or []) if result else []:
+            lines.append({
+                "text": text,
+                "confidence": float(confidence),
+                "bbox": [[float(px) + x, float(py) + y] for px, py in box]
+            })
+
+        return {
+            "tile": index,
+            "success": True,
+            "lines": lines,
+            "timings": paddle_ocr.last_timings
+        }
+
+    except Exception as e:
+        return {
+            "tile": index,
+            "success": False,
+            "lines": [],
+            "error": str(e)
+        }
+
+
 # Global OCR service instance
-ocr_service = OCRService()
+if settings.OCR_BACKEND == "stub":
+    from app.services.stub_ocr_service import StubOCRService
+    ocr_service = StubOCRService()
+else:
+    ocr_service = OCRService()
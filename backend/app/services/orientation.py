@@ -0,0 +1,236 @@
+"""
+Cheap page orientation detection
+
+Decides once per page whether the text is upright, rotated 90/270 degrees or
+upside down, so PaddleOCR's per-line angle classifier can be skipped on the
+(vast majority of) pages that are simply upright.
+
+The check works on ink projection profiles of a downscaled, binarized page:
+
+* Horizontal text lines make the row profile alternate between text and
+  gaps while the column profile stays flat; vertical text does the opposite.
+* Within a Latin text line most ink sits in the x-height band, and there
+  are more ascenders above it than descenders below, so the ink outside the
+  band is mostly above it when upright and mostly below when upside down.
+
+Both signals need a page of text to be reliable: on a few lines or a
+single-line snippet the ascender balance is noise, and the letters of one
+line look like a stack of short vertical "lines". So the page must have
+MIN_TEXT_LINES elongated text lines and MIN_INK_FRACTION ink in the chosen
+direction. When any signal is too weak (blank pages, tables, photos, little
+text, snippets) the result is inconclusive and the caller should fall back
+to the per-line classifier. Results below CONFIDENT_SCORE may be acted on
+but the per-line classifier should stay on.
+"""
+
+from typing import List, Optional, Tuple
+import cv2
+import numpy as np
+from PIL import Image
+
+# Longest side the page is downscaled to before analysis
+ANALYSIS_SIZE = 1000
+
+# Ink components smaller than this (px, after downscaling) are noise
+SPECK_AREA = 2
+
+# Row/column profile contrast ratio needed to call the text direction
+DIRECTION_RATIO = 1.3
+
+# Mean ascender/descender imbalance needed to tell upright from upside down
+FLIP_MARGIN = 0.2
+
+# Imbalance above which the per-line angle classifier can be skipped
+CONFIDENT_SCORE = 0.25
+
+# The page is analysed in narrow strips so slight skew doesn't smear lines together
+STRIPS = 8
+
+MIN_TEXT_BANDS = 3
+
+# Rows of near-empty profile that still belong to the same text band
+BAND_GAP = 2
+
+# Text lines (across the full width) a page needs before its orientation is trusted
+MIN_TEXT_LINES = 8
+
+# Rows a band needs to be a text line rather than a fragment
+MIN_LINE_HEIGHT = 4
+
+# Median width/height of those lines; a rotated snippet's letters are about 1
+MIN_LINE_ASPECT = 4.0
+
+# Share of a line's extent its ink must cover
+MIN_LINE_FILL = 0.6
+
+# Share of the page that must be ink
+MIN_INK_FRACTION = 0.002
+
+# Counter-clockwise rotation that makes the page upright -> PIL transpose
+PIL_ROTATIONS = {
+    90: Image.ROTATE_90,
+    180: Image.ROTATE_180,
+    270: Image.ROTATE_270,
+}
+
+CV2_ROTATIONS = {
+    90: cv2.ROTATE_90_COUNTERCLOCKWISE,
+    180: cv2.ROTATE_180,
+    270: cv2.ROTATE_90_CLOCKWISE,
+}
+
+
+def _binarize(gray: np.ndarray) -> np.ndarray:
+    """Downscale and return a 0/1 ink mask without speckle"""
+    height, width = gray.shape[:2]
+    scale = ANALYSIS_SIZE / max(height, width)
+    if scale < 1.0:
+        gray = cv2.resize(gray, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+
+    _, mask = cv2.threshold(gray, 0, 1, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+
+    # Scan speckle would otherwise stretch every band across the page
+    _, labels, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+    keep = (stats[:, cv2.CC_STAT_AREA] >= SPECK_AREA).astype(np.uint8)
+    keep[0] = 0  # Background
+    return keep[labels]
+
+
+def _strip_profiles(mask: np.ndarray):
+    """Row profiles of STRIPS vertical strips of the mask"""
+    width = mask.shape[1]
+    for index in range(STRIPS):
+        strip = mask[:, index * width // STRIPS:(index + 1) * width // STRIPS]
+        yield strip.sum(axis=1).astype(np.float64)
+
+
+def _line_contrast(mask: np.ndarray) -> float:
+    """How strongly the row profiles alternate between text lines and gaps"""
+    contrasts = []
+    for rows in _strip_profiles(mask):
+        mean = rows.mean()
+        if mean > 0:
+            contrasts.append(rows.std() / mean)
+    return float(np.median(contrasts)) if contrasts else 0.0
+
+
+def _bands(rows: np.ndarray) -> List[Tuple[int, int]]:
+    """(start, end) of the runs of text rows in a row profile"""
+    if rows.max() == 0:
+        return []
+
+    bands = []
+    start = None
+    for y, flag in enumerate(np.append(rows > rows.max() * 0.1, False)):
+        if flag and start is None:
+            start = y
+        elif not flag and start is not None:
+            # A thin row of ink between ascenders and the x-height is the same line
+            if bands and start - bands[-1][1] <= BAND_GAP:
+                start = bands.pop()[0]
+            bands.append((start, y))
+            start = None
+    return bands
+
+
+def _text_lines(mask: np.ndarray) -> int:
+    """Number of text lines across the full width, or 0 if they aren't shaped like text"""
+    aspects = []
+    lines = 0
+    for start, end in _bands(mask.sum(axis=1)):
+        if end - start < MIN_LINE_HEIGHT:
+            continue
+        columns = np.flatnonzero(mask[start:end].any(axis=0))
+        aspect = len(columns) / (end - start)
+        aspects.append(aspect)
+        # Words leave small gaps; letters stacked by a rotation and stray specks don't fill a line
+        if aspect >= MIN_LINE_ASPECT and len(columns) >= (columns[-1] - columns[0] + 1) * MIN_LINE_FILL:
+            lines += 1
+
+    if not aspects or np.median(aspects) < MIN_LINE_ASPECT:
+        return 0
+    return lines
+
+
+def _ascender_balance(mask: np.ndarray) -> Optional[float]:
+    """
+    Ink-weighted balance of ink above vs below each text line's x-height core
+
+    Latin text has more ascenders (and capitals) than descenders, so the
+    balance is positive when upright and negative when upside down. Returns
+    None when there are too few text lines to judge.
+    """
+    balances = []
+    weights = []
+
+    for rows in _strip_profiles(mask):
+        for start, end in _bands(rows):
+            band = rows[start:end]
+            if len(band) < 4:
+                continue
+
+            core = np.flatnonzero(band >= band.max() * 0.5)
+            above = band[:core[0]].sum()
+            below = band[core[-1] + 1:].sum()
+            if above + below > 0:
+                balances.append((above - below) / (above + below))
+                weights.append(above + below)
+
+    if len(balances) < MIN_TEXT_BANDS:
+        return None
+
+    return float(np.average(balances, weights=weights))
+
+
+def detect_orientation(image) -> Tuple[Optional[int], float]:
+    """
+    Detect the rotation needed to make a page upright
+
+    Args:
+        image: PIL image or numpy array (grayscale, RGB or BGR)
+
+    Returns:
+        (rotation, score): rotation is the counter-clockwise angle in degrees
+        (0, 90, 180 or 270) that makes the page upright, or None if the
+        check is inconclusive; score is the strength of the deciding signal.
+    """
+    if isinstance(image, Image.Image):
+        gray = np.asarray(image.convert("L"))
+    elif image.ndim == 3:
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    else:
+        gray = image
+
+    mask = _binarize(gray)
+    horizontal = _line_contrast(mask)
+    vertical = _line_contrast(np.rot90(mask, 1))
+
+    if horizontal >= vertical * DIRECTION_RATIO:
+        candidate, upright_rotation = mask, 0
+    elif vertical >= horizontal * DIRECTION_RATIO:
+        # Rotate counter-clockwise so vertical lines become horizontal
+        candidate, upright_rotation = np.rot90(mask, 1), 90
+    else:
+        return None, 0.0
+
+    # The text lines must be there, and clearly not in the other direction
+    lines = _text_lines(candidate)
+    if candidate.mean() < MIN_INK_FRACTION or lines < MIN_TEXT_LINES:
+        return None, 0.0
+    if _text_lines(np.rot90(candidate, 1)) * 2 > lines:
+        return None, 0.0
+
+    balance = _ascender_balance(candidate)
+    if balance is None or abs(balance) < FLIP_MARGIN:
+        return None, abs(balance or 0.0)
+
+    rotation = upright_rotation if balance > 0 else (upright_rotation + 180) % 360
+    return rotation, abs(balance)
+
+
+def rotate_pil(image: Image.Image, rotation: int) -> Image.Image:
+    return image.transpose(PIL_ROTATIONS[rotation]) if rotation else image
+
+
+def rotate_array(image: np.ndarray, rotation: int) -> np.ndarray:
+    return cv2.rotate(image, CV2_ROTATIONS[rotation]) if rotation else image
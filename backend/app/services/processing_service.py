@@ -0,0 +1,269 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete, or_, update
+from sqlalchemy.orm import Session
+import logging
+import threading
+from app.core import metrics
+from app.core.config import settings
+from app.models.database import SessionLocal
+from app.models.ocr_models import Document, DocumentPage
+from app.services.jobs import OCRJob
+from app.services.ocr_service import ocr_service
+from app.services.storage_service import storage_service
+
+logger = logging.getLogger(__name__)
+
+# File types processed page by page, and therefore checkpointed
+PAGED_FILE_TYPES = ("pdf", "tif", "tiff")
+
+
+def utc_now() -> datetime:
+    """Timezone-aware current time for heartbeats"""
+    return datetime.now(timezone.utc)
+
+
+class ProcessingService:
+    """
+    Run OCR for stored documents with per-page checkpoints
+
+    Every finished page of a PDF or multi-page TIFF is saved to
+    document_pages as it arrives, and the document row's line count and
+    confidence are updated; the text and lines are written to the row once,
+    when the run ends. If the process dies, the next run (the startup recovery
+    sweep or an explicit resume) only processes the pages that are missing
+    or failed.
+
+    Runs in progress are registered by document ID so they can be cancelled.
+    """
+
+    def __init__(self):
+        self._jobs: Dict[str, OCRJob] = {}
+        self._jobs_lock = threading.Lock()
+
+    def cancel(self, document_id: str) -> bool:
+        """Cancel the run processing a document in this process; False if there is none"""
+        with self._jobs_lock:
+            job = self._jobs.get(document_id)
+        if job is None:
+            return False
+        job.cancel()
+        return True
+
+    @staticmethod
+    def completed_pages(db: Session, document_id: str) -> Dict[int, Dict]:
+        """Checkpointed pages that don't need processing again (failed pages are retried)"""
+        pages = db.query(DocumentPage).filter(
+            DocumentPage.document_id == document_id,
+            DocumentPage.error_message.is_(None)
+        ).all()
+        return {page.page_num: page.to_page_result() for page in pages}
+
+    @staticmethod
+    def failed_page_count(db: Session, document_id: str) -> int:
+        return db.query(DocumentPage).filter(
+            DocumentPage.document_id == document_id,
+            DocumentPage.error_message.isnot(None)
+        ).count()
+
+    @staticmethod
+    def store_result(document: Document, ocr_result: Dict):
+        """Copy a finished OCR result onto its document row"""
+        document.processed_at = datetime.now()
+        if ocr_result.get("cancelled"):
+            # Keep the pages finished so far; their checkpoints let a resume continue
+            document.status = "cancelled"
+            document.error_message = ocr_result.get("error")
+            return
+
+        document.extracted_text = ocr_result.get("text", "")
+        document.confidence = ocr_result.get("confidence", 0.0)
+        document.line_count = ocr_result.get("line_count", 0)
+        document.ocr_lines = ocr_result.get("lines", [])
+        document.status = "completed" if ocr_result["success"] else "failed"
+        document.error_message = ocr_result.get("error")
+        if ocr_result.get("timed_out_pages"):
+            document.error_message = f"Pages timed out: {', '.join(map(str, ocr_result['timed_out_pages']))}"
+
+    def iter_process(
+        self,
+        db: Session,
+        document: Document,
+        ocr_profile: Optional[str] = None,
+        job: Optional[OCRJob] = None
+    ) -> Iterator[Tuple[str, Dict]]:
+        """
+        OCR a document, checkpointing pages as they finish
+
+        Yields the events of OCRService.iter_extract. The final result is
+        stored on the document before "done" is yielded. A cancelled run
+        leaves the document "cancelled" with its checkpoints, so it can be
+        resumed later.
+        """
+        job = job or OCRJob(settings.OCR_DOCUMENT_TIMEOUT_SECONDS)
+        with self._jobs_lock:
+            self._jobs[document.id] = job
+        try:
+            yield from self._iter_checkpointed(db, document, ocr_profile, job)
+        finally:
+            with self._jobs_lock:
+                if self._jobs.get(document.id) is job:
+                    del self._jobs[document.id]
+
+    def _iter_checkpointed(
+        self,
+        db: Session,
+        document: Document,
+        ocr_profile: Optional[str],
+        job: OCRJob
+    ) -> Iterator[Tuple[str, Dict]]:
+        document.status = "processing"
+        document.ocr_profile = ocr_profile or document.ocr_profile or settings.DEFAULT_OCR_PROFILE
+        document.updated_at = utc_now()
+        db.commit()
+
+        checkpointed = document.file_type in PAGED_FILE_TYPES
+        completed = self.completed_pages(db, document.id) if checkpointed else {}
+        if completed:
+            logger.info(f"♻️  Resuming {document.id}: {len(completed)} pages already done")
+
+        page_texts = []
+        page_lines = []
+        weighted_confidence = 0.0
+
+        # Blobs in remote storage are fetched into the local cache first
+        file_path = storage_service.ensure_local(document)
+
+        for event, data in ocr_service.iter_extract(
+            file_path, profile=document.ocr_profile, completed_pages=completed, job=job
+        ):
+            if event == "page":
+                if checkpointed and not data.get("checkpointed"):
+                    self._save_page(db, document.id, data)
+
+                if data.get("success"):
+                    page_header = f"\n{'='*60}\nPAGE {data['page_num']}\n{'='*60}\n"
+                    page_texts.append(page_header + data["text"])
+                    page_lines.extend(data["lines"])
+                    weighted_confidence += data["confidence"] * data["line_count"]
+
+                    # Progress only; rewriting the growing text and lines every page is quadratic
+                    document.line_count = len(page_lines)
+                    document.confidence = weighted_confidence / len(page_lines) if page_lines else 0.0
+
+                document.updated_at = utc_now()
+                with metrics.DB_COMMIT_SECONDS.labels(operation="ocr_page").time():
+                    db.commit()
+            else:
+                if data.get("cancelled"):
+                    # The pages finished before the cancel stay readable
+                    document.extracted_text = "\n".join(page_texts)
+                    document.ocr_lines = page_lines
+                self.store_result(document, data)
+                document.updated_at = utc_now()
+                if checkpointed and data["success"] and not self.failed_page_count(db, document.id):
+                    # Clean run: the document row now holds everything the checkpoints did
+                    db.execute(delete(DocumentPage).where(DocumentPage.document_id == document.id))
+
+                with metrics.DB_COMMIT_SECONDS.labels(operation="ocr_result").time():
+                    db.commit()
+
+            yield event, data
+
+    def process(
+        self,
+        db: Session,
+        document: Document,
+        ocr_profile: Optional[str] = None,
+        job: Optional[OCRJob] = None
+    ) -> Dict:
+        """OCR a document with checkpoints and return the final result"""
+        result = {}
+        for event, data in self.iter_process(db, document, ocr_profile, job):
+            if event == "done":
+                result = data
+        return result
+
+    @staticmethod
+    def _save_page(db: Session, document_id: str, page_result: Dict):
+        db.merge(DocumentPage(
+            document_id=document_id,
+            page_num=page_result["page_num"],
+            success=bool(page_result.get("success")),
+            text=page_result.get("text", ""),
+            lines=page_result.get("lines", []),
+            confidence=page_result.get("confidence", 0.0),
+            line_count=page_result.get("line_count", 0),
+            engine_used=page_result.get("engine_used"),
+            rotation=page_result.get("rotation"),
+            error_message=page_result.get("error"),
+            processed_at=datetime.now()
+        ))
+
+    @staticmethod
+    def _is_stale(value: Optional[datetime], cutoff: timedelta) -> bool:
+        if value is None:
+            return True
+        if value.tzinfo is None:
+            # SQLite drops the offset; heartbeats and CURRENT_TIMESTAMP are both UTC
+            value = value.replace(tzinfo=timezone.utc)
+        return utc_now() - value > cutoff
+
+    def find_interrupted(self, db: Session) -> List[Document]:
+        """
+        Documents left in processing by a run that died
+
+        A document counts as interrupted once its heartbeat (updated_at,
+        refreshed when processing starts and after every page) is older than
+        RECOVERY_STALE_SECONDS, so documents another worker process is still
+        working on are left alone.
+        """
+        cutoff = timedelta(seconds=settings.RECOVERY_STALE_SECONDS)
+        return [
+            document
+            for document in db.query(Document).filter(
+                or_(Document.status == "processing", Document.status == "recovering")
+            ).all()
+            if self._is_stale(document.updated_at or document.created_at, cutoff)
+        ]
+
+    def recover_interrupted(self) -> int:
+        """Resume every interrupted document (runs at startup); returns how many were resumed"""
+        db = SessionLocal()
+        recovered = 0
+        try:
+            for document in self.find_interrupted(db):
+                # Claim the document so only one worker process resumes it
+                claimed = db.execute(
+                    update(Document)
+                    .where(Document.id == document.id, Document.status == document.status)
+                    .values(status="recovering", updated_at=utc_now())
+                ).rowcount
+                db.commit()
+                if not claimed:
+                    continue
+
+                db.refresh(document)
+                logger.info(f"🔁 Recovering interrupted document {document.id} ({document.original_filename})")
+                try:
+                    result = self.process(db, document)
+                    recovered += 1
+                    logger.info(
+                        f"✅ Recovered {document.id}: {result.get('line_count', 0)} lines, status {document.status}"
+                    )
+                except Exception as e:
+                    db.rollback()
+                    logger.error(f"❌ Recovery of {document.id} failed: {str(e)}")
+                    document.status = "failed"
+                    document.error_message = f"Recovery failed: {str(e)}"
+                    db.commit()
+        finally:
+            db.close()
+
+        if recovered:
+            logger.info(f"Recovery sweep complete: {recovered} documents resumed")
+        return recovered
+
+
+# Global processing service instance
+processing_service = ProcessingService()
@@ -0,0 +1,193 @@
+"""
+Content-addressed upload storage with reference counting
+
+Every upload is hashed (SHA-256) and stored once under its hash in the
+configured backend (see app.core.storage). The blobs table counts the
+documents pointing at each blob, so uploading a file that is already
+stored costs a hash, a row and an existence check - no write - and a blob
+is deleted only when its last document is.
+
+Reference changes happen in the transaction that inserts or deletes the
+documents, and the order of operations keeps concurrent uploads and
+deletes of the same content safe:
+
+* Uploads are stored (store) before their documents are inserted, and
+  add_references then bumps (or creates) the blob row and only after that
+  checks the blob is still there. The row update locks the blob until
+  commit, so a concurrent collect either finished before (and the blob is
+  written again) or waits and finds it referenced.
+* collect deletes an unreferenced blob's row and then the blob, in one
+  transaction, so it never removes a blob someone has just referenced.
+  Stored files without a row (uploads whose batch OCR failed) are first
+  adopted as unreferenced rows, so they are collected the same way.
+
+When STORAGE_QUOTA_MB is set, uploads to local storage are refused while
+the disk usage measured by the storage janitor, plus what this process
+has written since, is over the quota.
+"""
+
+from collections import Counter, namedtuple
+from typing import Dict, Iterable, Iterator, Optional
+import hashlib
+import logging
+import os
+import threading
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.storage import LocalStorage, blob_key, create_storage
+from app.core import metrics
+from app.models.database import SessionLocal
+from app.models.ocr_models import Blob, Document
+
+logger = logging.getLogger(__name__)
+
+# An upload identified by its content; data is kept until its references are counted
+StoredBlob = namedtuple("StoredBlob", ["key", "content_hash", "size", "data"])
+
+INSERT_DIALECTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+class StorageService:
+    """Uploads stored once per content hash in the configured backend"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.usage_bytes: Optional[int] = None  # Unknown until the janitor has measured it
+        self._usage_lock = threading.Lock()
+
+    def blob(self, data: bytes, extension: str) -> StoredBlob:
+        """Identify an upload by the SHA-256 of its content"""
+        content_hash = hashlib.sha256(data).hexdigest()
+        return StoredBlob(blob_key(content_hash, extension.lower()), content_hash, len(data), data)
+
+    def path(self, key: str) -> str:
+        """Local path of a blob (Document.file_path)"""
+        return self.backend.path(key)
+
+    def store(self, blob: StoredBlob) -> bool:
+        """Write a blob unless it is stored already; True if it was written"""
+        if self.backend.touch(blob.key):
+            metrics.STORAGE_WRITES_TOTAL.labels(result="deduplicated").inc()
+            return False
+
+        with metrics.UPLOAD_WRITE_SECONDS.time():
+            self.backend.write(blob.key, blob.data)
+        metrics.STORAGE_WRITES_TOTAL.labels(result="written").inc()
+        self.record_usage(blob.size)
+        return True
+
+    def has_room(self, size: int) -> bool:
+        """Whether an upload of size bytes fits in STORAGE_QUOTA_MB"""
+        # The quota covers local disk; with S3 the janitor trims the cache instead
+        if not settings.STORAGE_QUOTA_MB or not isinstance(self.backend, LocalStorage):
+            return True
+        if self.usage_bytes is None:
+            return True
+        return self.usage_bytes + size <= settings.STORAGE_QUOTA_MB * 1024 * 1024
+
+    def set_usage(self, usage_bytes: int):
+        """Disk usage as measured by the storage janitor"""
+        with self._usage_lock:
+            self.usage_bytes = usage_bytes
+
+    def record_usage(self, delta: int):
+        with self._usage_lock:
+            if self.usage_bytes is not None:
+                self.usage_bytes = max(0, self.usage_bytes + delta)
+
+    def _restore(self, blob: StoredBlob):
+        if not self.backend.exists(blob.key):
+            self.backend.write(blob.key, blob.data)
+            metrics.STORAGE_WRITES_TOTAL.labels(result="restored").inc()
+
+    def ensure_local(self, document: Document) -> str:
+        """Make sure a document's file is on local disk (fetching it from the backend)"""
+        if document.blob_key:
+            return self.backend.ensure_local(document.blob_key)
+        return document.file_path
+
+    async def add_references(self, db: AsyncSession, blobs: Iterable[StoredBlob]):
+        """
+        Count new documents' references to their blobs, in the caller's transaction
+
+        Blobs collected since they were stored are written again.
+        """
+        blobs = list(blobs)
+        counts = Counter(blob.key for blob in blobs)
+        by_key: Dict[str, StoredBlob] = {blob.key: blob for blob in blobs}
+        insert = INSERT_DIALECTS[db.bind.dialect.name]
+
+        for key, count in counts.items():
+            blob = by_key[key]
+            await db.execute(
+                insert(Blob)
+                .values(key=key, content_hash=blob.content_hash, size=blob.size, ref_count=count)
+                .on_conflict_do_update(index_elements=[Blob.key], set_={"ref_count": Blob.ref_count + count})
+            )
+            await run_in_threadpool(self._restore, blob)
+
+    @staticmethod
+    def release_statements(keys: Iterable[str]) -> Iterator:
+        """UPDATEs dropping deleted documents' references to their blobs"""
+        for key, count in Counter(key for key in keys if key).items():
+            yield update(Blob).where(Blob.key == key).values(ref_count=Blob.ref_count - count)
+
+    async def release_references(self, db: AsyncSession, keys: Iterable[str]):
+        """Drop deleted documents' references, in the caller's transaction"""
+        for statement in self.release_statements(keys):
+            await db.execute(statement)
+
+    def adopt(self, db, blobs: Iterable[Dict]):
+        """
+        Record stored files that have no blob row as unreferenced blobs
+
+        blobs are dicts with key and size. Files someone has referenced in
+        the meantime keep their row.
+        """
+        insert = INSERT_DIALECTS[db.bind.dialect.name]
+        for blob in blobs:
+            content_hash = os.path.splitext(os.path.basename(blob["key"]))[0]
+            db.execute(
+                insert(Blob)
+                .values(key=blob["key"], content_hash=content_hash, size=blob["size"], ref_count=0)
+                .on_conflict_do_nothing(index_elements=[Blob.key])
+            )
+        db.commit()
+
+    def collect(self, keys: Iterable[str], reason: str = "unreferenced") -> int:
+        """
+        Delete the given blobs if no document references them
+
+        Returns the bytes reclaimed, which are also counted under reason.
+        """
+        reclaimed = 0
+        db = SessionLocal()
+        try:
+            for key in dict.fromkeys(keys):
+                try:
+                    size = db.scalar(select(Blob.size).where(Blob.key == key, Blob.ref_count <= 0))
+                    removed = db.execute(delete(Blob).where(Blob.key == key, Blob.ref_count <= 0)).rowcount
+                    if removed:
+                        self.backend.delete(key)
+                    db.commit()
+                except Exception as e:
+                    db.rollback()
+                    logger.warning(f"Could not collect blob {key}: {str(e)}")
+                    continue
+
+                if removed:
+                    reclaimed += size or 0
+                    metrics.STORAGE_RECLAIMED_FILES_TOTAL.labels(reason=reason).inc()
+                    metrics.STORAGE_RECLAIMED_BYTES_TOTAL.labels(reason=reason).inc(size or 0)
+        finally:
+            db.close()
+
+        self.record_usage(-reclaimed)
+        return reclaimed
+
+
+# Global storage service instance
+storage_service = StorageService(create_storage())
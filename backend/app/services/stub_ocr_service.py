@@ -0,0 +1,193 @@
+from typing import Dict, Optional
+import random
+import time
+import logging
+from app.core.config import settings
+from app.services.jobs import OCRJob
+
+logger = logging.getLogger(__name__)
+
+
+class StubOCRService:
+    """
+    Fake OCR engine returning canned results after a configurable delay
+
+    Selected with OCR_BACKEND=stub. It blocks the calling thread for the
+    configured latency just like the real engine does, so load tests measure
+    the API, database and serialization overhead around a predictable model
+    cost.
+    """
+
+    def __init__(
+        self,
+        latency_ms: Optional[float] = None,
+        jitter_ms: Optional[float] = None,
+        lines_per_page: Optional[int] = None,
+        pdf_pages: Optional[int] = None,
+        seed: int = 0
+    ):
+        self.latency_ms = settings.STUB_OCR_LATENCY_MS if latency_ms is None else latency_ms
+        self.jitter_ms = settings.STUB_OCR_JITTER_MS if jitter_ms is None else jitter_ms
+        self.lines_per_page = settings.STUB_OCR_LINES if lines_per_page is None else lines_per_page
+        self.pdf_pages = settings.STUB_OCR_PDF_PAGES if pdf_pages is None else pdf_pages
+        self.max_workers = 1
+        self._rng = random.Random(seed)
+        logger.info(
+            f"🧪 Stub OCR engine: {self.latency_ms}ms ±{self.jitter_ms}ms per page, "
+            f"{self.lines_per_page} lines/page"
+        )
+
+    def _sleep(self, pages: int):
+        delay = 0.0
+        for _ in range(pages):
+            delay += max(0.0, self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms))
+        if delay:
+            time.sleep(delay / 1000.0)
+
+    def _page_lines(self, page_num: Optional[int] = None):
+        lines = []
+        for idx in range(self.lines_per_page):
+            y = float(40 + idx * 32)
+            line = {
+                "text": f"Stub line {idx + 1} of synthetic OCR output",
+                "confidence": 0.95,
+                "bbox": [[40.0, y], [560.0, y], [560.0, y + 24], [40.0, y + 24]]
+            }
+            if page_num is not None:
+                line["page"] = page_num
+            lines.append(line)
+        return lines
+
+    def extract_text(
+        self,
+        file_path: str,
+        engine: str = "auto",
+        profile: Optional[str] = None,
+        job: Optional[OCRJob] = None
+    ) -> Dict:
+        """Return a canned OCR result shaped like OCRService.extract_text"""
+        if file_path.lower().endswith('.pdf'):
+            self._sleep(self.pdf_pages)
+            lines = []
+            texts = []
+            for page_num in range(1, self.pdf_pages + 1):
+                page_lines = self._page_lines(page_num)
+                lines.extend(page_lines)
+                page_header = f"\n{'='*60}\nPAGE {page_num}\n{'='*60}\n"
+                texts.append(page_header + "\n".join(line["text"] for line in page_lines))
+
+            return {
+                "success": True,
+                "text": "\n".join(texts),
+                "lines": lines,
+                "confidence": 0.95,
+                "line_count": len(lines),
+                "page_count": self.pdf_pages,
+                "engines_used": [f"Page {n}: stub" for n in range(1, self.pdf_pages + 1)],
+                "parallel_workers": 1
+            }
+
+        self._sleep(1)
+        lines = self._page_lines()
+        return {
+            "success": True,
+            "text": "\n".join(line["text"] for line in lines),
+            "lines": lines,
+            "confidence": 0.95,
+            "line_count": len(lines),
+            "engine_used": "stub"
+        }
+
+    def iter_extract(
+        self,
+        file_path: str,
+        engine: str = "auto",
+        profile: Optional[str] = None,
+        completed_pages: Optional[Dict[int, Dict]] = None,
+        job: Optional[OCRJob] = None
+    ):
+        """Yield canned per-page results like OCRService.iter_extract"""
+        cancelled = {
+            "success": False,
+            "text": "",
+            "lines": [],
+            "confidence": 0.0,
+            "engine_used": "none",
+            "error": "Processing cancelled",
+            "cancelled": True
+        }
+        if not file_path.lower().endswith('.pdf'):
+            if job is not None and job.cancelled:
+                yield "done", cancelled
+                return
+            result = self.extract_text(file_path, engine, profile)
+            yield "page", {**result, "page_num": 1}
+            yield "done", result
+            return
+
+        # One page at a time, checking for cancellation between pages like the page pool
+        lines = []
+        texts = []
+        for page_num in range(1, self.pdf_pages + 1):
+            if job is not None and job.cancelled:
+                yield "done", cancelled
+                return
+            self._sleep(1)
+            page_lines = self._page_lines(page_num)
+            page_text = "\n".join(line["text"] for line in page_lines)
+            lines.extend(page_lines)
+            texts.append(f"\n{'='*60}\nPAGE {page_num}\n{'='*60}\n" + page_text)
+            yield "page", {
+                "page_num": page_num,
+                "success": True,
+                "text": page_text,
+                "lines": page_lines,
+                "confidence": 0.95,
+                "line_count": len(page_lines),
+                "engine_used": "stub"
+            }
+
+        yield "done", {
+            "success": True,
+            "text": "\n".join(texts),
+            "lines": lines,
+            "confidence": 0.95,
+            "line_count": len(lines),
+            "page_count": self.pdf_pages,
+            "engines_used": [f"Page {n}: stub" for n in range(1, self.pdf_pages + 1)],
+            "parallel_workers": 1
+        }
+
+    def extract_regions(
+        self,
+        file_path: str,
+        template: Dict,
+        profile: Optional[str] = None,
+        auto_orient: bool = False
+    ) -> Dict:
+        """Return canned field values shaped like OCRService.extract_regions"""
+        self._sleep(1)
+        fields = {
+            region["name"]: {
+                "text": f"Stub {region['name']}",
+                "confidence": 0.95,
+                "page": region.get("page", 1),
+                "bbox": [
+                    [float(region["x"]), float(region["y"])],
+                    [float(region["x"] + region["width"]), float(region["y"])],
+                    [float(region["x"] + region["width"]), float(region["y"] + region["height"])],
+                    [float(region["x"]), float(region["y"] + region["height"])]
+                ]
+            }
+            for region in template["regions"]
+        }
+        return {
+            "success": True,
+            "fields": fields,
+            "text": "\n".join(f"{name}: {field['text']}" for name, field in fields.items()),
+            "lines": [{**field, "field": name} for name, field in fields.items()],
+            "confidence": 0.95,
+            "line_count": len(fields),
+            "engine_used": "stub",
+            "profile": profile
+        }
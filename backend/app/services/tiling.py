@@ -0,0 +1,221 @@
+"""
+Tiling for very large images
+
+PaddleOCR scales every image down so its longest side fits the detection
+limit (det_limit_side_len), which makes small text on large-format scans
+unreadable. Oversized images are instead cut into overlapping tiles about the
+size of that limit, each tile is OCRed at full resolution, and the lines are
+merged back into original image coordinates.
+
+Tiles overlap by more than a text line is tall, so a line cut by a tile's
+top or bottom edge appears whole in the neighbouring tile; the cut copy lies
+inside the whole one and is dropped. Lines longer than the overlap that
+cross a vertical seam are found in two pieces and stitched back together.
+
+Both steps only compare lines whose boxes intersect, looked up in a grid of
+GRID_CELL-pixel cells, so merging stays linear in the number of lines.
+"""
+
+from collections import defaultdict
+from typing import Dict, Iterator, List, Tuple
+
+# Fraction of a line's area (and width) inside another line for it to count as a duplicate
+CONTAINED_RATIO = 0.6
+CONTAINED_WIDTH_RATIO = 0.9
+
+# Vertical overlap (fraction of the shorter line) for two pieces to be one line
+SAME_ROW_RATIO = 0.5
+
+# Distance from a tile edge (pixels) at which a line counts as cut by it
+EDGE_MARGIN = 4
+
+# Lines whose tops differ by less than this are treated as one row when sorting
+ROW_TOLERANCE = 10
+
+# Cell size (pixels) of the grid used to find intersecting lines
+GRID_CELL = 256
+
+
+def tile_origins(length: int, tile_size: int, overlap: int) -> List[int]:
+    """Start offsets of tiles along one axis, spread evenly with at least `overlap` shared"""
+    if length <= tile_size:
+        return [0]
+
+    step = max(1, tile_size - overlap)
+    count = -(-(length - overlap) // step)
+    return [round(i * (length - tile_size) / (count - 1)) for i in range(count)]
+
+
+def tile_grid(width: int, height: int, tile_size: int, overlap: int) -> List[Tuple[int, int, int, int]]:
+    """(x, y, width, height) of every tile covering the image, row by row"""
+    return [
+        (x, y, min(tile_size, width), min(tile_size, height))
+        for y in tile_origins(height, tile_size, overlap)
+        for x in tile_origins(width, tile_size, overlap)
+    ]
+
+
+def _extent(line: Dict) -> Tuple[float, float, float, float]:
+    xs = [point[0] for point in line["bbox"]]
+    ys = [point[1] for point in line["bbox"]]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _area(extent) -> float:
+    return max(0.0, extent[2] - extent[0]) * max(0.0, extent[3] - extent[1])
+
+
+def _intersection(a, b) -> float:
+    return _area((max(a[0], b[0]), max(a[1], b[1]), min(a[2], b[2]), min(a[3], b[3])))
+
+
+def _contained(inner, outer) -> bool:
+    """Whether inner is (mostly) a copy of part of outer rather than a different line"""
+    width = (inner[2] - inner[0]) or 1.0
+    overlap_x = min(inner[2], outer[2]) - max(inner[0], outer[0])
+    return (
+        _intersection(inner, outer) >= CONTAINED_RATIO * (_area(inner) or 1.0)
+        and overlap_x >= CONTAINED_WIDTH_RATIO * width
+    )
+
+
+class _Grid:
+    """Candidates indexed by the grid cells their extents cover"""
+
+    def __init__(self):
+        self.cells = defaultdict(dict)
+
+    @staticmethod
+    def _cells(extent) -> Iterator[Tuple[int, int]]:
+        for cx in range(int(extent[0] // GRID_CELL), int(extent[2] // GRID_CELL) + 1):
+            for cy in range(int(extent[1] // GRID_CELL), int(extent[3] // GRID_CELL) + 1):
+                yield cx, cy
+
+    def add(self, candidate: Dict):
+        for cell in self._cells(candidate["extent"]):
+            self.cells[cell][candidate["order"]] = candidate
+
+    def remove(self, candidate: Dict):
+        for cell in self._cells(candidate["extent"]):
+            self.cells[cell].pop(candidate["order"], None)
+
+    def near(self, extent) -> List[Dict]:
+        """Candidates sharing a cell with extent, in the order they were added"""
+        found = {}
+        for cell in self._cells(extent):
+            found.update(self.cells.get(cell, {}))
+        return [found[order] for order in sorted(found)]
+
+
+def _stitch(left: str, right: str) -> str:
+    """Join two readings of one line, dropping the text both tiles saw"""
+    for size in range(min(len(left), len(right)), 1, -1):
+        if left.endswith(right[:size]):
+            return left + right[size:]
+    return f"{left} {right}"
+
+
+def _cut_edges(extent, tile: Tuple[int, int, int, int], image_size: Tuple[int, int]) -> Tuple[bool, bool]:
+    """Whether a line touches its tile's left/right edge where another tile continues"""
+    x, _, width, _ = tile
+    cut_left = x > 0 and extent[0] <= x + EDGE_MARGIN
+    cut_right = x + width < image_size[0] and extent[2] >= x + width - EDGE_MARGIN
+    return cut_left, cut_right
+
+
+def _continues(left, right) -> bool:
+    """Whether right picks up where left was cut off (same row, overlapping in x)"""
+    overlap_y = min(left[3], right[3]) - max(left[1], right[1])
+    shorter = min(left[3] - left[1], right[3] - right[1]) or 1.0
+    return overlap_y >= SAME_ROW_RATIO * shorter and right[0] <= left[2]
+
+
+def _reading_order(candidates: List[Dict]) -> List[Dict]:
+    """Top-to-bottom, then left-to-right for lines on the same row (like PaddleOCR's sorted_boxes)"""
+    ordered = list(candidates)
+    for i in range(len(ordered) - 1):
+        for j in range(i, -1, -1):
+            a, b = ordered[j]["extent"], ordered[j + 1]["extent"]
+            if abs(b[1] - a[1]) < ROW_TOLERANCE and b[0] < a[0]:
+                ordered[j], ordered[j + 1] = ordered[j + 1], ordered[j]
+            else:
+                break
+    return ordered
+
+
+def merge_tile_lines(
+    tile_results: List[Tuple[Tuple[int, int, int, int], List[Dict]]],
+    image_size: Tuple[int, int]
+) -> List[Dict]:
+    """
+    Merge lines from overlapping tiles into one de-duplicated list
+
+    Args:
+        tile_results: (tile, lines) pairs, line bboxes already in image coordinates
+        image_size: (width, height) of the full image
+
+    Returns:
+        Lines in reading order
+    """
+    candidates = []
+    for tile, lines in tile_results:
+        for line in lines:
+            extent = _extent(line)
+            cut_left, cut_right = _cut_edges(extent, tile, image_size)
+            candidates.append({
+                "line": line,
+                "extent": extent,
+                "cut_left": cut_left,
+                "cut_right": cut_right
+            })
+
+    # Drop lines that mostly lie inside a bigger one (copies from the overlap)
+    candidates.sort(key=lambda c: _area(c["extent"]), reverse=True)
+    kept = []
+    kept_grid = _Grid()
+    for candidate in candidates:
+        if any(_contained(candidate["extent"], other["extent"]) for other in kept_grid.near(candidate["extent"])):
+            continue
+        candidate["order"] = len(kept)
+        kept.append(candidate)
+        kept_grid.add(candidate)
+
+    # Stitch pieces of long lines that cross a vertical seam
+    kept.sort(key=lambda c: c["extent"][0])
+    merged = []
+    open_grid = _Grid()  # Merged lines still cut by their right edge
+    for candidate in kept:
+        partner = None
+        if candidate["cut_left"]:
+            for other in open_grid.near(candidate["extent"]):
+                if _continues(other["extent"], candidate["extent"]):
+                    partner = other
+                    break
+
+        if partner is None:
+            candidate["order"] = len(merged)
+            merged.append(candidate)
+            if candidate["cut_right"]:
+                open_grid.add(candidate)
+            continue
+
+        left, right = partner["line"], candidate["line"]
+        extent = tuple(
+            f(a, b) for f, a, b in zip((min, min, max, max), partner["extent"], candidate["extent"])
+        )
+        left_size, right_size = len(left["text"]) or 1, len(right["text"]) or 1
+        partner["line"] = {
+            **left,
+            "text": _stitch(left["text"], right["text"]),
+            "confidence": (left["confidence"] * left_size + right["confidence"] * right_size)
+            / (left_size + right_size),
+            "bbox": [[extent[0], extent[1]], [extent[2], extent[1]], [extent[2], extent[3]], [extent[0], extent[3]]]
+        }
+        open_grid.remove(partner)
+        partner["extent"] = extent
+        partner["cut_right"] = candidate["cut_right"]
+        if partner["cut_right"]:
+            open_grid.add(partner)
+
+    merged.sort(key=lambda c: (c["extent"][1], c["extent"][0]))
+    return [c["line"] for c in _reading_order(merged)]
@@ -0,0 +1,216 @@
+"""
+Deterministic synthetic corpus for OCR benchmarks
+
+Renders text with PIL into clean pages at several DPIs, short snippets at
+several sizes, noisy "scans", blank pages and multi-page PDFs. Everything is
+derived from a fixed seed, so the same corpus (and ground truth) is produced
+on every machine, without network access.
+
+Usage:
+    python -m benchmarks.corpus --output ./bench_corpus
+"""
+
+from typing import Dict, List, Optional
+import argparse
+import json
+import os
+import random
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+CORPUS_VERSION = 1
+DEFAULT_SEED = 1337
+
+WORDS = (
+    "invoice total amount due date payment account number customer order "
+    "quantity price tax subtotal shipping address street city state postal "
+    "code phone email reference description item unit balance credit debit "
+    "statement period issued received approved signature department office "
+    "report summary quarterly annual revenue expense profit margin budget "
+    "forecast delivery warehouse inventory product service contract terms "
+    "conditions agreement page section chapter figure table note appendix"
+).split()
+
+# Letter-size page in inches
+PAGE_INCHES = (8.5, 11.0)
+
+FONT_CANDIDATES = [
+    "DejaVuSans.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/dejavu/DejaVuSans.ttf",
+    "LiberationSans-Regular.ttf",
+    "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf",
+]
+
+
+def load_font(size: int):
+    """Load a scalable font, falling back to Pillow's built-in font"""
+    for candidate in FONT_CANDIDATES:
+        try:
+            return ImageFont.truetype(candidate, size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size=size)
+
+
+def make_lines(rng: random.Random, count: int, min_words: int = 4, max_words: int = 9) -> List[str]:
+    lines = []
+    for _ in range(count):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words))]
+        words[0] = words[0].capitalize()
+        if rng.random() < 0.4:
+            words.append(f"{rng.randint(1, 9999)}.{rng.randint(0, 99):02d}")
+        lines.append(" ".join(words))
+    return lines
+
+
+def render_page(lines: List[str], dpi: int) -> Image.Image:
+    """Render lines of text onto a white letter-size page at the given DPI"""
+    width, height = int(PAGE_INCHES[0] * dpi), int(PAGE_INCHES[1] * dpi)
+    image = Image.new("L", (width, height), 255)
+    draw = ImageDraw.Draw(image)
+
+    # 12pt text
+    font = load_font(max(8, int(12 * dpi / 72)))
+    margin = int(0.75 * dpi)
+    line_height = int(12 * dpi / 72 * 1.6)
+
+    y = margin
+    for line in lines:
+        if y + line_height > height - margin:
+            break
+        draw.text((margin, y), line, fill=0, font=font)
+        y += line_height
+
+    return image.convert("RGB")
+
+
+def render_snippet(text: str, size: tuple) -> Image.Image:
+    """Render a single line of text centred in an image of the given size"""
+    width, height = size
+    image = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(image)
+    font = load_font(max(8, int(height * 0.45)))
+    left, top, right, bottom = draw.textbbox((0, 0), text, font=font)
+    draw.text(((width - (right - left)) // 2, (height - (bottom - top)) // 2 - top), text, fill="black", font=font)
+    return image
+
+
+def add_scan_noise(image: Image.Image, rng: random.Random) -> Image.Image:
+    """Simulate a poor scan: slight skew, blur, sensor noise and a grey background"""
+    np_rng = np.random.default_rng(rng.randint(0, 2**32 - 1))
+    angle = rng.uniform(-1.5, 1.5)
+    skewed = image.rotate(angle, resample=Image.BICUBIC, expand=False, fillcolor="white")
+    blurred = skewed.filter(ImageFilter.GaussianBlur(radius=0.8))
+
+    pixels = np.asarray(blurred, dtype=np.float32)
+    pixels = pixels * 0.85 + 20
+    pixels += np_rng.normal(0, 12, pixels.shape)
+    speckle = np_rng.random(pixels.shape[:2]) < 0.002
+    pixels[speckle] = 0
+    return Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+
+
+def generate_corpus(
+    output_dir: str,
+    seed: int = DEFAULT_SEED,
+    dpis: tuple = (100, 200, 300),
+    snippet_sizes: tuple = ((320, 64), (640, 128), (1280, 256)),
+    pdf_pages: tuple = (2, 5),
+    lines_per_page: int = 30
+) -> Dict:
+    """
+    Generate the corpus into output_dir and write manifest.json
+
+    The manifest lists every file with its kind (image/pdf), category
+    (clean/noisy/snippet/blank/pdf), DPI, page count and per-page ground
+    truth text. Returns the manifest.
+    """
+    rng = random.Random(seed)
+    os.makedirs(output_dir, exist_ok=True)
+    files = []
+
+    def add(name: str, kind: str, category: str, pages_text: List[str], dpi: Optional[int] = None):
+        files.append({
+            "path": name,
+            "kind": kind,
+            "category": category,
+            "dpi": dpi,
+            "pages": len(pages_text),
+            "pages_text": pages_text,
+        })
+
+    for dpi in dpis:
+        lines = make_lines(rng, lines_per_page)
+        page = render_page(lines, dpi)
+
+        name = f"page_{dpi}dpi.png"
+        page.save(os.path.join(output_dir, name), dpi=(dpi, dpi))
+        add(name, "image", "clean", ["\n".join(lines)], dpi)
+
+        name = f"noisy_{dpi}dpi.jpg"
+        add_scan_noise(page, rng).save(os.path.join(output_dir, name), quality=60, dpi=(dpi, dpi))
+        add(name, "image", "noisy", ["\n".join(lines)], dpi)
+
+    for width, height in snippet_sizes:
+        text = make_lines(rng, 1, 3, 5)[0]
+        name = f"snippet_{width}x{height}.png"
+        render_snippet(text, (width, height)).save(os.path.join(output_dir, name))
+        add(name, "image", "snippet", [text])
+
+    blank_dpi = dpis[-1]
+    name = f"blank_{blank_dpi}dpi.png"
+    render_page([], blank_dpi).save(os.path.join(output_dir, name), dpi=(blank_dpi, blank_dpi))
+    add(name, "image", "blank", [""], blank_dpi)
+
+    pdf_dpi = 150
+    for page_count in pdf_pages:
+        pages_text = []
+        pages = []
+        for index in range(page_count):
+            # The last page of each PDF is blank to exercise empty-page handling
+            lines = [] if index == page_count - 1 else make_lines(rng, lines_per_page)
+            pages_text.append("\n".join(lines))
+            pages.append(render_page(lines, pdf_dpi))
+
+        name = f"multipage_{page_count}p.pdf"
+        pages[0].save(
+            os.path.join(output_dir, name),
+            save_all=True,
+            append_images=pages[1:],
+            resolution=pdf_dpi
+        )
+        add(name, "pdf", "pdf", pages_text, pdf_dpi)
+
+    manifest = {"version": CORPUS_VERSION, "seed": seed, "files": files}
+    with open(os.path.join(output_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    return manifest
+
+
+def load_corpus(corpus_dir: str, seed: int = DEFAULT_SEED) -> Dict:
+    """Load an existing corpus, generating it first if it is missing or stale"""
+    manifest_path = os.path.join(corpus_dir, "manifest.json")
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") == CORPUS_VERSION and manifest.get("seed") == seed:
+            return manifest
+
+    return generate_corpus(corpus_dir, seed=seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the synthetic OCR benchmark corpus")
+    parser.add_argument("--output", default="./bench_corpus", help="Directory to write the corpus to")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    args = parser.parse_args()
+
+    manifest = generate_corpus(args.output, seed=args.seed)
+    pages = sum(entry["pages"] for entry in manifest["files"])
+    print(f"Generated {len(manifest['files'])} files ({pages} pages) in {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+In-process API load test with the stub OCR engine
+
+Drives /api/ocr/extract, /api/batch/upload-multiple, document listing/detail
+and JSON export concurrently against the FastAPI app over an in-memory ASGI
+transport, with a throwaway SQLite database and OCR_BACKEND=stub. Model cost
+is a fixed, configurable sleep, so changes in throughput or latency point at
+the request path itself (FastAPI, SQLAlchemy, serialization).
+
+Usage (from backend/):
+    python -m benchmarks.load_test --concurrency 16 --duration 30 --output load.json
+    python -m benchmarks.load_test --stub-latency-ms 0 --compare load.json
+"""
+
+from collections import defaultdict
+from typing import Dict, List
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import tempfile
+import time
+from benchmarks.stats import compare_results, peak_rss_mb, run_metadata, summarize, write_results
+
+DEFAULT_MIX = "extract=2,batch=1,list=4,detail=4,export=2"
+
+
+def configure_environment(work_dir: str, args) -> None:
+    """Point the app at a scratch database/upload dir and the stub engine (before importing it)"""
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(work_dir, 'load_test.db')}"
+    os.environ["UPLOAD_DIR"] = os.path.join(work_dir, "uploads")
+    os.environ["OCR_BACKEND"] = "stub"
+    os.environ["STUB_OCR_LATENCY_MS"] = str(args.stub_latency_ms)
+    os.environ["STUB_OCR_JITTER_MS"] = str(args.stub_jitter_ms)
+    os.environ["STUB_OCR_LINES"] = str(args.stub_lines)
+    os.environ["DEBUG"] = "false"
+
+
+def sample_png() -> bytes:
+    """A small but real PNG so upload validation and file writes behave normally"""
+    from PIL import Image, ImageDraw
+
+    image = Image.new("RGB", (640, 160), "white")
+    ImageDraw.Draw(image).text((20, 60), "Invoice total 1234.56", fill="black")
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class LoadTest:
+    def __init__(self, client, payload: bytes, mix: Dict[str, int], batch_size: int, seed: int):
+        self.client = client
+        self.payload = payload
+        self.scenarios = list(mix)
+        self.weights = [mix[name] for name in self.scenarios]
+        self.batch_size = batch_size
+        self.rng = random.Random(seed)
+        self.document_ids: List[str] = []
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.bytes_received: Dict[str, int] = defaultdict(int)
+
+    async def extract(self):
+        response = await self.client.post(
+            "/api/ocr/extract",
+            files={"file": ("load.png", self.payload, "image/png")}
+        )
+        if response.status_code == 200:
+            self.document_ids.append(response.json()["file_id"])
+        return response
+
+    async def batch(self):
+        files = [("files", (f"load_{i}.png", self.payload, "image/png")) for i in range(self.batch_size)]
+        return await self.client.post("/api/batch/upload-multiple", files=files)
+
+    async def list(self):
+        return await self.client.get("/api/ocr/documents", params={"limit": 50})
+
+    async def detail(self):
+        return await self.client.get(f"/api/ocr/documents/{self.rng.choice(self.document_ids)}")
+
+    async def export(self):
+        return await self.client.get(f"/api/export/document/{self.rng.choice(self.document_ids)}/json")
+
+    async def run_one(self, name: str):
+        started = time.perf_counter()
+        try:
+            response = await getattr(self, name)()
+            ok = response.status_code < 400
+            self.bytes_received[name] += len(response.content)
+        except Exception:
+            ok = False
+        self.latencies[name].append(time.perf_counter() - started)
+        if not ok:
+            self.errors[name] += 1
+
+    async def worker(self, deadline: float, remaining: List[int]):
+        while time.perf_counter() < deadline and remaining[0] > 0:
+            remaining[0] -= 1
+            await self.run_one(self.rng.choices(self.scenarios, self.weights)[0])
+
+
+async def run(args) -> Dict:
+    import httpx
+    from app.main import app
+    from app.models.database import Base, engine
+
+    Base.metadata.create_all(bind=engine)
+    mix = {
+        name: int(weight)
+        for name, weight in (item.split("=") for item in args.mix.split(","))
+        if int(weight) > 0
+    }
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=None) as client:
+        test = LoadTest(client, sample_png(), mix, args.batch_size, args.seed)
+
+        # Seed documents so detail/export have something to read
+        for _ in range(args.seed_documents):
+            await test.extract()
+        test.latencies.clear()
+        test.errors.clear()
+        test.bytes_received.clear()
+
+        remaining = [args.requests or float("inf")]
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*(test.worker(deadline, remaining) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    results = {}
+    for name, latencies in test.latencies.items():
+        summary = summarize(latencies, errors=test.errors[name])
+        summary["requests_per_sec"] = round(len(latencies) / elapsed, 3)
+        summary["error_rate"] = round(test.errors[name] / len(latencies), 4) if latencies else 0.0
+        summary["bytes_received"] = test.bytes_received[name]
+        results[f"api_{name}"] = summary
+
+    all_latencies = [value for values in test.latencies.values() for value in values]
+    total = summarize(all_latencies, errors=sum(test.errors.values()))
+    total["requests_per_sec"] = round(len(all_latencies) / elapsed, 3)
+    total["error_rate"] = round(total["errors"] / len(all_latencies), 4) if all_latencies else 0.0
+    results["api_total"] = total
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the API in-process with a stub OCR engine")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds to run for")
+    parser.add_argument("--requests", type=int, default=0, help="Stop after this many requests (0 = no limit)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Scenario weights, e.g. extract=2,list=4")
+    parser.add_argument("--batch-size", type=int, default=5, help="Files per batch upload request")
+    parser.add_argument("--seed-documents", type=int, default=20)
+    parser.add_argument("--stub-latency-ms", type=float, default=50.0)
+    parser.add_argument("--stub-jitter-ms", type=float, default=10.0)
+    parser.add_argument("--stub-lines", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1337)
+    parser.add_argument("--output", default="load_results.json")
+    parser.add_argument("--compare", help="Previous results file to compare against")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="ocr_load_") as work_dir:
+        configure_environment(work_dir, args)
+        results = asyncio.run(run(args))
+
+    output = {
+        "meta": run_metadata(),
+        "config": vars(args),
+        "results": results,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    write_results(args.output, output)
+
+    print(f"\n{'scenario':<16} {'requests':>9} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for name, summary in results.items():
+        print(
+            f"{name:<16} {summary['count']:>9} {summary['requests_per_sec']:>9.1f} {summary['p50_ms']:>9.1f} "
+            f"{summary['p95_ms']:>9.1f} {summary['p99_ms']:>9.1f} {summary['error_rate']:>7.2%}"
+        )
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare_results(json.load(f), output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+Speed/accuracy Pareto harness for OCR configurations
+
+Runs a labelled corpus through OCRService under a grid of configurations and
+reports character and word error rate next to latency and throughput.
+Configurations beaten on both accuracy (CER) and speed (p50 latency) by some
+other configuration are flagged as dominated; the rest form the Pareto
+frontier.
+
+Ground truth comes from the synthetic corpus (text it rendered itself), so
+the harness runs offline. Real labelled documents can be added with
+--labelled-dir: every <name>.<ext> with a sibling <name>.txt is included.
+
+Grid dimensions:
+    profile                                         -> speed profile (fast/balanced/accurate)
+    use_angle_cls, det_limit_side_len, ocr_version  -> PaddleOCR options (override the profile)
+    confidence_threshold                            -> Tesseract fallback threshold
+    pdf_dpi                                         -> PDF rasterization DPI
+    scale                                           -> image downscale (simulates lower DPI scans)
+    preprocess                                      -> none | grayscale | binarize
+
+Usage (from backend/):
+    python -m benchmarks.pareto --output pareto.json
+    python -m benchmarks.pareto --grid '{"use_angle_cls": [true, false], "scale": [1.0, 0.5]}'
+"""
+
+from itertools import product
+from typing import Dict, List, Tuple
+import argparse
+import json
+import os
+import re
+import tempfile
+import time
+from benchmarks.corpus import load_corpus
+from benchmarks.stats import run_metadata, summarize, write_results
+
+DEFAULT_GRID = {
+    "profile": ["fast", "balanced", "accurate"],
+    "confidence_threshold": [0.7],
+    "pdf_dpi": [150, 200],
+    "scale": [1.0, 0.6],
+    "preprocess": ["none", "grayscale"],
+}
+
+PADDLE_KEYS = ("use_angle_cls", "det_limit_side_len", "ocr_version", "rec_batch_num", "cpu_threads")
+LABELLED_EXTENSIONS = (".png", ".jpg", ".jpeg", ".tif", ".tiff", ".bmp", ".pdf")
+PAGE_HEADER = re.compile(r"^=+$|^PAGE \d+$")
+
+
+def normalize(text: str) -> str:
+    """Collapse whitespace so line order/spacing differences are not counted as errors"""
+    return " ".join(text.split())
+
+
+def edit_distance(reference, hypothesis) -> int:
+    """Levenshtein distance between two sequences (characters or words)"""
+    if len(reference) < len(hypothesis):
+        reference, hypothesis = hypothesis, reference
+
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_item in enumerate(reference, start=1):
+        current = [i]
+        for j, hyp_item in enumerate(hypothesis, start=1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_item != hyp_item)
+            ))
+        previous = current
+    return previous[-1]
+
+
+def error_rates(reference: str, hypothesis: str) -> Tuple[int, int, int, int]:
+    """Return (char errors, ref chars, word errors, ref words)"""
+    reference, hypothesis = normalize(reference), normalize(hypothesis)
+    ref_words, hyp_words = reference.split(), hypothesis.split()
+    return (
+        edit_distance(reference, hypothesis), len(reference),
+        edit_distance(ref_words, hyp_words), len(ref_words),
+    )
+
+
+def load_labelled_dir(directory: str) -> List[Dict]:
+    entries = []
+    for name in sorted(os.listdir(directory)):
+        stem, ext = os.path.splitext(name)
+        truth_path = os.path.join(directory, f"{stem}.txt")
+        if ext.lower() not in LABELLED_EXTENSIONS or not os.path.exists(truth_path):
+            continue
+        with open(truth_path, encoding="utf-8") as f:
+            truth = f.read()
+        entries.append({
+            "path": os.path.join(directory, name),
+            "kind": "pdf" if ext.lower() == ".pdf" else "image",
+            "category": "labelled",
+            "pages": 1,
+            "pages_text": [truth],
+        })
+    return entries
+
+
+def expand_grid(grid: Dict[str, List]) -> List[Dict]:
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in product(*(grid[key] for key in keys))]
+
+
+def config_label(config: Dict) -> str:
+    return ",".join(f"{key}={value}" for key, value in config.items())
+
+
+def prepare_image(path: str, config: Dict, work_dir: str) -> str:
+    """Apply the config's scale/preprocess to an image, returning the path to OCR"""
+    scale = config.get("scale", 1.0)
+    preprocess = config.get("preprocess", "none")
+    if scale == 1.0 and preprocess == "none":
+        return path
+
+    from PIL import Image
+
+    image = Image.open(path)
+    if scale != 1.0:
+        image = image.resize(
+            (max(1, int(image.width * scale)), max(1, int(image.height * scale))),
+            Image.LANCZOS
+        )
+    if preprocess == "grayscale":
+        image = image.convert("L")
+    elif preprocess == "binarize":
+        image = image.convert("L").point(lambda value: 255 if value > 160 else 0)
+
+    output = os.path.join(work_dir, f"prepared_{os.path.basename(path)}.png")
+    image.convert("RGB").save(output)
+    return output
+
+
+def hypothesis_text(result: Dict) -> str:
+    """Text of the recognised lines, without the page banners PDF results include"""
+    if result.get("lines"):
+        return " ".join(line["text"] for line in result["lines"])
+    return " ".join(
+        line for line in result.get("text", "").splitlines()
+        if not PAGE_HEADER.match(line.strip())
+    )
+
+
+class ServiceCache:
+    """Reuse loaded engines across configurations that share PaddleOCR options"""
+
+    def __init__(self):
+        self._services = {}
+
+    def get(self, config: Dict):
+        from app.services.ocr_service import OCRService
+
+        paddle_options = {key: config[key] for key in PADDLE_KEYS if key in config}
+        key = json.dumps(paddle_options, sort_keys=True)
+        if key not in self._services:
+            self._services[key] = OCRService(paddle_options=paddle_options)
+
+        service = self._services[key]
+        service.confidence_threshold = config.get("confidence_threshold", service.confidence_threshold)
+        service.pdf_dpi = config.get("pdf_dpi", service.pdf_dpi)
+        return service
+
+
+def evaluate(service, entries: List[Dict], corpus_dir: str, config: Dict, repeat: int) -> Dict:
+    latencies: List[float] = []
+    pages = 0
+    char_errors = char_total = word_errors = word_total = 0
+
+    with tempfile.TemporaryDirectory(prefix="ocr_pareto_") as work_dir:
+        for entry in entries:
+            path = entry["path"] if os.path.isabs(entry["path"]) else os.path.join(corpus_dir, entry["path"])
+            if entry["kind"] == "image":
+                path = prepare_image(path, config, work_dir)
+
+            result = {}
+            for _ in range(repeat):
+                started = time.perf_counter()
+                result = service.extract_text(path, profile=config.get("profile"))
+                latencies.append(time.perf_counter() - started)
+                pages += entry["pages"]
+
+            reference = " ".join(entry["pages_text"])
+            ce, ct, we, wt = error_rates(reference, hypothesis_text(result))
+            char_errors += ce
+            char_total += ct
+            word_errors += we
+            word_total += wt
+
+    summary = summarize(latencies, pages)
+    summary["cer"] = round(char_errors / char_total, 5) if char_total else 0.0
+    summary["wer"] = round(word_errors / word_total, 5) if word_total else 0.0
+    return summary
+
+
+def mark_dominated(results: List[Dict]):
+    """Flag configurations no better than another on both CER and p50 latency"""
+    for candidate in results:
+        candidate["dominated_by"] = None
+        for other in results:
+            if other is candidate:
+                continue
+            no_worse = other["cer"] <= candidate["cer"] and other["p50_ms"] <= candidate["p50_ms"]
+            better = other["cer"] < candidate["cer"] or other["p50_ms"] < candidate["p50_ms"]
+            if no_worse and better:
+                candidate["dominated_by"] = other["label"]
+                break
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure speed/accuracy trade-offs of OCR configurations")
+    parser.add_argument("--corpus-dir", default="./bench_corpus")
+    parser.add_argument("--labelled-dir", help="Extra labelled documents (<name>.<ext> + <name>.txt)")
+    parser.add_argument("--grid", help="JSON object mapping knob -> list of values (default: built-in grid)")
+    parser.add_argument("--categories", default="clean,noisy,snippet,pdf", help="Synthetic categories to include")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--output", default="pareto_results.json")
+    args = parser.parse_args()
+
+    grid = json.loads(args.grid) if args.grid else DEFAULT_GRID
+    categories = set(args.categories.split(","))
+    manifest = load_corpus(args.corpus_dir)
+    entries = [entry for entry in manifest["files"] if entry["category"] in categories]
+    if args.labelled_dir:
+        entries.extend(load_labelled_dir(args.labelled_dir))
+
+    services = ServiceCache()
+    configs = expand_grid(grid)
+    results = []
+
+    for index, config in enumerate(configs, start=1):
+        label = config_label(config)
+        print(f"[{index}/{len(configs)}] {label}")
+        summary = evaluate(services.get(config), entries, args.corpus_dir, config, args.repeat)
+        summary["label"] = label
+        summary["config"] = config
+        results.append(summary)
+        print(f"    CER {summary['cer']:.2%}  WER {summary['wer']:.2%}  p50 {summary['p50_ms']:.0f} ms  "
+              f"{summary.get('pages_per_sec', 0):.2f} pages/s")
+
+    mark_dominated(results)
+    frontier = sorted((r for r in results if not r["dominated_by"]), key=lambda r: r["p50_ms"])
+
+    print(f"\nPareto frontier ({len(frontier)} of {len(results)} configurations):")
+    print(f"{'p50 ms':>9} {'pages/s':>9} {'CER':>8} {'WER':>8}  configuration")
+    for r in frontier:
+        print(f"{r['p50_ms']:>9.0f} {r.get('pages_per_sec', 0):>9.2f} {r['cer']:>8.2%} {r['wer']:>8.2%}  {r['label']}")
+
+    write_results(args.output, {
+        "meta": run_metadata(),
+        "grid": grid,
+        "documents": len(entries),
+        "results": {r["label"]: r for r in results},
+        "frontier": [r["label"] for r in frontier],
+    })
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Offline OCR benchmark runner
+
+Measures OCRService.extract_text on each corpus category, the parallel PDF
+path and every export format, and writes latency percentiles, pages/sec and
+peak RSS as JSON so runs can be compared.
+
+Usage (from backend/):
+    python -m benchmarks.run_benchmarks --output bench.json
+    python -m benchmarks.run_benchmarks --output new.json --compare bench.json
+    python -m benchmarks.run_benchmarks --skip-ocr        # exports only
+"""
+
+from collections import defaultdict
+from typing import Dict, List
+import argparse
+import json
+import os
+from benchmarks.corpus import load_corpus
+from benchmarks.stats import Stopwatch, compare_results, peak_rss_mb, run_metadata, summarize, write_results
+
+
+def bench_ocr(corpus_dir: str, manifest: Dict, repeat: int, warmup: int) -> Dict:
+    """Time extract_text per corpus category (images) and for the PDF parallel path"""
+    from app.services.ocr_service import ocr_service
+
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    pages: Dict[str, int] = defaultdict(int)
+    errors: Dict[str, int] = defaultdict(int)
+
+    for entry in manifest["files"]:
+        path = os.path.join(corpus_dir, entry["path"])
+        name = "ocr_pdf_parallel" if entry["kind"] == "pdf" else f"ocr_image_{entry['category']}"
+
+        for _ in range(warmup):
+            ocr_service.extract_text(path)
+
+        for _ in range(repeat):
+            with Stopwatch(latencies[name]):
+                result = ocr_service.extract_text(path)
+            pages[name] += entry["pages"]
+            # Blank pages legitimately report "No text detected"
+            if not result.get("success") and entry["category"] != "blank":
+                errors[name] += 1
+
+        print(f"  {entry['path']:<28} {latencies[name][-1] * 1000:>10.1f} ms")
+
+    return {name: summarize(values, pages[name], errors[name]) for name, values in latencies.items()}
+
+
+def synthetic_document(manifest: Dict, line_count: int) -> Dict:
+    """Build an export-ready document from corpus ground truth, with line_count lines"""
+    source_lines = [
+        line
+        for entry in manifest["files"]
+        for page_text in entry["pages_text"]
+        for line in page_text.splitlines()
+        if line
+    ]
+    lines = []
+    for idx in range(line_count):
+        text = source_lines[idx % len(source_lines)]
+        y = float(20 + (idx % 40) * 30)
+        lines.append({
+            "text": text,
+            "confidence": 0.9,
+            "bbox": [[50.0, y], [550.0, y], [550.0, y + 24], [50.0, y + 24]],
+            "page": idx // 40 + 1
+        })
+
+    return {
+        "id": "00000000-0000-0000-0000-000000000000",
+        "original_filename": "benchmark.pdf",
+        "file_size": 0,
+        "file_type": "pdf",
+        "processed_at": "2024-01-01T00:00:00",
+        "created_at": "2024-01-01T00:00:00",
+        "extracted_text": "\n".join(line["text"] for line in lines),
+        "confidence": 0.9,
+        "line_count": len(lines),
+        "ocr_lines": lines,
+        "status": "completed",
+    }
+
+
+def bench_exports(manifest: Dict, repeat: int, line_count: int) -> Dict:
+    """Time rendering of every export format for one large synthetic document"""
+    from app.services.export_service import export_service, EXPORT_FORMATS
+
+    document = synthetic_document(manifest, line_count)
+    results = {}
+
+    for export_format in EXPORT_FORMATS:
+        latencies: List[float] = []
+        size = 0
+        for _ in range(repeat):
+            with Stopwatch(latencies):
+                size = len(export_service.render(document, export_format))
+
+        summary = summarize(latencies)
+        summary["bytes"] = size
+        results[f"export_{export_format}"] = summary
+        print(f"  export {export_format:<6} {summary['p50_ms']:>10.1f} ms  ({size} bytes)")
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the offline OCR benchmark suite")
+    parser.add_argument("--corpus-dir", default="./bench_corpus")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="Previous results file to compare against")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--export-lines", type=int, default=5000, help="Lines in the export benchmark document")
+    parser.add_argument("--skip-ocr", action="store_true", help="Only run the export benchmarks")
+    args = parser.parse_args()
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+
+    manifest = load_corpus(args.corpus_dir)
+    results = {}
+
+    if not args.skip_ocr:
+        print("OCR benchmarks")
+        results.update(bench_ocr(args.corpus_dir, manifest, args.repeat, args.warmup))
+
+    print("Export benchmarks")
+    results.update(bench_exports(manifest, args.repeat, args.export_lines))
+
+    output = {
+        "meta": run_metadata(),
+        "config": vars(args),
+        "results": results,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    write_results(args.output, output)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare_results(json.load(f), output)
+
+
+if __name__ == "__main__":
+    main()
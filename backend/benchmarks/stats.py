@@ -0,0 +1,108 @@
+"""Shared measurement helpers for the benchmark suites"""
+
+from typing import Dict, List
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Linear-interpolated percentile (pct in 0-100) of an unsorted list"""
+    if not values:
+        return 0.0
+
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100.0
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def summarize(latencies: List[float], pages: int = 0, errors: int = 0) -> Dict:
+    """Latency percentiles and throughput for a list of per-call durations (seconds)"""
+    total = sum(latencies)
+    summary = {
+        "count": len(latencies),
+        "errors": errors,
+        "total_seconds": round(total, 6),
+        "mean_ms": round(total / len(latencies) * 1000, 3) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "max_ms": round(max(latencies) * 1000, 3) if latencies else 0.0,
+    }
+    if pages:
+        summary["pages"] = pages
+        summary["pages_per_sec"] = round(pages / total, 3) if total else 0.0
+    return summary
+
+
+def peak_rss_mb() -> Dict[str, float]:
+    """Peak resident set size of this process and of its (reaped) children, in MB"""
+    # ru_maxrss is KB on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return {
+        "self": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1),
+        "children": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale, 1),
+    }
+
+
+def run_metadata() -> Dict:
+    """Describe the machine and code revision a run was measured on"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, timeout=5,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+class Stopwatch:
+    """Context manager that records elapsed wall time into a list"""
+
+    def __init__(self, sink: List[float]):
+        self.sink = sink
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.sink.append(time.perf_counter() - self.started)
+        return False
+
+
+def write_results(path: str, results: Dict):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+
+def compare_results(baseline: Dict, current: Dict, keys=("p50_ms", "p95_ms", "pages_per_sec", "requests_per_sec")):
+    """Print per-benchmark deltas between two result files"""
+    print(f"\n{'benchmark':<32} {'metric':<18} {'baseline':>12} {'current':>12} {'change':>9}")
+    print("-" * 87)
+    for name, current_entry in current.get("results", {}).items():
+        baseline_entry = baseline.get("results", {}).get(name)
+        if not baseline_entry:
+            continue
+        for key in keys:
+            if key not in current_entry or key not in baseline_entry:
+                continue
+            old, new = baseline_entry[key], current_entry[key]
+            change = f"{(new - old) / old:+.1%}" if old else "n/a"
+            print(f"{name:<32} {key:<18} {old:>12.3f} {new:>12.3f} {change:>9}")
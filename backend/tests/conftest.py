@@ -0,0 +1,10 @@
+import os
+import tempfile
+
+# Settings are read when app modules are first imported: run against the stub
+# engine and a throwaway database and upload directory
+_scratch = tempfile.mkdtemp(prefix="ocr-tests-")
+os.environ.setdefault("OCR_BACKEND", "stub")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_scratch, 'ocr.db')}")
+os.environ.setdefault("UPLOAD_DIR", os.path.join(_scratch, "uploads"))
+os.environ.setdefault("CACHE_BACKEND", "memory")
@@ -0,0 +1,69 @@
+import uuid
+
+from app.core.cache import LRUCache
+from app.models.database import Base, SessionLocal, engine
+from app.models.ocr_models import Document
+from app.services.document_cache import CachedResponse, DocumentCache, document_cache
+
+
+def _insert_document(db, status="processing"):
+    document = Document(
+        id=str(uuid.uuid4()),
+        original_filename="scan.png",
+        stored_filename="scan.png",
+        file_path="/nonexistent/scan.png",
+        file_size=1,
+        file_type="png",
+        status=status
+    )
+    db.add(document)
+    db.commit()
+    return document
+
+
+def test_response_read_before_a_commit_is_not_stored_after_it():
+    Base.metadata.create_all(bind=engine)
+    reader, writer = SessionLocal(), SessionLocal()
+    try:
+        document_id = _insert_document(writer).id
+
+        # A GET misses and reads the document...
+        key = document_cache.document_key(document_id)
+        assert document_cache.get("document", key) is None
+        stale = CachedResponse('W/"processing"', reader.get(Document, document_id).status.encode())
+
+        # ...the OCR run commits its result...
+        writer.get(Document, document_id).status = "completed"
+        writer.commit()
+
+        # ...and only then does the GET store what it read
+        document_cache.set(key, stale, 60)
+
+        assert document_cache.get("document", document_cache.document_key(document_id)) is None
+    finally:
+        reader.close()
+        writer.close()
+
+
+def test_invalidation_only_affects_the_written_document():
+    cache = DocumentCache(LRUCache(100, 1024 * 1024))
+    response = CachedResponse('W/"1"', b"{}")
+    cache.set(cache.document_key("a"), response, 60)
+    cache.set(cache.document_key("b"), response, 60)
+
+    cache.invalidate(["a"])
+
+    assert cache.get("document", cache.document_key("a")) is None
+    assert cache.get("document", cache.document_key("b")) == response
+
+
+def test_expired_document_generations_are_dropped(monkeypatch):
+    backend = LRUCache(100, 1024 * 1024)
+    clock = iter(range(0, 10000, 100))
+    monkeypatch.setattr("app.core.cache.time.monotonic", lambda: next(clock))
+
+    for index in range(50):
+        backend.incr(f"document:generation:{index}", 250)
+
+    assert len(backend._expiring_counters) <= 3
+    assert backend.counter("document:generation:0") == 0
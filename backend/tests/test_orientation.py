@@ -0,0 +1,60 @@
+import random
+
+import pytest
+
+from app.services.orientation import CONFIDENT_SCORE, detect_orientation
+from benchmarks.corpus import add_scan_noise, make_lines, render_page, render_snippet
+
+ROTATIONS = (0, 90, 180, 270)
+
+
+def _rotated(image, rotation):
+    """The image turned clockwise, so a counter-clockwise rotation makes it upright"""
+    return image.rotate(-rotation, expand=True) if rotation else image
+
+
+def _page(lines, dpi, seed=1):
+    return render_page(make_lines(random.Random(seed), lines), dpi)
+
+
+@pytest.mark.parametrize("rotation", ROTATIONS)
+@pytest.mark.parametrize("dpi", [100, 200, 300])
+def test_full_page_orientation(dpi, rotation):
+    detected, score = detect_orientation(_rotated(_page(30, dpi), rotation))
+    assert detected == rotation
+    assert score >= CONFIDENT_SCORE
+
+
+@pytest.mark.parametrize("rotation", ROTATIONS)
+def test_noisy_scan_orientation(rotation):
+    rng = random.Random(2)
+    scan = add_scan_noise(render_page(make_lines(rng, 30), 200), rng)
+    assert detect_orientation(_rotated(scan, rotation))[0] == rotation
+
+
+@pytest.mark.parametrize("rotation", ROTATIONS)
+@pytest.mark.parametrize("lines", [1, 3, 5])
+@pytest.mark.parametrize("dpi", [100, 200, 300])
+def test_sparse_page_is_inconclusive(dpi, lines, rotation):
+    assert detect_orientation(_rotated(_page(lines, dpi, seed=lines), rotation))[0] is None
+
+
+@pytest.mark.parametrize("rotation", ROTATIONS)
+@pytest.mark.parametrize("size", [(320, 64), (640, 128), (1280, 256), (800, 400)])
+def test_snippet_is_inconclusive(size, rotation):
+    text = make_lines(random.Random(3), 1, 3, 5)[0]
+    assert detect_orientation(_rotated(render_snippet(text, size), rotation))[0] is None
+
+
+def test_blank_page_is_inconclusive():
+    assert detect_orientation(render_page([], 150)) == (None, 0.0)
+
+
+def test_many_sparse_pages_never_flip():
+    """Wrong rotations are worse than none: sparse pages must never be turned"""
+    for seed in range(20):
+        rng = random.Random(seed)
+        page = render_page(make_lines(rng, rng.randint(1, 5)), rng.choice([100, 150, 200, 300]))
+        for rotation in ROTATIONS:
+            detected = detect_orientation(_rotated(page, rotation))[0]
+            assert detected in (None, rotation)
@@ -0,0 +1,75 @@
+import uuid
+
+import anyio
+import pytest
+
+from app.api import ocr
+from app.models.database import Base, SessionLocal, engine
+from app.models.ocr_models import Document
+from app.services.ocr_service import ocr_service
+from app.services.processing_service import processing_service
+
+
+@pytest.fixture
+def document(monkeypatch):
+    monkeypatch.setattr(ocr_service, "latency_ms", 50)
+    monkeypatch.setattr(ocr_service, "jitter_ms", 0)
+    monkeypatch.setattr(ocr_service, "pdf_pages", 20)
+    Base.metadata.create_all(bind=engine)
+
+    document_id = str(uuid.uuid4())
+    db = SessionLocal()
+    db.add(Document(
+        id=document_id,
+        original_filename="scan.pdf",
+        stored_filename="scan.pdf",
+        file_path="/nonexistent/scan.pdf",
+        file_size=1,
+        file_type="pdf",
+        status="processing"
+    ))
+    db.commit()
+    db.close()
+    return document_id
+
+
+def _stored(document_id):
+    db = SessionLocal()
+    try:
+        return db.get(Document, document_id)
+    finally:
+        db.close()
+
+
+def test_disconnect_cancels_and_records_the_run(document):
+    messages = []
+
+    async def client():
+        # The client goes away after the first page, as Starlette's disconnect cancels the response
+        with anyio.CancelScope() as scope:
+            async for message in ocr._stream_until_disconnect(document, None):
+                messages.append(message)
+                if message.startswith("event: page"):
+                    scope.cancel()
+
+    anyio.run(client)
+
+    stored = _stored(document)
+    assert [message.split("\n")[0] for message in messages] == ["event: started", "event: page"]
+    assert stored.status == "cancelled"
+    assert 0 < stored.line_count < 20 * ocr_service.lines_per_page
+    assert "PAGE 1" in stored.extracted_text
+    assert document not in processing_service._jobs
+
+
+def test_finished_stream_completes(document, monkeypatch):
+    monkeypatch.setattr(ocr_service, "pdf_pages", 2)
+
+    async def client():
+        return [message async for message in ocr._stream_until_disconnect(document, None)]
+
+    messages = anyio.run(client)
+
+    assert messages[-1].startswith("event: done")
+    assert _stored(document).status == "completed"
+    assert document not in processing_service._jobs
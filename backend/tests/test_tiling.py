@@ -0,0 +1,84 @@
+import time
+
+from app.services.tiling import merge_tile_lines, tile_grid
+
+
+def _line(text, x0, y0, x1, y1, confidence=0.9):
+    return {
+        "text": text,
+        "confidence": confidence,
+        "bbox": [[x0, y0], [x1, y0], [x1, y1], [x0, y1]],
+    }
+
+
+def _tile_results(lines, width, height, tile_size, overlap):
+    """What each tile would read: the lines it overlaps, clipped to the tile"""
+    results = []
+    for tile in tile_grid(width, height, tile_size, overlap):
+        x, y, tile_width, tile_height = tile
+        seen = []
+        for text, x0, y0, x1, y1 in lines:
+            cx0, cy0 = max(x0, x), max(y0, y)
+            cx1, cy1 = min(x1, x + tile_width), min(y1, y + tile_height)
+            if cx1 > cx0 and cy1 > cy0:
+                seen.append(_line(text, cx0, cy0, cx1, cy1))
+        results.append((tile, seen))
+    return results
+
+
+def test_seam_duplicates_are_dropped():
+    lines = [
+        ("inside the overlap", 100, 700, 600, 730),
+        ("cut by the seam", 100, 985, 600, 1015),
+        ("only in the last tile", 100, 1800, 600, 1830),
+    ]
+    merged = merge_tile_lines(_tile_results(lines, 1000, 2000, 1000, 200), (1000, 2000))
+
+    assert [line["text"] for line in merged] == [text for text, *_ in lines]
+    assert merged[1]["bbox"] == [[100, 985], [600, 985], [600, 1015], [100, 1015]]
+
+
+def test_line_across_vertical_seams_is_stitched():
+    tiles = tile_grid(2000, 1000, 1000, 200)
+    pieces = {
+        0: _line("the quick brown fox", 100, 100, 1000, 130),
+        500: _line("brown fox jumps over", 500, 100, 1500, 130),
+        1000: _line("jumps over the lazy dog", 1000, 100, 1900, 130),
+    }
+    results = [(tile, [pieces[tile[0]]]) for tile in tiles]
+
+    merged = merge_tile_lines(results, (2000, 1000))
+
+    assert len(merged) == 1
+    assert merged[0]["text"] == "the quick brown fox jumps over the lazy dog"
+    assert merged[0]["bbox"] == [[100, 100], [1900, 100], [1900, 130], [100, 130]]
+
+
+def test_lines_on_different_rows_are_not_stitched():
+    tiles = tile_grid(2000, 1000, 1000, 200)
+    results = [
+        (tiles[0], [_line("left column", 100, 100, 1000, 130)]),
+        (tiles[2], [_line("right column", 1000, 400, 1900, 430)]),
+    ]
+
+    merged = merge_tile_lines(results, (2000, 1000))
+
+    assert [line["text"] for line in merged] == ["left column", "right column"]
+
+
+def test_many_lines_merge_quickly():
+    width, height = 12000, 16000
+    lines = [
+        (f"word {row}-{column}", x, y, x + 140, y + 24)
+        for row, y in enumerate(range(20, height - 40, 40))
+        for column, x in enumerate(range(20, width - 160, 380))
+    ]
+    results = _tile_results(lines, width, height, 1536, 160)
+
+    start = time.perf_counter()
+    merged = merge_tile_lines(results, (width, height))
+    elapsed = time.perf_counter() - start
+
+    assert len(lines) > 12000
+    assert sorted(line["text"] for line in merged) == sorted(text for text, *_ in lines)
+    assert elapsed < 10